@@ -0,0 +1,76 @@
+"""Latency of constraint-checked booking inserts as the booking table grows.
+
+Usage: python -m benchmarks.booking_conflicts [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import datetime
+import json
+import random
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import (
+    ENGINE,
+    SLOT_SECONDS,
+    SLOTS_PER_DAY,
+    START_DATE,
+    reset_database,
+    seed_bookings,
+    seed_places,
+    seed_users,
+    seeded_days,
+)
+from benchmarks.timing import measure
+from src.api.bookings.schemas import CreateBookingRequest
+from src.api.bookings.service import BookingConflictError, BookingService
+from src.api.places.models import Place
+from src.api.users.models import User
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--places", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    reset_database()
+    seed_users(args.users)
+    seed_places(args.places)
+
+    results = []
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed_bookings(size - seeded, offset=seeded)
+        seeded = size
+
+        with Session(ENGINE) as session:
+            place_ids = session.scalars(select(Place.id)).all()
+            user_ids = session.scalars(select(User.id)).all()
+            service = BookingService(session)
+            days = seeded_days(size)
+
+            def book(date: datetime.date) -> None:
+                slot = random.randrange(SLOTS_PER_DAY) * SLOT_SECONDS
+                data = CreateBookingRequest(date=date, start_second=slot + 600, end_second=slot + 1800)
+                try:
+                    booking = service.create_booking(
+                        data, place_id=random.choice(place_ids), user_id=random.choice(user_ids)
+                    )
+                except BookingConflictError:
+                    return
+                service.delete_booking(booking.id)
+
+            # Seeded dates are fully booked, so every insert there is rejected by the exclusion constraints
+            rejected = measure(lambda: book(START_DATE + datetime.timedelta(days=random.randrange(days))), args.repeat)
+            accepted = measure(lambda: book(START_DATE - datetime.timedelta(days=1)), args.repeat)
+            results.append({"bookings": size, "rejected": rejected, "accepted": accepted})
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
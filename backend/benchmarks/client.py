@@ -0,0 +1,46 @@
+"""In-process HTTP client for the API, bound to the benchmark database."""
+
+from typing import Iterator
+
+import anyio.to_thread
+import httpx
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import ENGINE, PASSWORD, USERNAME_PREFIX
+from src.app import app
+from src.config import settings
+from src.db.deps import get_session
+from src.limiter import limiter
+
+
+def get_benchmark_session() -> Iterator[Session]:
+    session = Session(ENGINE)
+
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def create_client() -> httpx.AsyncClient:
+    """Client that talks to the app through ASGI, without the lifespan.
+
+    Rate limits are turned off, otherwise every worker shares the same client address and is throttled.
+    Must be called from inside the event loop, because the thread limiter is per loop.
+    """
+
+    app.dependency_overrides[get_session] = get_benchmark_session
+    limiter.enabled = False
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None)
+
+
+async def login(client: httpx.AsyncClient, user_number: int) -> dict[str, str]:
+    response = await client.post(
+        "/api/auth/login", data={"username": f"{USERNAME_PREFIX}{user_number:08d}", "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
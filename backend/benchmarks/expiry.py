@@ -0,0 +1,101 @@
+"""Expiry of a backlog of no-show bookings: the set-based DELETE ... RETURNING against the old row-by-row job.
+
+Every run deletes what it measures, so each approach gets a freshly seeded backlog and runs once.
+`legacy` replays the previous `Jobs.delete_expired_bookings` with the Telegram call replaced by collecting chat ids.
+
+Usage: python -m benchmarks.expiry [--users 1000 --places 1000 --bookings 100000]
+"""
+
+import argparse
+import datetime
+import json
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import ENGINE, reset_database, seed_bookings, seed_places, seed_users
+from src.api.bookings.models import Booking
+from src.api.bookings.service import BookingService
+from src.api.users.service import UserService
+from tests.utils.queries import count_queries
+
+MESSAGE = "Вы не пришли на забронированное место, бронь отменена."
+
+
+def seed_backlog(users: int, places: int, bookings: int) -> None:
+    """Seeds `bookings` past bookings that nobody showed up for, of users who all have Telegram linked."""
+
+    reset_database()
+    seed_users(users)
+    seed_places(places)
+    seed_bookings(bookings)
+    with ENGINE.begin() as connection:
+        connection.execute(text("UPDATE booking SET is_activated_by_user = false"))
+        connection.execute(
+            text(
+                'UPDATE "user" SET telegram_id = n FROM (SELECT id, row_number() OVER () AS n FROM "user") AS t '
+                'WHERE "user".id = t.id'
+            )
+        )
+        connection.execute(text("ANALYZE"))
+
+
+def legacy(session: Session, cutoff: datetime.datetime) -> tuple[int, int]:
+    user_service = UserService(session=session)
+    current_seconds = cutoff.hour * 3600 + cutoff.minute * 60 + cutoff.second
+    expired_bookings = (
+        session.query(Booking)
+        .filter(
+            Booking.date <= cutoff.date(),
+            Booking.start_second <= current_seconds,
+            Booking.is_activated_by_user.is_(False),
+        )
+        .all()
+    )
+
+    chat_ids = []
+    for booking in expired_bookings:
+        user = user_service.get_user_by_id(booking.user_id)
+        if user.telegram_id is not None:
+            chat_ids.append(user.telegram_id)
+        session.delete(booking)
+    session.commit()
+
+    return len(expired_bookings), len(chat_ids)
+
+
+def set_based(session: Session, cutoff: datetime.datetime) -> tuple[int, int]:
+    return BookingService(session).delete_expired_bookings(cutoff, MESSAGE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Late enough in the day for every seeded booking to be past its start
+    cutoff = datetime.datetime.combine(datetime.date.today(), datetime.time(23, 59))
+
+    results = {"bookings": args.bookings}
+    for name, fn in {"legacy": legacy, "set_based": set_based}.items():
+        seed_backlog(args.users, args.places, args.bookings)
+        with Session(ENGINE) as session, count_queries(ENGINE) as statements:
+            started_at = time.perf_counter()
+            deleted, notified = fn(session, cutoff)
+            elapsed = time.perf_counter() - started_at
+
+        results[name] = {
+            "deleted": deleted,
+            "notified": notified,
+            "statements": len(statements),
+            "seconds": round(elapsed, 3),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
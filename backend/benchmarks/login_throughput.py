@@ -0,0 +1,78 @@
+"""Login throughput against the latency of concurrent booking reads.
+
+Every login costs a bcrypt verify. The verifies run on the password hash pool (PASSWORD_HASH_WORKERS), so adding
+login pressure should raise login latency and queueing, not the latency of the readers next to it.
+
+Usage: python -m benchmarks.login_throughput [--duration 20 --logins 1,4,16,64 --readers 16]
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+import anyio
+
+from benchmarks.client import create_client, login
+from benchmarks.seed import reset_database, seed_bookings, seed_places, seed_users
+from benchmarks.timing import summarize
+from src.config import settings
+
+
+async def run_round(client, headers: list[dict[str, str]], logins: int, readers: int, duration: float) -> dict:
+    samples: dict[str, list[float]] = defaultdict(list)
+    deadline = time.perf_counter() + duration
+
+    async def log_in(n: int) -> None:
+        started_at = time.perf_counter()
+        await login(client, n)
+        samples["login"].append(time.perf_counter() - started_at)
+
+    async def read(auth: dict[str, str]) -> None:
+        started_at = time.perf_counter()
+        response = await client.get("/api/users/me/bookings", headers=auth)
+        response.raise_for_status()
+        samples["my_bookings"].append(time.perf_counter() - started_at)
+
+    async def loop(step: Callable[[], Awaitable[None]]) -> None:
+        while time.perf_counter() < deadline:
+            await step()
+
+    async with anyio.create_task_group() as tasks:
+        for n in range(logins):
+            tasks.start_soon(loop, lambda n=n: log_in(n))
+        for n in range(readers):
+            tasks.start_soon(loop, lambda auth=headers[n]: read(auth))
+
+    return {
+        name: {**summarize(durations), "rps": round(len(durations) / duration, 1)}
+        for name, durations in samples.items()
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--logins", default="0,1,4,16,64", help="comma-separated concurrent login clients per round")
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    args = parser.parse_args()
+    rounds = [int(n) for n in args.logins.split(",")]
+
+    reset_database()
+    seed_users(max(max(rounds), args.readers, 100))
+    seed_places(100)
+    seed_bookings(args.bookings)
+
+    results = []
+    async with create_client() as client:
+        headers = [await login(client, n) for n in range(args.readers)]
+        for logins in rounds:
+            results.append({"logins": logins, **await run_round(client, headers, logins, args.readers, args.duration)})
+
+    print(json.dumps({"password_hash_workers": settings.PASSWORD_HASH_WORKERS, "rounds": results}, indent=2))
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,130 @@
+"""Tail latency of the API under a mixed read/write load.
+
+Readers, writers and a stats poller hit the app concurrently while a probe keeps calling a route that never touches
+the database. If handlers block the event loop, the probe's p99 grows with the slowest database call.
+
+Usage: python -m benchmarks.mixed_load [--duration 30 --readers 32 --writers 8]
+"""
+
+import argparse
+import datetime
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+import anyio
+import httpx
+
+from benchmarks.client import create_client, login
+from benchmarks.seed import (
+    SLOT_SECONDS,
+    SLOTS_PER_DAY,
+    START_DATE,
+    get_place_ids,
+    reset_database,
+    seed_bookings,
+    seed_places,
+    seed_users,
+    seeded_days,
+)
+from benchmarks.timing import summarize
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=200)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--readers", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--pollers", type=int, default=2)
+    args = parser.parse_args()
+
+    reset_database()
+    seed_users(args.users)
+    seed_places(args.places)
+    seed_bookings(args.bookings)
+    days = seeded_days(args.bookings)
+    place_ids = get_place_ids()
+    future = datetime.date.today() + datetime.timedelta(days=365)
+
+    samples: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async with create_client() as client:
+        headers = [await login(client, n) for n in range(args.readers + args.writers)]
+
+        async def timed(name: str, request: Awaitable[httpx.Response]) -> httpx.Response:
+            started_at = time.perf_counter()
+            response = await request
+            samples[name].append(time.perf_counter() - started_at)
+            statuses[name][response.status_code] += 1
+            return response
+
+        async def read(auth: dict[str, str]) -> None:
+            slot = random.randrange(SLOTS_PER_DAY) * SLOT_SECONDS
+            await timed("my_bookings", client.get("/api/users/me/bookings", headers=auth))
+            await timed(
+                "availability",
+                client.post(
+                    "/api/places/availability",
+                    headers=auth,
+                    json={
+                        "date": str(START_DATE + datetime.timedelta(days=random.randrange(days))),
+                        "start_second": slot,
+                        "end_second": slot + SLOT_SECONDS - 1,
+                    },
+                ),
+            )
+
+        async def write(auth: dict[str, str]) -> None:
+            slot = random.randrange(SLOTS_PER_DAY) * SLOT_SECONDS
+            response = await timed(
+                "create_booking",
+                client.post(
+                    f"/api/places/{random.choice(place_ids)}/bookings",
+                    headers=auth,
+                    json={
+                        "date": str(future + datetime.timedelta(days=random.randrange(30))),
+                        "start_second": slot,
+                        "end_second": slot + SLOT_SECONDS - 1,
+                    },
+                ),
+            )
+            if response.is_success:
+                await timed("delete_booking", client.delete(f"/api/bookings/{response.json()['id']}", headers=auth))
+
+        async def poll_stat() -> None:
+            await timed("stat_users", client.get("/api/stat/users"))
+
+        async def probe() -> None:
+            await timed("probe", client.get("/"))
+            await anyio.sleep(0.01)
+
+        deadline = time.perf_counter() + args.duration
+
+        async def loop(step: Callable[[], Awaitable[None]]) -> None:
+            while time.perf_counter() < deadline:
+                await step()
+
+        async with anyio.create_task_group() as tasks:
+            for n in range(args.readers):
+                tasks.start_soon(loop, lambda auth=headers[n]: read(auth))
+            for n in range(args.writers):
+                tasks.start_soon(loop, lambda auth=headers[args.readers + n]: write(auth))
+            for _ in range(args.pollers):
+                tasks.start_soon(loop, poll_stat)
+            tasks.start_soon(loop, probe)
+
+    results = {
+        name: {**summarize(durations), "rps": round(len(durations) / args.duration, 1), "statuses": statuses[name]}
+        for name, durations in samples.items()
+    }
+    print(json.dumps({"duration": args.duration, "bookings": args.bookings, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,49 @@
+"""Occupancy heatmap over synthetic booking arrays, vectorized against a row-by-row Python loop.
+
+No database is involved: this isolates the interval arithmetic behind /stat/occupancy.
+
+Usage: python -m benchmarks.occupancy [--bookings 1000000]
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.timing import measure
+from src.api.stat.occupancy import DAYS_PER_WEEK, HOURS_PER_DAY, SECONDS_PER_HOUR, occupied_seconds
+
+
+def row_by_row(weekdays: list[int], starts: list[int], ends: list[int]) -> list[list[int]]:
+    grid = [[0] * HOURS_PER_DAY for _ in range(DAYS_PER_WEEK)]
+    for weekday, start, end in zip(weekdays, starts, ends):
+        for hour in range(start // SECONDS_PER_HOUR, (end - 1) // SECONDS_PER_HOUR + 1):
+            grid[weekday][hour] += min(end, (hour + 1) * SECONDS_PER_HOUR) - max(start, hour * SECONDS_PER_HOUR)
+    return grid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    weekdays = rng.integers(0, DAYS_PER_WEEK, args.bookings)
+    starts = rng.integers(8 * SECONDS_PER_HOUR, 20 * SECONDS_PER_HOUR, args.bookings)
+    ends = starts + rng.integers(15 * 60, 4 * SECONDS_PER_HOUR, args.bookings)
+
+    # The service receives Postgres arrays as Python lists, so the conversion is part of the cost
+    lists = weekdays.tolist(), starts.tolist(), ends.tolist()
+    assert occupied_seconds(*lists).tolist() == row_by_row(*lists)
+
+    results = {
+        "bookings": args.bookings,
+        "numpy": measure(lambda: occupied_seconds(*lists), repeat=args.repeat, warmup=1),
+        "row_by_row": measure(lambda: row_by_row(*lists), repeat=max(2, args.repeat // 10), warmup=0),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Latency of the place availability query over a long booking history.
+
+Usage: python -m benchmarks.places_availability [--places 1000 --bookings 1000000]
+"""
+
+import argparse
+import datetime
+import json
+import random
+
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import (
+    ENGINE,
+    SLOT_SECONDS,
+    SLOTS_PER_DAY,
+    START_DATE,
+    reset_database,
+    seed_bookings,
+    seed_places,
+    seed_users,
+    seeded_days,
+)
+from benchmarks.timing import measure
+from src.api.places.schemas import PlaceAvailableRequest
+from src.api.places.service import PlaceService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    reset_database()
+    seed_users(args.users)
+    seed_places(args.places)
+    seed_bookings(args.bookings)
+    days = seeded_days(args.bookings)
+
+    results = {"places": args.places, "bookings": args.bookings}
+    with Session(ENGINE) as session:
+        service = PlaceService(session)
+
+        for role in ("guest", "admin"):
+
+            def get_active_places() -> None:
+                slot = random.randrange(SLOTS_PER_DAY) * SLOT_SECONDS
+                request = PlaceAvailableRequest(
+                    date=START_DATE + datetime.timedelta(days=random.randrange(days)),
+                    start_second=slot,
+                    end_second=slot + SLOT_SECONDS - 1,
+                )
+                service.get_active_places(role, request)
+
+            results[role] = measure(get_active_places, repeat=args.repeat)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
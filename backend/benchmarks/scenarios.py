@@ -0,0 +1,246 @@
+"""Scripted load scenarios against the ASGI app, reported as JSON so that runs can be compared.
+
+- login_storm: clients log in again and again, every login is a bcrypt verify;
+- booking_burst: every client books the same place at the same slot at once, one of them should win each round;
+- availability_polling: clients poll place availability for seeded dates, as the booking page does;
+- stat_dashboard: clients poll the /stat routes behind the admin dashboard.
+
+Each scenario runs for `--duration` seconds with `--concurrency` clients and reports p50/p95/p99 latency and RPS
+per request. With `--baseline`, the relative change of every number against an earlier report is added.
+
+Usage: python -m benchmarks.scenarios [--scenarios login_storm,booking_burst --duration 20 --concurrency 32]
+                                      [--users 1000 --places 200 --bookings 200000 | --no-seed]
+                                      [--output report.json --baseline previous.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import anyio
+import httpx
+
+from benchmarks.client import create_client, login
+from benchmarks.seed import (
+    PASSWORD,
+    SLOT_SECONDS,
+    SLOTS_PER_DAY,
+    START_DATE,
+    USERNAME_PREFIX,
+    count_users,
+    get_place_ids,
+    seed,
+    seeded_days,
+)
+from benchmarks.timing import Recorder
+from src.config import settings
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+@dataclass
+class Setup:
+    client: httpx.AsyncClient
+    headers: list[dict[str, str]]
+    users: int
+    place_ids: list[str]
+    days: int
+    duration: float
+
+
+def random_slot(date: datetime.date) -> dict:
+    start_second = random.randrange(SLOTS_PER_DAY) * SLOT_SECONDS
+    return {"date": str(date), "start_second": start_second, "end_second": start_second + SLOT_SECONDS - 1}
+
+
+async def run_clients(setup: Setup, step: Callable[[int], Awaitable[None]]) -> None:
+    """Runs `step(client_number)` in a loop on every client until the scenario's time is up."""
+
+    deadline = time.perf_counter() + setup.duration
+
+    async def loop(n: int) -> None:
+        while time.perf_counter() < deadline:
+            await step(n)
+
+    async with anyio.create_task_group() as tasks:
+        for n in range(len(setup.headers)):
+            tasks.start_soon(loop, n)
+
+
+# scenarios
+
+
+async def login_storm(setup: Setup, recorder: Recorder) -> dict:
+    async def step(n: int) -> None:
+        username = f"{USERNAME_PREFIX}{random.randrange(setup.users):08d}"
+        await recorder.timed(
+            "login", setup.client.post("/api/auth/login", data={"username": username, "password": PASSWORD})
+        )
+
+    await run_clients(setup, step)
+    return {}
+
+
+async def booking_burst(setup: Setup, recorder: Recorder) -> dict:
+    """Rounds of simultaneous bookings of one place and slot, each round on the next free slot after the history."""
+
+    place_id = setup.place_ids[0]
+    first_day = datetime.date.today() + datetime.timedelta(days=365)
+    deadline = time.perf_counter() + setup.duration
+    rounds = double_booked = 0
+
+    while time.perf_counter() < deadline:
+        start_second = rounds % SLOTS_PER_DAY * SLOT_SECONDS
+        data = {
+            "date": str(first_day + datetime.timedelta(days=rounds // SLOTS_PER_DAY)),
+            "start_second": start_second,
+            "end_second": start_second + SLOT_SECONDS - 1,
+        }
+        winners = 0
+
+        async def book(auth: dict[str, str]) -> None:
+            nonlocal winners
+            response = await recorder.timed(
+                "create_booking", setup.client.post(f"/api/places/{place_id}/bookings", headers=auth, json=data)
+            )
+            winners += response.is_success
+
+        async with anyio.create_task_group() as tasks:
+            for auth in setup.headers:
+                tasks.start_soon(book, auth)
+
+        rounds += 1
+        double_booked += winners > 1
+
+    return {"rounds": rounds, "double_booked": double_booked}
+
+
+async def availability_polling(setup: Setup, recorder: Recorder) -> dict:
+    async def step(n: int) -> None:
+        date = START_DATE + datetime.timedelta(days=random.randrange(setup.days))
+        await recorder.timed(
+            "availability",
+            setup.client.post("/api/places/availability", headers=setup.headers[n], json=random_slot(date)),
+        )
+
+    await run_clients(setup, step)
+    return {}
+
+
+async def stat_dashboard(setup: Setup, recorder: Recorder) -> dict:
+    period = {"from": str(START_DATE), "to": str(START_DATE + datetime.timedelta(days=setup.days - 1))}
+
+    async def step(n: int) -> None:
+        await recorder.timed("stat_total", setup.client.get("/api/stat/total", params=period))
+        await recorder.timed("stat_users", setup.client.get("/api/stat/users", params=period))
+        await recorder.timed("stat_places", setup.client.get("/api/stat/places", params=period))
+        await recorder.timed("stat_occupancy", setup.client.get("/api/stat/occupancy", params=period))
+
+    await run_clients(setup, step)
+    return {}
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "booking_burst": booking_burst,
+    "availability_polling": availability_polling,
+    "stat_dashboard": stat_dashboard,
+}
+
+
+# report
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change of every compared number, for the requests present in both reports."""
+
+    changes = {}
+    for scenario, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            continue
+        for name, numbers in result["requests"].items():
+            before = previous["requests"].get(name)
+            if before is None:
+                continue
+            changes.setdefault(scenario, {})[name] = {
+                key: round((numbers[key] - before[key]) / before[key], 3) if before[key] else None for key in COMPARED
+            }
+    return changes
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--places", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    parser.add_argument("--no-seed", action="store_true", help="reuse what benchmarks.seed left in the database")
+    parser.add_argument("--output", help="write the report to this file as well")
+    parser.add_argument("--baseline", help="earlier report to compare with")
+    args = parser.parse_args()
+    names = args.scenarios.split(",")
+    if unknown := set(names) - SCENARIOS.keys():
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if not args.no_seed:
+        seed(args.users, args.places, args.bookings)
+    users = count_users()
+    if users < args.concurrency:
+        parser.error("every client logs in as its own user, seed at least --concurrency users")
+
+    report = {
+        "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "API_THREADPOOL_SIZE": settings.API_THREADPOOL_SIZE,
+            "POSTGRES_POOL_SIZE": settings.POSTGRES_POOL_SIZE,
+            "PASSWORD_HASH_WORKERS": settings.PASSWORD_HASH_WORKERS,
+        },
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "bookings": args.bookings,
+        "scenarios": {},
+    }
+
+    async with create_client() as client:
+        headers = [await login(client, n) for n in range(args.concurrency)]
+        setup = Setup(client, headers, users, get_place_ids(), seeded_days(args.bookings), args.duration)
+        for name in names:
+            recorder = Recorder()
+            started_at = time.perf_counter()
+            extra = await SCENARIOS[name](setup, recorder)
+            elapsed = time.perf_counter() - started_at
+            report["scenarios"][name] = {"requests": recorder.report(elapsed), **extra}
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["changes"] = compare(report, json.load(file))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    anyio.run(main)
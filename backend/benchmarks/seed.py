@@ -0,0 +1,178 @@
+"""Synthetic data for benchmarks, written straight into the test database with set-based inserts.
+
+Usage: python -m benchmarks.seed [--users 1000 --places 200 --bookings 200000]
+"""
+
+import argparse
+import datetime
+import os
+
+from sqlalchemy import create_engine, text
+
+from src.api.bookings.models import Booking  # noqa: F401
+from src.api.places.models import Place  # noqa: F401
+from src.api.stat.models import REFRESH_BOOKING_STAT
+from src.api.users.models import User  # noqa: F401
+from src.config import settings
+from src.db.models import Base
+from src.security import get_password_hash
+
+ENGINE = create_engine(os.getenv("DATABASE_URL", str(settings.POSTGRES_TEST_URI)))
+
+USERNAME_PREFIX = "bench_user_"
+PLACE_PREFIX = "bench_place_"
+PASSWORD = "H@rdP8ssw0rd"
+START_DATE = datetime.date(2020, 1, 1)
+SLOTS_PER_DAY = 24
+SLOT_SECONDS = 3600
+BOOKING_SECONDS = 3000
+
+
+def reset_database() -> None:
+    Base.metadata.drop_all(bind=ENGINE)
+    Base.metadata.create_all(bind=ENGINE)
+
+
+def seed_users(count: int) -> None:
+    with ENGINE.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO "user" (id, username, password, role, secret_id)
+                SELECT gen_random_uuid(), :prefix || lpad(g::text, 8, '0'), :password, 'student', gen_random_uuid()
+                FROM generate_series(0, :count - 1) AS g
+                """
+            ),
+            {"count": count, "prefix": USERNAME_PREFIX, "password": get_password_hash(PASSWORD)},
+        )
+
+
+def seed_places(count: int) -> None:
+    with ENGINE.begin() as connection:
+        connection.execute(
+            text(
+                """
+                INSERT INTO place (id, name, type, capacity, access_level)
+                SELECT gen_random_uuid(), :prefix || lpad(g::text, 8, '0'), 'seat', 1,
+                       CASE WHEN g % 2 = 0 THEN 'guest' ELSE 'student' END
+                FROM generate_series(0, :count - 1) AS g
+                """
+            ),
+            {"count": count, "prefix": PLACE_PREFIX},
+        )
+
+
+def seed_bookings(count: int, offset: int = 0) -> None:
+    """Appends `count` bookings numbered from `offset`.
+
+    Booking `g` takes place `g % places` at hourly slot `g // places % 24`, so no place is double-booked.
+    Users are spread the same way, which keeps them conflict-free as long as there are at least as many
+    users as places.
+    """
+
+    places = count_places()
+    users = count_users()
+    if users < places:
+        raise ValueError("Для бронирований без пересечений нужно не меньше пользователей, чем мест")
+
+    with ENGINE.begin() as connection:
+        connection.execute(
+            text(
+                """
+                WITH users AS (
+                    SELECT id, row_number() OVER (ORDER BY username) - 1 AS n
+                    FROM "user"
+                    WHERE username LIKE :user_prefix || '%'
+                ), places AS (
+                    SELECT id, row_number() OVER (ORDER BY name) - 1 AS n
+                    FROM place
+                    WHERE name LIKE :place_prefix || '%'
+                )
+                INSERT INTO booking (
+                    id, user_id, place_id, date, start_second, end_second,
+                    is_activated_by_user, notified_start, notified_end
+                )
+                SELECT gen_random_uuid(), users.id, places.id,
+                       CAST(:start_date AS date) + (g / (:places * :slots))::int,
+                       (g / :places % :slots) * :slot_seconds,
+                       (g / :places % :slots) * :slot_seconds + :booking_seconds,
+                       random() < 0.7, true, true
+                FROM generate_series(:offset, :offset + :count - 1) AS g
+                JOIN places ON places.n = g % :places
+                JOIN users ON users.n = g % :users
+                """
+            ),
+            {
+                "count": count,
+                "offset": offset,
+                "places": places,
+                "users": users,
+                "slots": SLOTS_PER_DAY,
+                "slot_seconds": SLOT_SECONDS,
+                "booking_seconds": BOOKING_SECONDS,
+                "start_date": START_DATE,
+                "user_prefix": USERNAME_PREFIX,
+                "place_prefix": PLACE_PREFIX,
+            },
+        )
+        connection.execute(text("ANALYZE booking"))
+
+
+def refresh_booking_stat() -> None:
+    with ENGINE.begin() as connection:
+        connection.execute(text(REFRESH_BOOKING_STAT))
+
+
+def count_users() -> int:
+    with ENGINE.connect() as connection:
+        return connection.execute(
+            text("SELECT count(*) FROM \"user\" WHERE username LIKE :prefix || '%'"), {"prefix": USERNAME_PREFIX}
+        ).scalar_one()
+
+
+def count_places() -> int:
+    with ENGINE.connect() as connection:
+        return connection.execute(
+            text("SELECT count(*) FROM place WHERE name LIKE :prefix || '%'"), {"prefix": PLACE_PREFIX}
+        ).scalar_one()
+
+
+def get_place_ids() -> list[str]:
+    with ENGINE.connect() as connection:
+        return [
+            str(place_id)
+            for place_id in connection.execute(
+                text("SELECT id FROM place WHERE name LIKE :prefix || '%'"), {"prefix": PLACE_PREFIX}
+            ).scalars()
+        ]
+
+
+def seeded_days(bookings: int) -> int:
+    """Number of distinct dates covered by the first `bookings` seeded bookings."""
+
+    return max(1, -(-bookings // (count_places() * SLOTS_PER_DAY)))
+
+
+def seed(users: int, places: int, bookings: int) -> None:
+    """Recreates the schema and seeds `users` users, `places` places and `bookings` past bookings."""
+
+    reset_database()
+    seed_users(users)
+    seed_places(places)
+    seed_bookings(bookings)
+    refresh_booking_stat()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--places", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    args = parser.parse_args()
+
+    seed(args.users, args.places, args.bookings)
+    print(f"users: {count_users()}, places: {count_places()}, bookings: {args.bookings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Statement count and latency of the /stat aggregations.
+
+`legacy_total` replays what `get_total_stat` used to do, five separate scans over booking, next to the current
+single pass over the booking_stat rollup.
+
+Usage: python -m benchmarks.stat_queries [--users 1000 --places 1000 --bookings 1000000]
+"""
+
+import argparse
+import json
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import (
+    ENGINE,
+    refresh_booking_stat,
+    reset_database,
+    seed_bookings,
+    seed_places,
+    seed_users,
+)
+from benchmarks.timing import measure
+from src.api.bookings.models import Booking
+from src.api.stat.service import StatService
+from tests.utils.queries import count_queries
+
+
+def legacy_total(session: Session) -> dict:
+    total_bookings = session.query(func.count(Booking.id)).scalar()
+    total_visits = session.query(func.count(Booking.id)).filter(Booking.is_activated_by_user.is_(True)).scalar()
+    conversion_bookings = session.query(func.count(Booking.id)).scalar()
+    conversion_visits = session.query(func.count(Booking.id)).filter(Booking.is_activated_by_user.is_(True)).scalar()
+    avg_time = session.query(func.avg(Booking.end_second - Booking.start_second)).scalar()
+    return {
+        "total_bookings": total_bookings,
+        "total_visits": total_visits,
+        "total_conversion_rate": conversion_visits / conversion_bookings if conversion_bookings else 0,
+        "total_avg_booking_time": int(avg_time) if avg_time is not None else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    reset_database()
+    seed_users(args.users)
+    seed_places(args.places)
+    seed_bookings(args.bookings)
+    refresh_booking_stat()
+
+    results = {"bookings": args.bookings}
+    with Session(ENGINE) as session:
+        service = StatService(session)
+        cases = {
+            "legacy_total": lambda: legacy_total(session),
+            "total": service.get_total_stat,
+            "by_user": service.get_stat_aggregated_by_user,
+            "by_place": service.get_stat_aggregated_by_place,
+        }
+
+        for name, fn in cases.items():
+            with count_queries(ENGINE) as statements:
+                fn()
+            results[name] = {"statements": len(statements), **measure(fn, repeat=args.repeat)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency percentiles in milliseconds for a list of durations in seconds."""
+
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentiles[49] * 1000, 3),
+        "p95_ms": round(percentiles[94] * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 5) -> dict[str, float]:
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started_at)
+
+    return summarize(samples)
+
+
+class Recorder:
+    """Durations and status codes of the requests of a load run, grouped by request name."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter[int]] = defaultdict(Counter)
+
+    async def timed(self, name: str, request: Awaitable[Any]) -> Any:
+        started_at = time.perf_counter()
+        response = await request
+        self.samples[name].append(time.perf_counter() - started_at)
+        self.statuses[name][response.status_code] += 1
+        return response
+
+    def report(self, duration: float) -> dict[str, dict]:
+        return {
+            name: {
+                **summarize(durations),
+                "rps": round(len(durations) / duration, 1),
+                "statuses": {str(status): count for status, count in sorted(self.statuses[name].items())},
+            }
+            for name, durations in self.samples.items()
+        }
@@ -1,14 +1,16 @@
 from fastapi import APIRouter
 
-from src.api import auth, bookings, places, stat, users
+from src.api import auth, bookings, debug, places, stat, users
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", route_class=TracedRoute)
 
 router.include_router(auth.router)
 router.include_router(users.router)
 router.include_router(places.router)
 router.include_router(bookings.router)
 router.include_router(stat.router)
+router.include_router(debug.router)
 
 __all__ = [
     "router",
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 
 from src.api.auth.deps import PasswordRequestFormDepends
 from src.api.auth.schemas import AccessTokenResponse
@@ -7,9 +8,10 @@ from src.api.users.deps import UserServiceDepends
 from src.api.users.schemas import UserRegistrationRequest
 from src.config import settings
 from src.limiter import limiter
-from src.security import create_access_token, is_valid_password
+from src.security import create_access_token, hash_password, verify_password
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/auth", tags=[Tag.AUTH])
+router = APIRouter(prefix="/auth", tags=[Tag.AUTH], route_class=TracedRoute)
 
 
 @router.post(
@@ -28,10 +30,11 @@ router = APIRouter(prefix="/auth", tags=[Tag.AUTH])
 )
 @limiter.limit(settings.API_RATE_LIMIT)
 async def register(request: Request, args: UserRegistrationRequest, service: UserServiceDepends) -> AccessTokenResponse:
-    if service.get_user_by_username(args.username):
+    if await run_in_threadpool(service.get_user_by_username, args.username):
         raise HTTPException(status.HTTP_409_CONFLICT, "Имя пользователя занято.")
 
-    user = service.register_user(args)
+    hashed_password = await hash_password(args.password)
+    user = await run_in_threadpool(service.register_user, args, hashed_password)
 
     return create_access_token(user.id)
 
@@ -55,11 +58,11 @@ async def register(request: Request, args: UserRegistrationRequest, service: Use
 )
 @limiter.limit(settings.API_RATE_LIMIT)
 async def login(request: Request, form: PasswordRequestFormDepends, service: UserServiceDepends) -> AccessTokenResponse:
-    user = service.get_user_by_username(form.username)
+    user = await run_in_threadpool(service.get_user_by_username, form.username)
 
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Пользователь не найден.")
-    if not is_valid_password(form.password, user.password):
+    if not await verify_password(form.password, user.password):
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Некорректный пароль.")
 
     return create_access_token(user.id)
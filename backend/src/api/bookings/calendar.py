@@ -9,7 +9,7 @@ from src.api.bookings.models import Booking
 from src.config import settings
 
 
-async def generate_ics(booking: Booking):
+def generate_ics(booking: Booking) -> str:
     cal = Calendar()
 
     event = Event()
@@ -28,9 +28,7 @@ async def generate_ics(booking: Booking):
     return cal.serialize()
 
 
-async def send_email(booking: Booking, recipient: str):
-    ics_content = await generate_ics(booking)
-
+async def send_email(ics_content: str, recipient: str):
     with tempfile.NamedTemporaryFile(delete=False, suffix=".ics") as temp_file:
         temp_file.write(ics_content.encode("utf-8"))
         temp_file_path = temp_file.name
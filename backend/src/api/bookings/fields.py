@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class BookingConflictEnum(str, Enum):
+    place = "place"
+    user = "user"
@@ -0,0 +1,50 @@
+"""Booking counters labelled only from small sets, so the number of series stays flat however many users sign up.
+
+Per-user numbers are exported separately from the booking_stat rollup, see `src.api.stat.metrics`.
+"""
+
+import threading
+
+from prometheus_client import Counter
+
+from src.api.places.models import Place
+from src.api.users.models import User
+from src.config import settings
+
+ROLES = frozenset({"admin", "student", "guest"})
+PLACE_TYPES = frozenset({"seat", "room"})
+OTHER = "other"
+
+
+class BoundedLabel:
+    """Passes the first `max_values` distinct values through and reports every later one as "other"."""
+
+    def __init__(self, max_values: int) -> None:
+        self.max_values = max_values
+        self._values: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, value: str) -> str:
+        if value in self._values:
+            return value
+        with self._lock:
+            if len(self._values) < self.max_values:
+                self._values.add(value)
+                return value
+        return OTHER
+
+
+place_label = BoundedLabel(settings.METRICS_MAX_PLACES)
+
+new_bookings_count = Counter("new_bookings_total", "Total number of new bookings", ["role", "place_type", "place"])
+bookings_activated_count = Counter(
+    "bookings_activated_total", "Total number of bookings activated", ["role", "place_type", "place"]
+)
+
+
+def booking_labels(user: User, place: Place) -> dict[str, str]:
+    return {
+        "role": user.role if user.role in ROLES else OTHER,
+        "place_type": place.type if place.type in PLACE_TYPES else OTHER,
+        "place": place_label(place.name),
+    }
@@ -2,8 +2,8 @@ import datetime
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, Computed, ForeignKey, Index, event, text
+from sqlalchemy.dialects.postgresql import INT4RANGE, UUID, ExcludeConstraint, Range
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.mixins import AuditMixin
@@ -15,15 +15,49 @@ if TYPE_CHECKING:
 
 
 class Booking(Base, AuditMixin):
+    __table_args__ = (
+        # A place and a user can each hold only one booking at a time; both constraints are backed by GiST indexes
+        ExcludeConstraint(
+            ("place_id", "="),
+            ("date", "="),
+            ("time_range", "&&"),
+            name="booking_place_id_time_range_excl",
+            using="gist",
+        ),
+        ExcludeConstraint(
+            ("user_id", "="),
+            ("date", "="),
+            ("time_range", "&&"),
+            name="booking_user_id_time_range_excl",
+            using="gist",
+        ),
+        # The notification scheduler re-reads only the bookings changed since its last pass
+        Index("ix_booking_updated_at", "updated_at"),
+        # Expiry looks for unvisited bookings that have already started; visited ones pile up and are left out
+        Index(
+            "ix_booking_unvisited_date_start_second",
+            "date",
+            "start_second",
+            postgresql_where=text("NOT is_activated_by_user"),
+        ),
+    )
+
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[str] = mapped_column(ForeignKey("user.id", ondelete="SET NULL"))
     place_id: Mapped[str] = mapped_column(ForeignKey("place.id", ondelete="SET NULL"))
-    date: Mapped[datetime.date] = mapped_column()
+    date: Mapped[datetime.date] = mapped_column(index=True)
     start_second: Mapped[int] = mapped_column()
     end_second: Mapped[int] = mapped_column()
+    time_range: Mapped[Range[int]] = mapped_column(
+        INT4RANGE, Computed("int4range(start_second, end_second)", persisted=True)
+    )
     is_activated_by_user: Mapped[bool] = mapped_column(default=False)
     notified_start: Mapped[bool] = mapped_column(default=False)
     notified_end: Mapped[bool] = mapped_column(default=False)
 
     user: Mapped["User"] = relationship(back_populates="bookings")
     place: Mapped["Place"] = relationship(back_populates="bookings")
+
+
+# GiST exclusion constraints over (uuid, date, int4range) need btree_gist operator classes for the scalar columns
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
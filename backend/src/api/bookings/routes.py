@@ -4,13 +4,16 @@ from datetime import datetime, time, timedelta
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, StreamingResponse
-from prometheus_client import Counter
 
 from src.api.bookings.calendar import generate_ics, send_email
 from src.api.bookings.deps import BookingsServiceDepends
+from src.api.bookings.fields import BookingConflictEnum
+from src.api.bookings.metrics import booking_labels, bookings_activated_count, new_bookings_count
 from src.api.bookings.params import DateParams
 from src.api.bookings.schemas import ActivateBookingRequest, BookingResponse, CreateBookingRequest, UpdateBookingRequest
+from src.api.bookings.service import BookingConflictError
 from src.api.places.deps import PlacesServiceDepends
 from src.api.tags import Tag
 from src.api.users.deps import UserServiceDepends
@@ -18,13 +21,9 @@ from src.api.users.me.deps import CurrentUserDepends
 from src.api.users.schemas import UserEmailRequest
 from src.config import settings
 from src.limiter import limiter
+from src.tracing import TracedRoute
 
-new_bookings_count = Counter("new_bookings_total", "Total number of new bookings", ["place_id", "user_id", "role"])
-bookings_activated_count = Counter(
-    "bookings_activated_total", "Total number of bookings activated", ["place_id", "user_id", "role"]
-)
-
-router = APIRouter(prefix="", tags=[Tag.BOOKINGS])
+router = APIRouter(prefix="", tags=[Tag.BOOKINGS], route_class=TracedRoute)
 
 
 @router.get(
@@ -40,28 +39,13 @@ router = APIRouter(prefix="", tags=[Tag.BOOKINGS])
     description="Эта ручка позволяет получить все бронирования пользователя.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_bookings_by_user(
+def get_bookings_by_user(
     request: Request,
     current_user: CurrentUserDepends,
     booking_service: BookingsServiceDepends,
-    place_service: PlacesServiceDepends,
 ):
     bookings = booking_service.get_bookings_by_user(current_user.id)
-
-    response_list = []
-    for booking in bookings:
-        response = BookingResponse(
-            id=booking.id,
-            date=booking.date,
-            start_second=booking.start_second,
-            end_second=booking.end_second,
-            user=current_user.to_response(),
-            place=place_service.get_place_by_id(booking.place_id).to_response(),
-            is_activated_by_user=booking.is_activated_by_user,
-        )
-        response_list.append(response)
-
-    return response_list
+    return booking_service.to_responses(bookings)
 
 
 @router.post(
@@ -80,7 +64,7 @@ async def get_bookings_by_user(
     description="Эта ручка позволяет создать бронирование.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def create_booking(
+def create_booking(
     request: Request,
     current_user: CurrentUserDepends,
     place_id: uuid.UUID,
@@ -92,22 +76,19 @@ async def create_booking(
     if place is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Место не найдено.")
 
-    if not booking_service.is_data_valid(
-        date=data.date, start_second=data.start_second, end_second=data.end_second, place_id=place_id
-    ):
-        raise HTTPException(status.HTTP_409_CONFLICT, detail="Бронирование на эту дату уже существует.")
-
-    if not booking_service.user_have_not_booking_on_date(
-        date=data.date, start_second=data.start_second, end_second=data.end_second, user_id=current_user.id
-    ):
-        raise HTTPException(status.HTTP_409_CONFLICT, detail="У Вас уже есть бронирование на данную дату и время")
-
     logging.warning("Caution - may be difference in timezones")
     logging.warning(f"Booking start {data.start_second // 3600}:{data.start_second % 3600 // 60}")
     logging.warning(f"Booking end {data.end_second // 3600}:{data.end_second % 3600 // 60}")
-    booking = booking_service.create_booking(data=data, place_id=place_id, user_id=current_user.id)
+    try:
+        booking = booking_service.create_booking(data=data, place_id=place_id, user_id=current_user.id)
+    except BookingConflictError as e:
+        if e.conflict == BookingConflictEnum.place:
+            raise HTTPException(status.HTTP_409_CONFLICT, detail="Бронирование на эту дату уже существует.") from None
+        raise HTTPException(
+            status.HTTP_409_CONFLICT, detail="У Вас уже есть бронирование на данную дату и время"
+        ) from None
 
-    new_bookings_count.labels(place_id=booking.place.name, user_id=current_user.id, role=current_user.role).inc()
+    new_bookings_count.labels(**booking_labels(current_user, booking.place)).inc()
 
     response = BookingResponse(
         id=booking.id,
@@ -134,7 +115,7 @@ async def create_booking(
     description="Эта ручка позволяет создать получить все бронирования по месту.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_bookings_by_place(
+def get_bookings_by_place(
     request: Request,
     current_user: CurrentUserDepends,
     place_id: uuid.UUID,
@@ -147,21 +128,7 @@ async def get_bookings_by_place(
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Место не найдено.")
 
     bookings = booking_service.get_bookings_by_place_with_date_params(place_id, date_params)
-    response_list = []
-
-    for booking in bookings:
-        response = BookingResponse(
-            id=booking.id,
-            date=booking.date,
-            start_second=booking.start_second,
-            end_second=booking.end_second,
-            user=booking.user.to_response(),
-            place=place_service.get_place_by_id(booking.place_id).to_response(),
-            is_activated_by_user=booking.is_activated_by_user,
-        )
-        response_list.append(response)
-
-    return response_list
+    return booking_service.to_responses(bookings)
 
 
 @router.get(
@@ -180,7 +147,7 @@ async def get_bookings_by_place(
     description="Эта ручка позволяет получить бронирование по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_booking(
+def get_booking(
     request: Request,
     current_user: CurrentUserDepends,
     booking_id: uuid.UUID,
@@ -230,7 +197,7 @@ async def get_booking(
     description="Эта ручка позволяет обновить бронирование по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_booking(
+def update_booking(
     request: Request,
     current_user: CurrentUserDepends,
     booking_id: uuid.UUID,
@@ -261,21 +228,14 @@ async def update_booking(
     ):
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Вы не можете изменять данное бронирование.")
 
-    # Если уже есть бронь на это время на этом месте
-    if not booking_service.is_data_valid(data.date, data.start_second, data.end_second, new_place.id, booking_id):
-        raise HTTPException(status.HTTP_409_CONFLICT, detail="Место уже занято на это время")
-
-    # Если у пользователя есть бронь на это время, но она не совпадает с текущей
-    if not booking_service.user_have_not_booking_on_date(
-        date=data.date,
-        start_second=data.start_second,
-        end_second=data.end_second,
-        user_id=current_user.id,
-        booking_id=booking_id,
-    ):
-        raise HTTPException(status.HTTP_409_CONFLICT, detail="У Вас уже есть бронь на это время")
-
-    booking_service.update_booking(booking_id=booking_id, data=data)
+    try:
+        booking_service.update_booking(booking_id=booking_id, data=data)
+    except BookingConflictError as e:
+        # Если уже есть бронь на это время на этом месте
+        if e.conflict == BookingConflictEnum.place:
+            raise HTTPException(status.HTTP_409_CONFLICT, detail="Место уже занято на это время") from None
+        # Если у пользователя есть бронь на это время, но она не совпадает с текущей
+        raise HTTPException(status.HTTP_409_CONFLICT, detail="У Вас уже есть бронь на это время") from None
     return HTTPException(status.HTTP_204_NO_CONTENT)
 
 
@@ -294,7 +254,7 @@ async def update_booking(
     description="Эта ручка позволяет получить удалить по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def delete_booking(
+def delete_booking(
     request: Request,
     current_user: CurrentUserDepends,
     booking_id: uuid.UUID,
@@ -322,7 +282,7 @@ async def delete_booking(
     description="Эта ручка позволяет получить бронирование пользователя на текущую дату.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_current_booking(
+def get_current_booking(
     request: Request,
     current_user: CurrentUserDepends,
     booking_service: BookingsServiceDepends,
@@ -352,7 +312,7 @@ async def get_current_booking(
     description="Эта ручка позволяет активировать бронирование по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def activate_booking(
+def activate_booking(
     request: Request,
     current_user: CurrentUserDepends,
     booking_id: str,
@@ -376,7 +336,7 @@ async def activate_booking(
 
     booking_service.activate_booking(booking_id=booking_id)
 
-    bookings_activated_count.labels(place_id=booking.place.name, user_id=user.id, role=user.role).inc()
+    bookings_activated_count.labels(**booking_labels(user, booking.place)).inc()
 
     return HTTPException(status.HTTP_204_NO_CONTENT)
 
@@ -396,7 +356,7 @@ async def activate_booking(
     description="Эта ручка позволяет получить файл .ics бронирования по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_ics_file(
+def get_ics_file(
     request: Request,
     current_user: CurrentUserDepends,
     booking_id: str,
@@ -417,7 +377,7 @@ async def get_ics_file(
     ):
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Бронирование не принадлежит пользователю.")
 
-    ics_file = await generate_ics(booking)
+    ics_file = generate_ics(booking)
     return StreamingResponse(
         ics_file,
         media_type="text/calendar",
@@ -448,20 +408,22 @@ async def send_mail(
     user_service: UserServiceDepends,
     data: UserEmailRequest,
 ):
-    booking = booking_service.get_booking_by_id(booking_id)
+    booking = await run_in_threadpool(booking_service.get_booking_by_id, booking_id)
     if booking is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Бронирование не найдено.")
 
-    user = user_service.get_user_by_id(current_user.id)
+    user = await run_in_threadpool(user_service.get_user_by_id, current_user.id)
     if user is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Пользователь не найден.")
 
     if (
-        not booking_service.is_booking_created_by_user(booking_id=booking_id, user_id=user.id)
+        not await run_in_threadpool(booking_service.is_booking_created_by_user, booking_id=booking_id, user_id=user.id)
         and current_user.role != "admin"
     ):
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Бронирование не принадлежит пользователю.")
 
-    await send_email(booking, data.email)
+    # Сборка .ics лениво подгружает место брони, поэтому тоже уходит из event loop.
+    ics_content = await run_in_threadpool(generate_ics, booking)
+    await send_email(ics_content, data.email)
 
     return JSONResponse({"message": f"ICS событие отправлено на {data.email}"})
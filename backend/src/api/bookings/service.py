@@ -1,16 +1,34 @@
 import datetime
 import logging
 import uuid
-from operator import and_
-from typing import Optional
+from typing import Iterable
 
-from sqlalchemy import or_
+from sqlalchemy import delete, func, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
+from src.api.bookings.fields import BookingConflictEnum
 from src.api.bookings.models import Booking
 from src.api.bookings.params import DateParams
-from src.api.bookings.schemas import CreateBookingRequest, UpdateBookingRequest
+from src.api.bookings.schemas import BookingResponse, CreateBookingRequest, UpdateBookingRequest
+from src.api.notifications.models import NotificationOutbox
+from src.api.notifications.service import NotificationOutboxService
+from src.api.users.models import User
 from src.db.deps import SessionDepends
 
+CONFLICT_CONSTRAINTS = {
+    "booking_place_id_time_range_excl": BookingConflictEnum.place,
+    "booking_user_id_time_range_excl": BookingConflictEnum.user,
+}
+
+
+class BookingConflictError(Exception):
+    """Raised when a booking write is rejected by one of the no-overlap exclusion constraints."""
+
+    def __init__(self, conflict: BookingConflictEnum) -> None:
+        super().__init__(conflict.value)
+        self.conflict = conflict
+
 
 class BookingService:
     def __init__(self, session: SessionDepends) -> None:
@@ -24,46 +42,59 @@ class BookingService:
                 Booking.date == date_params.date,
                 or_(Booking.start_second >= date_params.start_second, Booking.end_second <= date_params.end_second),
             )
+            .options(joinedload(Booking.place), joinedload(Booking.user))
             .all()
         )
 
     def get_bookings_by_user(self, user_id: uuid.UUID) -> list[Booking]:
-        return self.session.query(Booking).filter(Booking.user_id == user_id).all()
+        return (
+            self.session.query(Booking)
+            .filter(Booking.user_id == user_id)
+            .options(joinedload(Booking.place), joinedload(Booking.user))
+            .all()
+        )
 
-    def get_booking_by_id(self, booking_id: uuid.UUID) -> Booking | None:
-        return self.session.query(Booking).filter(Booking.id == booking_id).first()
+    @staticmethod
+    def to_responses(bookings: Iterable[Booking]) -> list[BookingResponse]:
+        """Serializes bookings, building the response of each distinct user and place only once.
 
-    def is_data_valid(
-        self,
-        date: datetime.date,
-        start_second: int,
-        end_second: int,
-        place_id: str,
-        current_booking_id: Optional[str] = None,
-    ) -> bool:
-        """
-        Checks if the given booking request is valid by verifying that there are no overlapping bookings
-        for the same place and date, except for the current booking (booking_id).
-        Returns True if the booking is valid (no overlap with others), otherwise False.
+        The bookings are expected to come with `user` and `place` already loaded, see `get_bookings_by_user`.
         """
 
-        overlapping_booking = (
-            self.session.query(Booking)
-            .filter(
-                Booking.place_id == place_id,
-                Booking.date == date,
-                Booking.id != current_booking_id,  # Exclude the current booking from the check
-                or_(
-                    and_(Booking.start_second < end_second, Booking.end_second > start_second),
-                    and_(Booking.start_second >= start_second, Booking.start_second < end_second),
-                ),
+        users = {}
+        places = {}
+        responses = []
+
+        for booking in bookings:
+            if booking.user_id not in users:
+                users[booking.user_id] = booking.user.to_response()
+            if booking.place_id not in places:
+                places[booking.place_id] = booking.place.to_response()
+
+            responses.append(
+                BookingResponse(
+                    id=booking.id,
+                    date=booking.date,
+                    start_second=booking.start_second,
+                    end_second=booking.end_second,
+                    user=users[booking.user_id],
+                    place=places[booking.place_id],
+                    is_activated_by_user=booking.is_activated_by_user,
+                )
             )
-            .first()
-        )
 
-        return overlapping_booking is None
+        return responses
+
+    def get_booking_by_id(self, booking_id: uuid.UUID) -> Booking | None:
+        return self.session.query(Booking).filter(Booking.id == booking_id).first()
 
     def create_booking(self, data: CreateBookingRequest, place_id: str, user_id: str) -> Booking:
+        """Inserts the booking, relying on the exclusion constraints to reject overlaps.
+
+        Raises:
+            BookingConflictError: If the place or the user is already booked at that time.
+        """
+
         new_booking = Booking(
             user_id=user_id,
             place_id=place_id,
@@ -72,7 +103,7 @@ class BookingService:
             date=data.date,
         )
         self.session.add(new_booking)
-        self.session.commit()
+        self._commit()
         return new_booking
 
     def delete_booking(self, booking_id: uuid.UUID):
@@ -83,12 +114,23 @@ class BookingService:
         return self.session.query(Booking).filter(Booking.place_id == place_id, Booking.id == booking_id).first()
 
     def update_booking(self, booking_id: uuid.UUID, data: UpdateBookingRequest):
-        booking = self.session.query(Booking).filter(Booking.id == booking_id).first()
-        booking.date = data.date
-        booking.start_second = data.start_second
-        booking.end_second = data.end_second
-        booking.place_id = data.place_id
-        self.session.commit()
+        """Moves the booking with a single UPDATE, relying on the exclusion constraints to reject overlaps.
+
+        Raises:
+            BookingConflictError: If the place or the user is already booked at that time.
+        """
+
+        self.session.execute(
+            update(Booking)
+            .where(Booking.id == booking_id)
+            .values(
+                date=data.date,
+                start_second=data.start_second,
+                end_second=data.end_second,
+                place_id=data.place_id,
+            )
+        )
+        self._commit()
 
     def is_booking_created_by_user(self, booking_id: uuid.UUID, user_id: uuid.UUID) -> bool:
         booking = self.session.query(Booking).filter(Booking.id == booking_id).first()
@@ -100,22 +142,42 @@ class BookingService:
 
         self.session.commit()
 
-    def user_have_not_booking_on_date(
-        self, date: datetime.date, start_second: int, end_second: int, user_id: str, booking_id: str | None = None
-    ) -> bool | Booking:
-        overlapping_booking = self.session.query(Booking).filter(
-            Booking.user_id == user_id,
-            Booking.date == date,
-            or_(
-                and_(Booking.start_second < end_second, Booking.end_second > start_second),
-                and_(Booking.start_second >= start_second, Booking.start_second < end_second),
-            ),
+    def delete_expired_bookings(self, cutoff: datetime.datetime, message: str) -> tuple[int, int]:
+        """Deletes the unvisited bookings that started at or before `cutoff` and queues `message` to their users.
+
+        Deleting and queueing are one statement, so nobody is told about a deletion that was rolled back.
+        Returns how many bookings were deleted and how many messages were queued.
+        """
+
+        # Row comparison on (date, start_second) also holds across midnight, and is served by the partial index
+        # over unvisited bookings
+        cutoff_second = cutoff.hour * 3600 + cutoff.minute * 60 + cutoff.second
+        expired = (
+            delete(Booking)
+            .where(
+                tuple_(Booking.date, Booking.start_second) <= tuple_(cutoff.date(), cutoff_second),
+                Booking.is_activated_by_user.is_(False),
+            )
+            .returning(Booking.id, Booking.user_id)
+            .cte("expired")
+        )
+        recipients = (
+            select(expired.c.id.label("booking_id"), User.telegram_id.label("chat_id"))
+            .join(User, User.id == expired.c.user_id)
+            .subquery()
+        )
+        queued = (
+            NotificationOutboxService.insert_from(recipients, message).returning(NotificationOutbox.id).cte("queued")
         )
-        if booking_id:
-            overlapping_booking = overlapping_booking.filter(Booking.id != booking_id)
-        overlapping_booking = overlapping_booking.first()
 
-        return overlapping_booking is None
+        row = self.session.execute(
+            select(
+                select(func.count()).select_from(expired).scalar_subquery().label("deleted"),
+                select(func.count()).select_from(queued).scalar_subquery().label("queued"),
+            )
+        ).one()
+        self.session.commit()
+        return row.deleted, row.queued
 
     def get_current_booking(self, user_id: uuid.UUID) -> Booking | None:
         now = datetime.datetime.now() + datetime.timedelta(hours=3)
@@ -135,3 +197,13 @@ class BookingService:
         )
 
         return booking
+
+    def _commit(self) -> None:
+        try:
+            self.session.commit()
+        except IntegrityError as e:
+            self.session.rollback()
+            conflict = CONFLICT_CONSTRAINTS.get(getattr(getattr(e.orig, "diag", None), "constraint_name", None))
+            if conflict is None:
+                raise
+            raise BookingConflictError(conflict) from None
@@ -0,0 +1,5 @@
+from src.api.debug.routes import router
+
+__all__ = [
+    "router",
+]
@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, status
+
+from src.api.debug.params import ProfileParams
+from src.config import settings
+
+
+def require_profiling_enabled() -> None:
+    """Router dependency, so that a deployment without profiling answers 404 before any auth or validation."""
+
+    if not settings.DEBUG_PROFILE_ENABLED:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Профилирование отключено.")
+
+
+def get_profile_params(params: ProfileParams = Depends(ProfileParams)) -> ProfileParams:
+    if params.seconds > settings.DEBUG_PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            f"Профилирование длится не больше {settings.DEBUG_PROFILE_MAX_SECONDS} секунд.",
+        )
+    return params
+
+
+ProfileParamsDepends = Annotated[ProfileParams, Depends(get_profile_params)]
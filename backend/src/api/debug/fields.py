@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ProfileFormatEnum(str, Enum):
+    collapsed = "collapsed"
+    speedscope = "speedscope"
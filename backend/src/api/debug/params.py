@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+from pydantic import confloat
+
+from src.api.debug.fields import ProfileFormatEnum
+
+
+@dataclass
+class ProfileParams:
+    seconds: confloat(gt=0) = 10
+    format: ProfileFormatEnum = ProfileFormatEnum.collapsed
+    # Include threads that are parked waiting for work, they hide the busy ones otherwise
+    idle: bool = False
@@ -0,0 +1,118 @@
+"""Statistical wall-clock profiler for the running worker.
+
+A background thread wakes up every `interval` seconds, takes the current stack of every other thread from
+`sys._current_frames()` and counts identical stacks. Nothing is hooked into the interpreter, so the profiled code
+runs at full speed and the cost is one stack walk per thread per sample.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import NamedTuple
+
+
+class Frame(NamedTuple):
+    name: str
+    file: str
+    line: int
+
+
+# Innermost frames of threads waiting for work rather than doing any
+IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select")}
+
+
+def short_path(path: str) -> str:
+    _, marker, rest = path.rpartition("site-packages" + os.sep)
+    return rest if marker else os.path.relpath(path)
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float, idle: bool = False) -> None:
+        self.interval = interval
+        self.idle = idle
+        # Stacks are stored root first, keyed by thread name
+        self.stacks: Counter[tuple[str, tuple[Frame, ...]]] = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+
+            code = frame.f_code
+            if not self.idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(Frame(code.co_name, short_path(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+            self.stacks[names.get(ident, str(ident)), tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self) -> None:
+        started_at = time.perf_counter()
+        next_sample = started_at
+        while not self._stopped.is_set():
+            self.sample()
+            next_sample += self.interval
+            self._stopped.wait(max(next_sample - time.perf_counter(), 0))
+        self.duration = time.perf_counter() - started_at
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # output
+
+    def to_collapsed(self) -> str:
+        """One `thread;outer;...;inner count` line per stack, the input of flamegraph.pl and speedscope."""
+
+        lines = []
+        for (thread, stack), count in self.stacks.most_common():
+            frames = ";".join(f"{frame.name} ({frame.file}:{frame.line})" for frame in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str) -> dict:
+        """A sampled profile per thread in the speedscope file format, weighted in seconds."""
+
+        frames: dict[Frame, int] = {}
+        profiles: dict[str, dict] = {}
+        for (thread, stack), count in self.stacks.items():
+            profile = profiles.setdefault(
+                thread,
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            profile["samples"].append([frames.setdefault(frame, len(frames)) for frame in stack])
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": name,
+            "shared": {"frames": [frame._asdict() for frame in frames]},
+            "profiles": list(profiles.values()),
+        }
@@ -0,0 +1,75 @@
+import asyncio
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.api.debug.deps import ProfileParamsDepends, require_profiling_enabled
+from src.api.debug.fields import ProfileFormatEnum
+from src.api.debug.profiler import SamplingProfiler
+from src.api.tags import Tag
+from src.api.users.me.deps import CurrentUserDepends
+from src.config import settings
+from src.limiter import limiter
+from src.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/debug",
+    tags=[Tag.DEBUG],
+    route_class=TracedRoute,
+    dependencies=[Depends(require_profiling_enabled)],
+)
+
+# One profile per worker at a time, two samplers would only measure each other
+profile_lock = asyncio.Lock()
+
+
+@router.get(
+    "/profile",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"text/plain": {}, "application/json": {}},
+            "description": "Collapsed stacks or a speedscope profile",
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User not allowed to profile the server",
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Profiling is disabled",
+        },
+        status.HTTP_409_CONFLICT: {
+            "description": "A profile is already being taken in this worker",
+        },
+    },
+    summary="Профилирование воркера",
+    description=(
+        "Эта ручка позволяет администратору снять профиль обрабатывающего запрос воркера: в течение `seconds` "
+        "секунд стеки всех потоков записываются с интервалом `DEBUG_PROFILE_INTERVAL_SECONDS`. "
+        "Результат отдаётся в виде свёрнутых стеков (`collapsed`) или файла для speedscope (`speedscope`). "
+        "Ручка доступна, только если включена настройка `DEBUG_PROFILE_ENABLED`."
+    ),
+)
+@limiter.limit(settings.API_RATE_LIMIT)
+async def get_profile(request: Request, current_user: CurrentUserDepends, params: ProfileParamsDepends):
+    if current_user.role != "admin":
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Профилирование доступно только администраторам.")
+    if profile_lock.locked():
+        raise HTTPException(status.HTTP_409_CONFLICT, detail="Профиль этого воркера уже снимается.")
+
+    async with profile_lock:
+        profiler = SamplingProfiler(settings.DEBUG_PROFILE_INTERVAL_SECONDS, idle=params.idle)
+        profiler.start()
+        try:
+            await asyncio.sleep(params.seconds)
+        finally:
+            # Joining the sampler may wait out a whole interval, which must not block the event loop
+            await anyio.to_thread.run_sync(profiler.stop)
+
+    if params.format == ProfileFormatEnum.speedscope:
+        return JSONResponse(
+            profiler.to_speedscope(f"{settings.APP_NAME} {request.url.path}"),
+            headers={"Content-Disposition": "attachment; filename=profile.speedscope.json"},
+        )
+    return profiler.to_collapsed()
@@ -0,0 +1,28 @@
+import datetime
+import uuid
+
+from sqlalchemy import BigInteger, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.mixins import AuditMixin
+from src.db.models import Base
+
+
+class NotificationOutbox(Base, AuditMixin):
+    """A message waiting to be delivered, deleted once it is.
+
+    Rows are written in the same transaction as the booking change they announce and drained by
+    `src.api.notifications.worker`.
+    """
+
+    # Rows are mostly inserted by INSERT ... SELECT, which needs the id generated per row on the server
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid()
+    )
+    # Kept without a foreign key: the booking may be gone by the time its message is sent
+    booking_id: Mapped[str] = mapped_column(UUID(as_uuid=True), nullable=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    text: Mapped[str] = mapped_column()
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    available_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now(), index=True)
@@ -0,0 +1,85 @@
+import datetime
+import uuid
+
+from sqlalchemy import CTE, Insert, delete, func, insert, literal, select, update
+
+from src.api.notifications.models import NotificationOutbox
+from src.db.deps import SessionDepends
+
+
+class NotificationOutboxService:
+    def __init__(self, session: SessionDepends) -> None:
+        self.session = session
+
+    @staticmethod
+    def insert_from(source, text: str) -> Insert:
+        """INSERT of `text` for every row of `source` that has a `chat_id`, `source` also providing `booking_id`."""
+
+        return insert(NotificationOutbox).from_select(
+            ["booking_id", "chat_id", "text"],
+            select(source.c.booking_id, source.c.chat_id, literal(text)).where(source.c.chat_id.is_not(None)),
+            include_defaults=False,
+        )
+
+    def enqueue_from(self, source: CTE, text: str) -> int:
+        """Queues `text` for every row of `source`, a data-modifying CTE returning `booking_id` and `chat_id`.
+
+        The booking change and its messages are a single statement, so they are committed or lost together.
+        """
+
+        statement = self.insert_from(source, text).add_cte(source).returning(NotificationOutbox.id)
+        enqueued = len(self.session.execute(statement).all())
+        self.session.commit()
+        return enqueued
+
+    def claim(self, batch_size: int, lease: datetime.timedelta, max_attempts: int):
+        """Takes up to `batch_size` due messages and hides them from other workers for `lease`.
+
+        `SKIP LOCKED` lets concurrent workers pass over the rows another one is claiming instead of waiting for
+        it, and the lease is committed right away, so no transaction stays open while the messages are sent.
+        A message that is not completed before its lease runs out is claimed again.
+        """
+
+        claimable = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.available_at <= func.now(), NotificationOutbox.attempts < max_attempts)
+            .order_by(NotificationOutbox.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(claimable.scalar_subquery()))
+            .values(attempts=NotificationOutbox.attempts + 1, available_at=func.now() + lease)
+            .returning(NotificationOutbox.id, NotificationOutbox.chat_id, NotificationOutbox.text)
+            .execution_options(synchronize_session=False)
+        )
+        rows = self.session.execute(statement).all()
+        self.session.commit()
+        return rows
+
+    def purge_exhausted(self, max_attempts: int) -> int:
+        """Deletes the messages whose last allowed attempt has failed and returns how many there were.
+
+        Such rows are never claimed again, the lease of their last attempt is waited out so that a worker that is
+        still sending one does not lose it.
+        """
+
+        statement = (
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.attempts >= max_attempts, NotificationOutbox.available_at <= func.now())
+            .returning(NotificationOutbox.id)
+        )
+        purged = len(self.session.execute(statement).all())
+        self.session.commit()
+        return purged
+
+    def complete(self, ids: list[uuid.UUID]) -> None:
+        """Removes messages that need no further attempts, delivered or rejected for good."""
+
+        self.session.execute(
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
@@ -0,0 +1,122 @@
+"""Drains the notification outbox into Telegram.
+
+Any number of workers can run side by side, each claims its own batches. Delivery is at least once: a worker that
+dies between sending a batch and deleting it leaves the rows to be claimed again when their lease runs out.
+
+Usage: python -m src.api.notifications.worker
+"""
+
+import asyncio
+import datetime
+import logging
+import logging.config
+import signal
+import time
+from typing import Callable
+
+import anyio.to_thread
+from prometheus_client import Counter, start_http_server
+from sqlalchemy.orm import Session
+
+from src.api.notifications.service import NotificationOutboxService
+from src.api.telegram_bot.dispatcher import Message, TelegramDispatcher
+from src.api.telegram_bot.fields import SendResultEnum
+from src.config import settings
+from src.db import ENGINE
+
+logger = logging.getLogger(__name__)
+
+outbox_claimed = Counter("notification_outbox_claimed_total", "Outbox messages claimed by workers")
+outbox_completed = Counter("notification_outbox_completed_total", "Outbox messages delivered and removed")
+outbox_rejected = Counter("notification_outbox_rejected_total", "Outbox messages Telegram refused for good, removed")
+outbox_exhausted = Counter(
+    "notification_outbox_exhausted_total", "Outbox messages removed after running out of attempts"
+)
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = lambda: Session(ENGINE),
+        batch_size: int = settings.NOTIFICATION_OUTBOX_BATCH_SIZE,
+        lease: datetime.timedelta = datetime.timedelta(seconds=settings.NOTIFICATION_OUTBOX_LEASE_SECONDS),
+        max_attempts: int = settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+        poll_interval: float = settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+        purge_interval: float = 60,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+
+    def claim(self):
+        with self.session_factory() as session:
+            return NotificationOutboxService(session).claim(self.batch_size, self.lease, self.max_attempts)
+
+    def complete(self, ids) -> None:
+        with self.session_factory() as session:
+            NotificationOutboxService(session).complete(ids)
+
+    def purge(self) -> int:
+        with self.session_factory() as session:
+            purged = NotificationOutboxService(session).purge_exhausted(self.max_attempts)
+        if purged:
+            logger.warning(f"Удалено уведомлений, исчерпавших попытки отправки: {purged}")
+            outbox_exhausted.inc(purged)
+        return purged
+
+    async def run_once(self, dispatcher: TelegramDispatcher) -> int:
+        """Sends one batch and returns how many messages it had."""
+
+        rows = await anyio.to_thread.run_sync(self.claim)
+        if not rows:
+            return 0
+        outbox_claimed.inc(len(rows))
+
+        results = await dispatcher.send_many(Message(row.chat_id, row.text) for row in rows)
+        # Messages to retry stay claimed until the lease runs out, which doubles as the retry delay
+        delivered = [row.id for row, result in zip(rows, results) if result == SendResultEnum.delivered]
+        rejected = [row.id for row, result in zip(rows, results) if result == SendResultEnum.rejected]
+        if delivered or rejected:
+            await anyio.to_thread.run_sync(self.complete, delivered + rejected)
+            outbox_completed.inc(len(delivered))
+            outbox_rejected.inc(len(rejected))
+
+        return len(rows)
+
+    async def run(self, stopped: asyncio.Event) -> None:
+        # A message still waiting to be retried when its lease runs out would be claimed and sent a second time
+        next_purge = time.monotonic()
+        async with TelegramDispatcher(time_budget=self.lease.total_seconds() / 2) as dispatcher:
+            while not stopped.is_set():
+                try:
+                    if time.monotonic() >= next_purge:
+                        await anyio.to_thread.run_sync(self.purge)
+                        next_purge = time.monotonic() + self.purge_interval
+                    claimed = await self.run_once(dispatcher)
+                except Exception:
+                    logger.exception("Ошибка при отправке уведомлений из очереди")
+                    claimed = 0
+
+                if claimed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(stopped.wait(), self.poll_interval)
+                    except TimeoutError:
+                        pass
+
+
+async def main() -> None:
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopped.set)
+
+    await OutboxWorker().run(stopped)
+
+
+if __name__ == "__main__":
+    logging.config.dictConfig(settings.LOGGING)
+    start_http_server(settings.WORKER_METRICS_PORT)
+    asyncio.run(main())
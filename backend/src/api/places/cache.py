@@ -0,0 +1,100 @@
+"""Serialized places, kept per process so that reading them costs neither a scan of the places nor a serialization.
+
+Every change to the places bumps the shared version in `places_version` within the same transaction. A read only
+fetches that single row and serves the snapshot as long as it was built at the same version, so every process
+switches to the new data as soon as the change is committed.
+
+ETags are hashes of the serialized bodies, so every process gives the same body the same tag and a client can
+revalidate against any of them.
+"""
+
+import hashlib
+import threading
+import uuid
+from typing import Callable, Iterable, NamedTuple
+
+from fastapi import Request, Response, status
+from prometheus_client import Counter
+from pydantic import TypeAdapter
+
+from src.api.places.schemas import PlaceResponse
+
+places_cache_lookups_count = Counter("places_cache_lookups_total", "Places cache lookups", ["result"])
+
+places_adapter = TypeAdapter(list[PlaceResponse])
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedBody":
+        return cls(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class PlacesSnapshot(NamedTuple):
+    version: int
+    places: CachedBody
+    by_id: dict[uuid.UUID, CachedBody]
+
+
+def serialize_place(place) -> CachedBody:
+    return CachedBody.from_body(PlaceResponse.model_validate(place, from_attributes=True).model_dump_json().encode())
+
+
+class PlacesCache:
+    def __init__(self) -> None:
+        self._snapshot: PlacesSnapshot | None = None
+        self._lock = threading.Lock()
+
+    def get(self, version: int, load: Callable[[], Iterable]) -> PlacesSnapshot:
+        """The snapshot of the places at `version`, built from `load()` unless it is already kept.
+
+        `version` has to be read before `load()` runs: the places loaded are then at least as new as the version,
+        and a snapshot that is newer than its version is only rebuilt once more on the next read.
+        """
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            places_cache_lookups_count.labels(result="hit").inc()
+            return snapshot
+
+        places_cache_lookups_count.labels(result="miss").inc()
+        responses = sorted(
+            (PlaceResponse.model_validate(place, from_attributes=True) for place in load()),
+            key=lambda place: (place.name, place.id),
+        )
+        snapshot = PlacesSnapshot(
+            version=version,
+            places=CachedBody.from_body(places_adapter.dump_json(responses)),
+            by_id={place.id: CachedBody.from_body(place.model_dump_json().encode()) for place in responses},
+        )
+
+        with self._lock:
+            # A request that read the version before a concurrent update must not replace the newer snapshot
+            if self._snapshot is None or self._snapshot.version < version:
+                self._snapshot = snapshot
+        return snapshot
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """The body with its ETag, or an empty 304 if the client already has it."""
+
+    # The places are only served to signed-in users, shared caches must not keep them
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), cached.etag):
+        places_cache_lookups_count.labels(result="not_modified").inc()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+places_cache = PlacesCache()
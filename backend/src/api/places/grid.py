@@ -0,0 +1,48 @@
+from typing import Iterable
+
+SECONDS_PER_DAY = 86400
+
+
+def get_slots_count(slot: int) -> int:
+    """Number of `slot`-second slots needed to cover a day, the last one may be shorter."""
+
+    return -(-SECONDS_PER_DAY // slot)
+
+
+def pack_occupancy(intervals: Iterable[tuple[int, int]], slot: int) -> bytes:
+    """
+    Packs [start, end) second intervals into a bitset with one bit per slot, set when any interval touches it.
+
+    Slot `i` is bit `i % 8` of byte `i // 8`, so the result is a little-endian integer mask.
+
+    Examples:
+        >>> pack_occupancy([], 3600).hex()
+        '000000'
+
+        >>> pack_occupancy([(0, 3600)], 3600).hex()
+        '010000'
+
+        >>> pack_occupancy([(3600, 3601), (9 * 3600, 11 * 3600)], 3600).hex()
+        '020600'
+    """
+
+    mask = 0
+    for start, end in intervals:
+        first = start // slot
+        last = -(-end // slot)
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+
+    return mask.to_bytes((get_slots_count(slot) + 7) // 8, "little")
+
+
+def full_occupancy(slot: int) -> bytes:
+    """Bitset with every slot of the day busy."""
+
+    return pack_occupancy([(0, SECONDS_PER_DAY)], slot)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod(verbose=True)
@@ -1,6 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
+from sqlalchemy import DDL, BigInteger, CheckConstraint, event, true
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,3 +27,38 @@ class Place(Base, AuditMixin):
             id=self.id, name=self.name, type=self.type, capacity=self.capacity, access_level=self.access_level
         )
         return response
+
+
+class PlacesVersion(Base):
+    """A single row counting changes to the places, shared by every process that caches them.
+
+    It is bumped by a statement trigger on `place`, so the counter moves in the same transaction as any change to
+    the places, whoever makes it.
+    """
+
+    __table_args__ = (CheckConstraint("id", name="places_version_single_row"),)
+
+    id: Mapped[bool] = mapped_column(primary_key=True, default=True, server_default=true())
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+
+
+CREATE_BUMP_PLACES_VERSION = """
+CREATE OR REPLACE FUNCTION bump_places_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE places_version SET version = version + 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+CREATE_PLACE_VERSION_TRIGGER = """
+CREATE TRIGGER place_bump_places_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON place
+FOR EACH STATEMENT EXECUTE FUNCTION bump_places_version()
+"""
+# CASCADE takes the trigger along if `place` is still there
+DROP_BUMP_PLACES_VERSION = "DROP FUNCTION IF EXISTS bump_places_version() CASCADE"
+
+event.listen(PlacesVersion.__table__, "after_create", DDL("INSERT INTO places_version DEFAULT VALUES"))
+event.listen(Place.__table__, "after_create", DDL(CREATE_BUMP_PLACES_VERSION))
+event.listen(Place.__table__, "after_create", DDL(CREATE_PLACE_VERSION_TRIGGER))
+event.listen(PlacesVersion.__table__, "after_drop", DDL(DROP_BUMP_PLACES_VERSION))
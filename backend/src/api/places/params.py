@@ -0,0 +1,10 @@
+import datetime
+from dataclasses import dataclass
+
+from pydantic import conint
+
+
+@dataclass
+class AvailabilityGridParams:
+    date: datetime.date
+    slot: conint(ge=60, le=86400) = 900
@@ -1,27 +1,46 @@
 import uuid
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
+from src.api.places.cache import cached_response, places_cache, serialize_place
 from src.api.places.deps import PlacesServiceDepends
-from src.api.places.schemas import PlaceAvailableRequest, PlaceAvailableResponse, PlaceResponse, UpdatePlaceResponse
+from src.api.places.params import AvailabilityGridParams
+from src.api.places.schemas import (
+    PlaceAvailabilityGridResponse,
+    PlaceAvailableRequest,
+    PlaceAvailableResponse,
+    PlaceResponse,
+    UpdatePlaceResponse,
+)
 from src.api.tags import Tag
 from src.api.users.me.deps import CurrentUserDepends
 from src.config import settings
 from src.limiter import limiter
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/places", tags=[Tag.PLACES])
+router = APIRouter(prefix="/places", tags=[Tag.PLACES], route_class=TracedRoute)
 
 
 @router.get(
     "",
     status_code=status.HTTP_200_OK,
     response_model=list[PlaceResponse],
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Places did not change since the version in If-None-Match",
+        },
+    },
     summary="Получение всех мест",
-    description="Эта ручка позволяет получить все места коворкинга.",
+    description=(
+        "Эта ручка позволяет получить все места коворкинга. "
+        "Ответ содержит ETag, с заголовком `If-None-Match` неизменившиеся места отдаются ответом 304 без тела."
+    ),
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_places(request: Request, current_user: CurrentUserDepends, place_service: PlacesServiceDepends):
-    return place_service.get_places()
+def get_places(request: Request, current_user: CurrentUserDepends, place_service: PlacesServiceDepends):
+    snapshot = places_cache.get(place_service.get_places_version(), place_service.get_places)
+    return cached_response(request, snapshot.places)
 
 
 @router.post(
@@ -32,7 +51,7 @@ async def get_places(request: Request, current_user: CurrentUserDepends, place_s
     description="Эта ручка позволяет получить все места коворкинга с указанием доступности на текущую дату.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_places_access_availability(
+def get_places_access_availability(
     request: Request,
     current_user: CurrentUserDepends,
     schema: PlaceAvailableRequest,
@@ -41,26 +60,57 @@ async def get_places_access_availability(
     return place_service.get_active_places(current_user.role, schema)
 
 
+@router.get(
+    "/availability/grid",
+    status_code=status.HTTP_200_OK,
+    response_model=PlaceAvailabilityGridResponse,
+    summary="Сетка занятости мест",
+    description=(
+        "Эта ручка позволяет одним запросом получить занятость всех мест на дату, разбитую на слоты по `slot` секунд. "
+        "Занятость места передаётся битовой маской в base64url: слот `i` — это бит `i % 8` байта `i // 8`, "
+        "установленный бит означает, что слот занят."
+    ),
+)
+@limiter.limit(settings.API_RATE_LIMIT)
+def get_places_availability_grid(
+    request: Request,
+    current_user: CurrentUserDepends,
+    params: Annotated[AvailabilityGridParams, Depends(AvailabilityGridParams)],
+    place_service: PlacesServiceDepends,
+):
+    return place_service.get_availability_grid(current_user.role, params)
+
+
 @router.get(
     "/{place_id}",
     status_code=status.HTTP_200_OK,
     response_model=PlaceResponse,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Place did not change since the version in If-None-Match",
+        },
         status.HTTP_404_NOT_FOUND: {
             "description": "Place not found",
         },
     },
     summary="Получение места",
-    description="Эта ручка позволяет получить место в коворкинге по id.",
+    description=(
+        "Эта ручка позволяет получить место в коворкинге по id. "
+        "Ответ содержит ETag, с заголовком `If-None-Match` неизменившееся место отдаётся ответом 304 без тела."
+    ),
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_place(
+def get_place(
     request: Request, current_user: CurrentUserDepends, place_id: uuid.UUID, place_service: PlacesServiceDepends
 ):
-    place = place_service.get_place_by_id(place_id)
-    if not place:
-        raise HTTPException(status.HTTP_404_NOT_FOUND)
-    return place
+    cached = places_cache.get(place_service.get_places_version(), place_service.get_places).by_id.get(place_id)
+    if cached is None:
+        # Неизвестные id тоже не попадают в снимок, поэтому 404 отдаётся только после запроса get_place_by_id
+        place = place_service.get_place_by_id(place_id)
+        if not place:
+            raise HTTPException(status.HTTP_404_NOT_FOUND)
+        cached = serialize_place(place)
+    return cached_response(request, cached)
 
 
 @router.patch(
@@ -78,7 +128,7 @@ async def get_place(
     description="Эта ручка позволяет обновить место в коворкинге по id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_place(
+def update_place(
     request: Request,
     current_user: CurrentUserDepends,
     place_id: uuid.UUID,
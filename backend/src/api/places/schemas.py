@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from pydantic import BaseModel, conint, model_validator
+from pydantic import BaseModel, ConfigDict, conint, model_validator
 
 from src.api.places.fields import AccessLevelEnum, Capacity, PlaceTypeEnum
 
@@ -40,6 +40,24 @@ class PlaceAvailableRequest(BaseModel):
         return self
 
 
+class PlaceOccupancyResponse(BaseModel):
+    """Represents the occupancy bitset of a place for a single day."""
+
+    model_config = ConfigDict(ser_json_bytes="base64")
+
+    id: uuid.UUID
+    occupancy: bytes
+
+
+class PlaceAvailabilityGridResponse(BaseModel):
+    """Represents the occupancy of all places for a day split into equal slots."""
+
+    date: datetime.date
+    slot: int
+    slots_count: int
+    places: list[PlaceOccupancyResponse]
+
+
 class UpdatePlaceResponse(BaseModel):
     name: str
     capacity: Capacity
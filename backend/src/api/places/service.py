@@ -1,8 +1,19 @@
 import uuid
+from collections import defaultdict
+
+from sqlalchemy import and_, func, select, true
 
 from src.api.bookings.models import Booking
-from src.api.places.models import Place
-from src.api.places.schemas import PlaceAvailableRequest, PlaceAvailableResponse, UpdatePlaceResponse
+from src.api.places.grid import full_occupancy, get_slots_count, pack_occupancy
+from src.api.places.models import Place, PlacesVersion
+from src.api.places.params import AvailabilityGridParams
+from src.api.places.schemas import (
+    PlaceAvailabilityGridResponse,
+    PlaceAvailableRequest,
+    PlaceAvailableResponse,
+    PlaceOccupancyResponse,
+    UpdatePlaceResponse,
+)
 from src.db.deps import SessionDepends
 
 
@@ -19,63 +30,64 @@ class PlaceService:
     def get_places(self) -> list[Place]:
         return self.session.query(Place).all()
 
+    def get_places_version(self) -> int:
+        return self.session.scalar(select(PlacesVersion.version))
+
     def get_active_places(
         self, current_user_role: str, request_date: PlaceAvailableRequest
     ) -> list[PlaceAvailableResponse]:
-        places = self.session.query(Place).all()
-
-        result = []
-
-        for place in places:
-            if current_user_role == "guest":
-                if place.access_level != "guest":
-                    result.append(
-                        PlaceAvailableResponse(
-                            id=place.id,
-                            name=place.name,
-                            type=place.type,
-                            capacity=place.capacity,
-                            access_level=place.access_level,
-                            is_available=False,
-                        )
-                    )
-                    continue
-
-            has_bookings = any(
-                (
-                    booking.date == request_date.date
-                    and (
-                        (
-                            booking.start_second <= request_date.end_second
-                            and booking.start_second >= request_date.start_second
-                        )
-                        or (
-                            booking.end_second <= request_date.end_second
-                            and booking.end_second >= request_date.start_second
-                        )
-                        or (
-                            booking.start_second < request_date.start_second
-                            and booking.end_second > request_date.end_second
-                        )
-                    )
-                )
-                for booking in place.bookings
+        is_booked = (
+            select(Booking.id)
+            .where(
+                Booking.place_id == Place.id,
+                Booking.date == request_date.date,
+                Booking.time_range.overlaps(func.int4range(request_date.start_second, request_date.end_second)),
             )
+            .exists()
+        )
+        # Гостям доступны только гостевые места
+        is_accessible = Place.access_level == "guest" if current_user_role == "guest" else true()
 
-            is_active = not has_bookings
-
-            result.append(
-                PlaceAvailableResponse(
-                    id=place.id,
-                    name=place.name,
-                    type=place.type,
-                    capacity=place.capacity,
-                    access_level=place.access_level,
-                    is_available=is_active,
-                )
+        rows = self.session.execute(
+            select(
+                Place.id,
+                Place.name,
+                Place.type,
+                Place.capacity,
+                Place.access_level,
+                and_(is_accessible, ~is_booked).label("is_available"),
             )
+        ).mappings()
+
+        return [PlaceAvailableResponse(**row) for row in rows]
+
+    def get_availability_grid(
+        self, current_user_role: str, params: AvailabilityGridParams
+    ) -> PlaceAvailabilityGridResponse:
+        places = self.session.execute(select(Place.id, Place.access_level)).all()
+        bookings = self.session.execute(
+            select(Booking.place_id, Booking.start_second, Booking.end_second).where(Booking.date == params.date)
+        ).all()
+
+        intervals = defaultdict(list)
+        for booking in bookings:
+            intervals[booking.place_id].append((booking.start_second, booking.end_second))
+
+        occupancies = []
+        for place in places:
+            # Гостям доступны только гостевые места
+            if current_user_role == "guest" and place.access_level != "guest":
+                occupancy = full_occupancy(params.slot)
+            else:
+                occupancy = pack_occupancy(intervals[place.id], params.slot)
+            occupancies.append(PlaceOccupancyResponse(id=place.id, occupancy=occupancy))
 
-        return result
+        return PlaceAvailabilityGridResponse(
+            date=params.date,
+            slot=params.slot,
+            slots_count=get_slots_count(params.slot),
+            places=occupancies,
+        )
 
     def update_place(self, place_id: uuid.UUID, update_schema: UpdatePlaceResponse):
         place = self.get_place_by_id(place_id)
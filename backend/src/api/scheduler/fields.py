@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class NotificationKindEnum(str, Enum):
+    start = "start"
+    end = "end"
@@ -0,0 +1,260 @@
+"""Booking notifications fired at their deadlines from an in-memory priority queue.
+
+Upcoming deadlines are loaded once at start, afterwards only bookings whose `updated_at` moved since the previous
+pass are read again, so the database sees O(changes) instead of a scan of the day's bookings every minute.
+Entries are never removed from the heap when a booking changes or is deleted: each one is checked against the
+booking row in the same UPDATE that marks it as notified, and an outdated entry simply matches nothing.
+The messages are written to the notification outbox by that same statement and sent by its workers.
+"""
+
+import datetime
+import heapq
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Iterable, NamedTuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import func, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from src.api.bookings.models import Booking
+from src.api.notifications.service import NotificationOutboxService
+from src.api.scheduler.fields import NotificationKindEnum
+from src.api.users.models import User
+from src.config import settings
+from src.db import ENGINE
+
+logger = logging.getLogger(__name__)
+
+notification_jitter_seconds = Histogram(
+    "notification_jitter_seconds",
+    "Delay between a notification deadline and the moment it was fired",
+    ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+notification_queue_size = Gauge("notification_queue_size", "Deadlines waiting in the notification queue")
+notification_rows_read = Counter(
+    "notification_rows_read_total", "Booking rows read by the notification scheduler", ["phase"]
+)
+notifications_enqueued = Counter(
+    "notifications_enqueued_total", "Notifications queued in the outbox by the scheduler", ["kind"]
+)
+
+# Time, flag and message of each kind of notification
+KIND_SECOND = {NotificationKindEnum.start: Booking.start_second, NotificationKindEnum.end: Booking.end_second}
+KIND_FLAG = {NotificationKindEnum.start: Booking.notified_start, NotificationKindEnum.end: Booking.notified_end}
+KIND_MESSAGE = {
+    NotificationKindEnum.start: "Your booking starts in {minutes} minutes!",
+    NotificationKindEnum.end: "Your booking ends up in {minutes} minutes!",
+}
+
+# updated_at is the start time of the writing transaction, so a row committed a bit later than our previous pass
+# can carry an older timestamp than the one we stopped at
+SYNC_OVERLAP = datetime.timedelta(minutes=1)
+
+COLUMNS = (
+    Booking.id,
+    Booking.date,
+    Booking.start_second,
+    Booking.end_second,
+    Booking.notified_start,
+    Booking.notified_end,
+    Booking.updated_at,
+)
+
+
+class Deadline(NamedTuple):
+    at: datetime.datetime
+    kind: NotificationKindEnum
+    booking_id: uuid.UUID
+    date: datetime.date
+    second: int
+    queued_at: datetime.datetime
+
+
+class NotificationScheduler:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = lambda: Session(ENGINE),
+        lead: datetime.timedelta = datetime.timedelta(minutes=settings.NOTIFICATION_LEAD_MINUTES),
+        sync_interval: float = settings.NOTIFICATION_SYNC_SECONDS,
+        clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+    ) -> None:
+        self.session_factory = session_factory
+        self.lead = lead
+        self.sync_interval = sync_interval
+        self.clock = clock
+
+        self._heap: list[Deadline] = []
+        # The current deadline of every queued (booking, kind); heap entries that disagree with it are outdated
+        self._deadlines: dict[tuple[uuid.UUID, NotificationKindEnum], datetime.datetime] = {}
+        self._watermark: datetime.datetime | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # queue
+
+    def push(self, rows: Iterable) -> None:
+        now = self.clock()
+        for row in rows:
+            if self._watermark is None or row.updated_at > self._watermark:
+                self._watermark = row.updated_at
+
+            for kind, second in KIND_SECOND.items():
+                key = (row.id, kind)
+                seconds = getattr(row, second.key)
+                event = datetime.datetime.combine(row.date, datetime.time()) + datetime.timedelta(seconds=seconds)
+                if getattr(row, KIND_FLAG[kind].key) or event <= now:
+                    self._deadlines.pop(key, None)
+                    continue
+
+                deadline = event - self.lead
+                if self._deadlines.get(key) != deadline:
+                    self._deadlines[key] = deadline
+                    heapq.heappush(self._heap, Deadline(deadline, kind, row.id, row.date, seconds, now))
+
+        notification_queue_size.set(len(self._heap))
+
+    def pop_due(self, now: datetime.datetime) -> list[Deadline]:
+        due = []
+        while self._heap and self._heap[0].at <= now:
+            deadline = heapq.heappop(self._heap)
+            key = (deadline.booking_id, deadline.kind)
+            if self._deadlines.get(key) == deadline.at:
+                del self._deadlines[key]
+                due.append(deadline)
+
+        notification_queue_size.set(len(self._heap))
+        return due
+
+    def requeue(self, deadlines: Iterable[Deadline]) -> None:
+        """Puts back deadlines that were popped but not fired, unless their booking was queued again since."""
+
+        for deadline in deadlines:
+            key = (deadline.booking_id, deadline.kind)
+            if key not in self._deadlines:
+                self._deadlines[key] = deadline.at
+                heapq.heappush(self._heap, deadline)
+
+        notification_queue_size.set(len(self._heap))
+
+    def seconds_until_next(self) -> float | None:
+        if not self._heap:
+            return None
+        return (self._heap[0].at - self.clock()).total_seconds()
+
+    # database
+
+    def load(self) -> None:
+        """Queues every upcoming booking that still has a notification to send."""
+
+        statement = select(*COLUMNS).where(
+            Booking.date >= self.clock().date(), or_(Booking.notified_start.is_(False), Booking.notified_end.is_(False))
+        )
+        with self.session_factory() as session:
+            self._watermark = session.scalar(select(func.localtimestamp()))
+            rows = session.execute(statement).all()
+
+        notification_rows_read.labels("load").inc(len(rows))
+        self.push(rows)
+
+    def sync(self) -> None:
+        """Queues the bookings created or changed since the previous pass."""
+
+        statement = select(*COLUMNS).where(Booking.updated_at > self._watermark - SYNC_OVERLAP)
+        with self.session_factory() as session:
+            rows = session.execute(statement).all()
+
+        notification_rows_read.labels("sync").inc(len(rows))
+        self.push(rows)
+
+    def fire(self, due: list[Deadline]) -> None:
+        """Marks the due bookings as notified and queues messages to their users, one statement per kind.
+
+        A booking that was moved, deleted or already notified since its deadline was queued is left out by the
+        UPDATE itself, so nothing is queued for it. If a statement fails, the deadlines of its kind and of the kinds
+        not tried yet go back to the queue, the ones already committed stay fired.
+        """
+
+        by_kind = defaultdict(list)
+        for deadline in due:
+            by_kind[deadline.kind].append(deadline)
+
+        unfired = dict(by_kind)
+        try:
+            for kind, deadlines in by_kind.items():
+                self._fire_kind(kind, deadlines)
+                del unfired[kind]
+        except Exception:
+            self.requeue(deadline for deadlines in unfired.values() for deadline in deadlines)
+            raise
+
+    def _fire_kind(self, kind: NotificationKindEnum, deadlines: list[Deadline]) -> None:
+        flag = KIND_FLAG[kind]
+        notified = (
+            update(Booking)
+            .where(
+                Booking.user_id == User.id,
+                tuple_(Booking.id, Booking.date, KIND_SECOND[kind]).in_(
+                    [(deadline.booking_id, deadline.date, deadline.second) for deadline in deadlines]
+                ),
+                flag.is_(False),
+                User.telegram_id.is_not(None),
+            )
+            .values({flag.key: True})
+            .returning(Booking.id.label("booking_id"), User.telegram_id.label("chat_id"))
+            .cte("notified")
+        )
+        text = KIND_MESSAGE[kind].format(minutes=int(self.lead.total_seconds() // 60))
+        with self.session_factory() as session:
+            enqueued = NotificationOutboxService(session).enqueue_from(notified, text)
+        notifications_enqueued.labels(kind.value).inc(enqueued)
+
+        fired_at = self.clock()
+        for deadline in deadlines:
+            notification_jitter_seconds.labels(kind.value).observe(
+                (fired_at - max(deadline.at, deadline.queued_at)).total_seconds()
+            )
+
+    # loop
+
+    def run(self) -> None:
+        next_sync = None
+        while not self._stopped.is_set():
+            try:
+                if next_sync is None:
+                    self.load()
+                    next_sync = time.monotonic() + self.sync_interval
+                elif time.monotonic() >= next_sync:
+                    self.sync()
+                    next_sync = time.monotonic() + self.sync_interval
+
+                due = self.pop_due(self.clock())
+                if due:
+                    self.fire(due)
+            except Exception:
+                logger.exception("Ошибка в планировщике уведомлений")
+                # Deadlines that failed to fire are already due again, retrying them at once would only hammer the
+                # database that has just failed
+                self._stopped.wait(self.sync_interval)
+                continue
+
+            timeout = next_sync - time.monotonic()
+            until_next = self.seconds_until_next()
+            if until_next is not None:
+                timeout = min(timeout, until_next)
+            self._stopped.wait(max(timeout, 0))
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="notification-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
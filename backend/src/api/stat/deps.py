@@ -1,7 +1,55 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, status
 
+from src.api.stat.params import DateWindowParams, ExportParams, OccupancyParams, StatCursor, StatParams
 from src.api.stat.service import StatService
+from src.config import settings
 
 StatServiceDepends = Annotated[StatService, Depends(StatService)]
+
+
+def get_stat_params(params: StatParams = Depends(StatParams)) -> StatParams:
+    if params.limit > settings.API_SEARCH_PARAMS_MAX_LIMIT:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            f"The limit of {params.limit} exceeds the maximum allowed limit of {settings.API_SEARCH_PARAMS_MAX_LIMIT}.",
+        )
+    if params.date_from and params.date_to and params.date_from > params.date_to:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Начало периода позже его конца.")
+    if params.cursor is not None:
+        try:
+            StatCursor.decode(params.cursor)
+        except ValueError:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Некорректный курсор.") from None
+    return params
+
+
+StatParamsDepends = Annotated[StatParams, Depends(get_stat_params)]
+
+
+def get_date_window_params(params: DateWindowParams = Depends(DateWindowParams)) -> DateWindowParams:
+    if params.date_from and params.date_to and params.date_from > params.date_to:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Начало периода позже его конца.")
+    return params
+
+
+DateWindowParamsDepends = Annotated[DateWindowParams, Depends(get_date_window_params)]
+
+
+def get_occupancy_params(params: OccupancyParams = Depends(OccupancyParams)) -> OccupancyParams:
+    if params.date_from > params.date_to:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Начало периода позже его конца.")
+    return params
+
+
+OccupancyParamsDepends = Annotated[OccupancyParams, Depends(get_occupancy_params)]
+
+
+def get_export_params(params: ExportParams = Depends(ExportParams)) -> ExportParams:
+    if params.date_from and params.date_to and params.date_from > params.date_to:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "Начало периода позже его конца.")
+    return params
+
+
+ExportParamsDepends = Annotated[ExportParams, Depends(get_export_params)]
@@ -0,0 +1,138 @@
+"""Streaming export of bookings: rows are read through a server-side cursor and encoded one chunk at a time."""
+
+import csv
+import io
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.api.bookings.models import Booking
+from src.api.places.models import Place
+from src.api.stat.fields import ExportFormatEnum
+from src.api.stat.params import ExportParams
+from src.api.users.models import User
+from src.db import ENGINE
+
+EXPORT_CHUNK_SIZE = 10_000
+
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("start_second", pa.int32()),
+        ("end_second", pa.int32()),
+        ("is_activated_by_user", pa.bool_()),
+        ("user_id", pa.string()),
+        ("username", pa.string()),
+        ("place_id", pa.string()),
+        ("place_name", pa.string()),
+        ("created_at", pa.timestamp("us")),
+    ]
+)
+# Stored as strings: Parquet has no UUID logical type that every reader understands
+UUID_COLUMNS = [EXPORT_SCHEMA.get_field_index(name) for name in ("id", "user_id", "place_id")]
+
+MEDIA_TYPES = {
+    ExportFormatEnum.csv: "text/csv",
+    ExportFormatEnum.parquet: "application/vnd.apache.parquet",
+}
+
+
+def iter_booking_chunks(params: ExportParams, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[tuple]]:
+    statement = (
+        select(
+            Booking.id,
+            Booking.date,
+            Booking.start_second,
+            Booking.end_second,
+            Booking.is_activated_by_user,
+            Booking.user_id,
+            User.username,
+            Booking.place_id,
+            Place.name,
+            Booking.created_at,
+        )
+        .outerjoin(User, Booking.user_id == User.id)
+        .outerjoin(Place, Booking.place_id == Place.id)
+        .order_by(Booking.date, Booking.start_second, Booking.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if params.date_from is not None:
+        statement = statement.where(Booking.date >= params.date_from)
+    if params.date_to is not None:
+        statement = statement.where(Booking.date <= params.date_to)
+
+    # The response is streamed after the request session is gone, so the export holds its own
+    with Session(ENGINE) as session:
+        for partition in session.execute(statement).partitions():
+            yield [tuple(row) for row in partition]
+
+
+def to_csv(chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_SCHEMA.names)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class ChunkSink:
+    """Write-only file object for pyarrow that hands out what was written since the last `drain`."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def to_parquet(chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    """Every chunk becomes a row group, so only one chunk is held in memory at a time."""
+
+    sink = ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), EXPORT_SCHEMA) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            for index in UUID_COLUMNS:
+                columns[index] = [str(value) if value is not None else None for value in columns[index]]
+            writer.write_batch(pa.record_batch(columns, schema=EXPORT_SCHEMA))
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def export_bookings(params: ExportParams) -> Iterator[bytes]:
+    chunks = iter_booking_chunks(params)
+    if params.format == ExportFormatEnum.parquet:
+        return to_parquet(chunks)
+    return to_csv(chunks)
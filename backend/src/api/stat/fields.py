@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ExportFormatEnum(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
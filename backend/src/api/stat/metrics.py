@@ -0,0 +1,60 @@
+"""Per-user booking numbers for Prometheus, read from the `booking_stat` rollup instead of labelled counters.
+
+Only the `METRICS_TOP_USERS` most active users get series of their own, everybody is counted in the distribution.
+Every scheduler instance takes the snapshot on its own every `STAT_REFRESH_MINUTES` and serves it as is on every
+scrape, so it lags the rollup by up to one more refresh interval.
+"""
+
+import threading
+
+from prometheus_client.core import GaugeHistogramMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.orm import Session
+
+from src.api.stat.params import StatParams
+from src.api.stat.service import StatService
+from src.config import settings
+
+USER_BOOKING_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+class UserStatCollector(Collector):
+    def __init__(self, top_users: int = settings.METRICS_TOP_USERS) -> None:
+        self.top_users = top_users
+        self._top: list = []
+        self._distribution: tuple[list[int], int, int] | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, session: Session) -> None:
+        service = StatService(session)
+        top = service.get_user_totals(StatParams(limit=self.top_users))[: self.top_users]
+        distribution = service.get_user_booking_distribution(USER_BOOKING_BOUNDS)
+        with self._lock:
+            self._top = top
+            self._distribution = distribution
+
+    def collect(self):
+        with self._lock:
+            top, distribution = self._top, self._distribution
+
+        bookings = GaugeMetricFamily(
+            "booking_stat_user_bookings", "Bookings of the most active users", labels=["username"]
+        )
+        visits = GaugeMetricFamily("booking_stat_user_visits", "Visits of the most active users", labels=["username"])
+        for row in top:
+            bookings.add_metric([row.username], row.booking_count)
+            visits.add_metric([row.username], row.visit_count)
+        yield bookings
+        yield visits
+
+        if distribution is not None:
+            buckets, users, total = distribution
+            yield GaugeHistogramMetricFamily(
+                "booking_stat_users_by_bookings",
+                "Users by the number of bookings they made",
+                buckets=[(str(bound), count) for bound, count in zip(USER_BOOKING_BOUNDS, buckets)] + [("+Inf", users)],
+                gsum_value=total,
+            )
+
+
+user_stat_collector = UserStatCollector()
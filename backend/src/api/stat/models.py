@@ -0,0 +1,41 @@
+from sqlalchemy import DDL, BigInteger, Column, Date, MetaData, Table, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.api.bookings.models import Booking
+
+# Daily per-user, per-place rollup of bookings, kept as a materialized view and refreshed by the scheduler.
+# It lives outside Base.metadata so that create_all/drop_all never treat it as a regular table.
+view_metadata = MetaData()
+
+booking_stat = Table(
+    "booking_stat",
+    view_metadata,
+    Column("date", Date, primary_key=True),
+    Column("user_id", UUID(as_uuid=True), primary_key=True),
+    Column("place_id", UUID(as_uuid=True), primary_key=True),
+    Column("booking_count", BigInteger, nullable=False),
+    Column("visit_count", BigInteger, nullable=False),
+    Column("total_seconds", BigInteger, nullable=False),
+)
+
+CREATE_BOOKING_STAT = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS booking_stat AS
+SELECT date,
+       user_id,
+       place_id,
+       count(*) AS booking_count,
+       count(*) FILTER (WHERE is_activated_by_user) AS visit_count,
+       sum(end_second - start_second) AS total_seconds
+FROM booking
+GROUP BY date, user_id, place_id
+"""
+# REFRESH ... CONCURRENTLY needs a unique index and keeps the view readable while it runs
+CREATE_BOOKING_STAT_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS booking_stat_date_user_id_place_id_idx ON booking_stat (date, user_id, place_id)"
+)
+DROP_BOOKING_STAT = "DROP MATERIALIZED VIEW IF EXISTS booking_stat"
+REFRESH_BOOKING_STAT = "REFRESH MATERIALIZED VIEW CONCURRENTLY booking_stat"
+
+event.listen(Booking.__table__, "after_create", DDL(CREATE_BOOKING_STAT))
+event.listen(Booking.__table__, "after_create", DDL(CREATE_BOOKING_STAT_INDEX))
+event.listen(Booking.__table__, "before_drop", DDL(DROP_BOOKING_STAT))
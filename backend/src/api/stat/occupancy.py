@@ -0,0 +1,69 @@
+"""Occupancy heatmaps by day of week and hour of day, computed over whole arrays of bookings at once.
+
+Every booking is split into the hours it touches, the overlap with each hour is computed with array
+arithmetic and the overlaps are histogrammed into a 7 x 24 grid (Monday first) with `np.bincount`.
+"""
+
+import datetime
+
+import numpy as np
+
+DAYS_PER_WEEK = 7
+HOURS_PER_DAY = 24
+SECONDS_PER_HOUR = 3600
+
+
+def occupied_seconds(weekdays: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Booked seconds per (weekday, hour) for bookings `[start, end)` on the given weekdays (0 is Monday).
+
+    >>> occupied_seconds(np.array([0, 2]), np.array([1800, 0]), np.array([5400, 3600]))[[0, 2], :3].tolist()
+    [[1800, 1800, 0], [3600, 0, 0]]
+    """
+
+    weekdays = np.asarray(weekdays, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    first_hours = starts // SECONDS_PER_HOUR
+    spans = (ends - 1) // SECONDS_PER_HOUR - first_hours + 1
+
+    # One element per (booking, hour it touches): the booking index and the offset of the hour within the booking
+    bookings = np.repeat(np.arange(len(starts)), spans)
+    offsets = np.arange(len(bookings)) - np.repeat(np.cumsum(spans) - spans, spans)
+    hours = first_hours[bookings] + offsets
+
+    overlaps = np.minimum(ends[bookings], (hours + 1) * SECONDS_PER_HOUR) - np.maximum(
+        starts[bookings], hours * SECONDS_PER_HOUR
+    )
+    cells = weekdays[bookings] * HOURS_PER_DAY + hours
+
+    return (
+        np.bincount(cells, weights=overlaps, minlength=DAYS_PER_WEEK * HOURS_PER_DAY)
+        .astype(np.int64)
+        .reshape(DAYS_PER_WEEK, HOURS_PER_DAY)
+    )
+
+
+def open_seconds(date_from: datetime.date, date_to: datetime.date) -> np.ndarray:
+    """Seconds each (weekday, hour) cell is available between `date_from` and `date_to` inclusive.
+
+    >>> open_seconds(datetime.date(2025, 1, 6), datetime.date(2025, 1, 13))[:, 0].tolist()
+    [7200, 3600, 3600, 3600, 3600, 3600, 3600]
+    """
+
+    days = np.arange(np.datetime64(date_from, "D"), np.datetime64(date_to, "D") + 1)
+    # 1970-01-01 was a Thursday
+    per_weekday = np.bincount((days.astype(np.int64) + 3) % DAYS_PER_WEEK, minlength=DAYS_PER_WEEK)
+    return np.repeat(per_weekday[:, np.newaxis] * SECONDS_PER_HOUR, HOURS_PER_DAY, axis=1)
+
+
+def utilization(occupied: np.ndarray, available: np.ndarray) -> np.ndarray:
+    """Share of `available` that is `occupied`, 0 where nothing is available."""
+
+    return np.divide(occupied, available, out=np.zeros(occupied.shape), where=available > 0)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
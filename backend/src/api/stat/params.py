@@ -0,0 +1,55 @@
+import base64
+import datetime
+import uuid
+from dataclasses import dataclass
+from typing import Annotated, NamedTuple
+
+from fastapi import Query
+from pydantic import conint
+
+from src.api.stat.fields import ExportFormatEnum
+from src.config import settings
+
+
+@dataclass
+class DateWindowParams:
+    date_from: Annotated[datetime.date | None, Query(alias="from")] = None
+    date_to: Annotated[datetime.date | None, Query(alias="to")] = None
+
+
+@dataclass
+class StatParams(DateWindowParams):
+    limit: conint(ge=1) = settings.API_SEARCH_PARAMS_MAX_LIMIT
+    cursor: str | None = None
+
+
+@dataclass
+class OccupancyParams:
+    date_from: Annotated[datetime.date, Query(alias="from")]
+    date_to: Annotated[datetime.date, Query(alias="to")]
+    place_id: uuid.UUID | None = None
+
+
+@dataclass
+class ExportParams:
+    format: ExportFormatEnum = ExportFormatEnum.csv
+    date_from: Annotated[datetime.date | None, Query(alias="from")] = None
+    date_to: Annotated[datetime.date | None, Query(alias="to")] = None
+
+
+class StatCursor(NamedTuple):
+    """Position after the last entity of a page: entities are ordered by booking count desc, then by id."""
+
+    booking_count: int
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(f"{self.booking_count}:{self.id}".encode()).decode()
+
+    @classmethod
+    def decode(cls, raw: str) -> "StatCursor":
+        try:
+            booking_count, id = base64.urlsafe_b64decode(raw.encode()).decode().split(":")
+            return cls(int(booking_count), uuid.UUID(id))
+        except (ValueError, UnicodeError) as e:
+            raise ValueError("Invalid cursor") from e
@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
-from src.api.stat.deps import StatServiceDepends
-from src.api.stat.schemas import StatAggregatedByPlaceResponse, StatAggregatedByUserResponse, StatTotalResponse
+from src.api.stat.deps import (
+    DateWindowParamsDepends,
+    ExportParamsDepends,
+    OccupancyParamsDepends,
+    StatParamsDepends,
+    StatServiceDepends,
+)
+from src.api.stat.export import MEDIA_TYPES, export_bookings
+from src.api.stat.schemas import (
+    StatAggregatedByPlaceResponse,
+    StatAggregatedByUserResponse,
+    StatOccupancyResponse,
+    StatTotalResponse,
+)
 from src.api.tags import Tag
+from src.api.users.me.deps import CurrentUserDepends
 from src.config import settings
 from src.limiter import limiter
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/stat", tags=[Tag.STAT])
+router = APIRouter(prefix="/stat", tags=[Tag.STAT], route_class=TracedRoute)
 
 
 @router.get(
@@ -14,11 +29,15 @@ router = APIRouter(prefix="/stat", tags=[Tag.STAT])
     status_code=status.HTTP_200_OK,
     response_model=StatAggregatedByUserResponse,
     summary="Статистика по пользователям",
-    description="Эта ручка позволяет получить агрегированную по пользователям статистику.",
+    description=(
+        "Эта ручка позволяет получить агрегированную по пользователям статистику за период `from`–`to`. "
+        "Пользователи отсортированы по числу бронирований, страница содержит не больше `limit` пользователей "
+        "(и не больше `limit` мест у каждого), следующую страницу можно получить, передав `next_cursor` в `cursor`."
+    ),
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_stat_aggregated_by_user(request: Request, stats_service: StatServiceDepends):
-    return stats_service.get_stat_aggregated_by_user()
+def get_stat_aggregated_by_user(request: Request, params: StatParamsDepends, stats_service: StatServiceDepends):
+    return stats_service.get_stat_aggregated_by_user(params)
 
 
 @router.get(
@@ -26,11 +45,16 @@ async def get_stat_aggregated_by_user(request: Request, stats_service: StatServi
     status_code=status.HTTP_200_OK,
     response_model=StatAggregatedByPlaceResponse,
     summary="Статистика по местам",
-    description="Эта ручка позволяет получить агрегированную по местам статистику.",
+    description=(
+        "Эта ручка позволяет получить агрегированную по местам статистику за период `from`–`to`. "
+        "Места отсортированы по числу бронирований, страница содержит не больше `limit` мест "
+        "(и не больше `limit` пользователей у каждого), "
+        "следующую страницу можно получить, передав `next_cursor` в `cursor`."
+    ),
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_stat_aggregated_by_place(request: Request, stats_service: StatServiceDepends):
-    return stats_service.get_stat_aggregated_by_place()
+def get_stat_aggregated_by_place(request: Request, params: StatParamsDepends, stats_service: StatServiceDepends):
+    return stats_service.get_stat_aggregated_by_place(params)
 
 
 @router.get(
@@ -38,8 +62,55 @@ async def get_stat_aggregated_by_place(request: Request, stats_service: StatServ
     status_code=status.HTTP_200_OK,
     response_model=StatTotalResponse,
     summary="Суммарная статистика",
-    description="Эта ручка позволяет получить суммарную статистику по всем сущностям.",
+    description="Эта ручка позволяет получить суммарную статистику по всем сущностям за период `from`–`to`.",
+)
+@limiter.limit(settings.API_RATE_LIMIT)
+def get_stat_total(request: Request, params: DateWindowParamsDepends, stats_service: StatServiceDepends):
+    return stats_service.get_total_stat(params)
+
+
+@router.get(
+    "/occupancy",
+    status_code=status.HTTP_200_OK,
+    response_model=StatOccupancyResponse,
+    summary="Загруженность мест",
+    description=(
+        "Эта ручка позволяет получить загруженность мест за период `from`–`to` по дням недели и часам: "
+        "сколько секунд каждое место было забронировано и какую долю доступного времени это составляет. "
+        "Матрицы имеют вид [день недели][час], понедельник первый."
+    ),
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_stat_total(request: Request, stats_service: StatServiceDepends):
-    return stats_service.get_total_stat()
+def get_stat_occupancy(request: Request, params: OccupancyParamsDepends, stats_service: StatServiceDepends):
+    return stats_service.get_occupancy(params)
+
+
+@router.get(
+    "/export/bookings",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+            "description": "Bookings file",
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User not allowed to export bookings",
+        },
+    },
+    summary="Выгрузка бронирований",
+    description=(
+        "Эта ручка позволяет администратору выгрузить все бронирования за период `from`–`to` в CSV или Parquet. "
+        "Файл отдаётся потоком и собирается по частям, поэтому размер выгрузки не ограничен."
+    ),
+)
+@limiter.limit(settings.API_RATE_LIMIT)
+def export_stat_bookings(request: Request, current_user: CurrentUserDepends, params: ExportParamsDepends):
+    if current_user.role != "admin":
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Выгрузка доступна только администраторам.")
+
+    return StreamingResponse(
+        export_bookings(params),
+        media_type=MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f"attachment; filename=bookings.{params.format.value}"},
+    )
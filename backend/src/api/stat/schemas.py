@@ -1,3 +1,5 @@
+import datetime
+
 from pydantic import UUID4, BaseModel, Field
 
 
@@ -43,6 +45,7 @@ class StatAggregatedByUserResponse(BaseModel):
     user_place_bookings_stats: list[UserPlaceBookingCountStat] = Field(default_factory=list)
     conversion_rates: list[UserConversionRateStat] = Field(default_factory=list)
     average_booking_times: list[UserAverageBookingTimeStat] = Field(default_factory=list)
+    next_cursor: str | None = None
 
 
 class PlaceVisitCountStat(BaseModel):
@@ -75,6 +78,7 @@ class StatAggregatedByPlaceResponse(BaseModel):
     place_user_bookings_stats: list[PlaceUserBookingCountStat] = Field(default_factory=list)
     conversion_rates: list[PlaceConversionRateStat] = Field(default_factory=list)
     average_booking_times: list[PlaceAverageBookingTimeStat] = Field(default_factory=list)
+    next_cursor: str | None = None
 
 
 class StatTotalResponse(BaseModel):
@@ -82,3 +86,18 @@ class StatTotalResponse(BaseModel):
     total_visits: int
     total_conversion_rate: float
     total_avg_booking_time: int
+
+
+class PlaceOccupancyStat(BaseModel):
+    place_id: UUID4
+    place_name: str
+    occupied_seconds: list[list[int]] = Field(description="Занятые секунды, [день недели][час], понедельник первый")
+    utilization: list[list[float]] = Field(description="Доля занятого времени, [день недели][час]")
+    total_utilization: float
+
+
+class StatOccupancyResponse(BaseModel):
+    date_from: datetime.date
+    date_to: datetime.date
+    open_seconds: list[list[int]] = Field(description="Доступные секунды каждой ячейки, [день недели][час]")
+    places: list[PlaceOccupancyStat] = Field(default_factory=list)
@@ -1,263 +1,277 @@
-from sqlalchemy import func
+from collections import defaultdict
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import BigInteger, Integer, and_, extract, func, or_, select, text
 
 from src.api.bookings.models import Booking
 from src.api.places.models import Place
+from src.api.stat import occupancy
+from src.api.stat.models import REFRESH_BOOKING_STAT, booking_stat
+from src.api.stat.params import DateWindowParams, OccupancyParams, StatCursor, StatParams
 from src.api.users.models import User
 from src.db.deps import SessionDepends
 
+stat = booking_stat.c
+
+
+def total(column):
+    # sum() over bigint is numeric in Postgres
+    return func.coalesce(func.sum(column).cast(BigInteger), 0)
+
+
+booking_count = total(stat.booking_count)
+visit_count = total(stat.visit_count)
+
+# Everything a stats family reports, derived in the same aggregation pass
+aggregates = (
+    booking_count.label("booking_count"),
+    visit_count.label("visit_count"),
+    func.coalesce(visit_count / func.nullif(booking_count, 0), 0).label("conversion_rate"),
+    func.coalesce(total(stat.total_seconds) // func.nullif(booking_count, 0), 0).label("avg_booking_time"),
+)
+
+
+def window(params: DateWindowParams) -> list:
+    conditions = []
+    if params.date_from is not None:
+        conditions.append(stat.date >= params.date_from)
+    if params.date_to is not None:
+        conditions.append(stat.date <= params.date_to)
+    return conditions
+
+
+def after(cursor: StatCursor, key):
+    return or_(booking_count < cursor.booking_count, and_(booking_count == cursor.booking_count, key > cursor.id))
+
+
+def paginate(rows: list, limit: int, key: str) -> tuple[list, str | None]:
+    """Rows are fetched with one extra row, its presence means there is a next page."""
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, StatCursor(rows[-1].booking_count, getattr(rows[-1], key)).encode()
+
 
 class StatService:
+    """Statistics read from the `booking_stat` rollup, so they lag behind bookings by up to one refresh."""
+
     def __init__(self, session: SessionDepends) -> None:
         self.session = session
 
+    def refresh_booking_stat(self) -> None:
+        self.session.execute(text(REFRESH_BOOKING_STAT))
+        self.session.commit()
+
     # aggregated by user
 
-    def get_user_booking_stats(self):
-        results = (
-            self.session.query(Booking.user_id, User.username, func.count(Booking.id).label("booking_count"))
-            .join(User, Booking.user_id == User.id)
-            .group_by(Booking.user_id, User.username)
-            .order_by(func.count(Booking.id).desc())
-            .all()
+    def get_user_totals(self, params: StatParams):
+        statement = (
+            select(stat.user_id, User.username, *aggregates)
+            .join(User, stat.user_id == User.id)
+            .where(*window(params))
+            .group_by(stat.user_id, User.username)
+            .order_by(booking_count.desc(), stat.user_id)
+            .limit(params.limit + 1)
         )
+        if params.cursor is not None:
+            statement = statement.having(after(StatCursor.decode(params.cursor), stat.user_id))
 
-        return [
-            {"user_id": str(row.user_id), "username": row.username, "booking_count": row.booking_count}
-            for row in results
-        ]
-
-    def get_user_visits_stats(self):
-        results = (
-            self.session.query(Booking.user_id, User.username, func.count(Booking.id).label("visit_count"))
-            .filter(Booking.is_activated_by_user == True)
-            .join(User, Booking.user_id == User.id)
-            .group_by(Booking.user_id, User.username)
-            .order_by(func.count(Booking.id).desc())
-            .all()
-        )
+        return self.session.execute(statement).all()
 
-        return [
-            {"user_id": str(row.user_id), "username": row.username, "visit_count": row.visit_count} for row in results
-        ]
+    def get_user_booking_distribution(self, bounds: tuple[int, ...]):
+        """How many users have at most each of `bounds` bookings, along with the user count and booking total."""
 
-    def get_user_place_bookings_stats(self):
-        results = (
-            self.session.query(
-                Booking.user_id,
-                User.username,
-                Booking.place_id,
-                Place.name.label("place_name"),
-                func.count(Booking.id).label("booking_count"),
-            )
-            .join(User, Booking.user_id == User.id)
-            .join(Place, Booking.place_id == Place.id)
-            .group_by(Booking.user_id, User.username, Booking.place_id, Place.name)
-            .order_by(Booking.user_id, func.count(Booking.id).desc())
-            .all()
+        per_user = select(booking_count.label("booking_count")).group_by(stat.user_id).subquery()
+        statement = select(
+            *(func.count().filter(per_user.c.booking_count <= bound) for bound in bounds),
+            func.count(),
+            func.coalesce(func.sum(per_user.c.booking_count), 0),
         )
-
-        stats = {}
-        for row in results:
-            user_id = str(row.user_id)
-            place_stats = {
-                "place_id": str(row.place_id),
-                "place_name": row.place_name,
-                "booking_count": row.booking_count,
-            }
-
-            if user_id not in stats:
-                stats[user_id] = {"username": row.username, "places": []}
-            stats[user_id]["places"].append(place_stats)
-
-        return [
-            {"user_id": user_id, "username": data["username"], "places": data["places"]}
-            for user_id, data in stats.items()
-        ]
-
-    def get_user_average_booking_time(self):
-        results = (
-            self.session.query(
-                Booking.user_id,
-                User.username,
-                func.avg(Booking.end_second - Booking.start_second).label("avg_booking_time"),
+        *buckets, users, bookings = self.session.execute(statement).one()
+        return buckets, users, bookings
+
+    def get_user_place_bookings_stats(self, user_ids: list[UUID], params: StatParams) -> dict[UUID, list[dict]]:
+        """Top `params.limit` places of each user in `user_ids`."""
+
+        ranked = (
+            select(
+                stat.user_id,
+                stat.place_id,
+                booking_count.label("booking_count"),
+                func.row_number()
+                .over(partition_by=stat.user_id, order_by=(booking_count.desc(), stat.place_id))
+                .label("rank"),
             )
-            .join(User, Booking.user_id == User.id)
-            .group_by(Booking.user_id, User.username)
-            .all()
+            .where(stat.user_id.in_(user_ids), *window(params))
+            .group_by(stat.user_id, stat.place_id)
+            .subquery()
+        )
+        statement = (
+            select(ranked.c.user_id, ranked.c.place_id, Place.name.label("place_name"), ranked.c.booking_count)
+            .join(Place, ranked.c.place_id == Place.id)
+            .where(ranked.c.rank <= params.limit)
+            .order_by(ranked.c.user_id, ranked.c.rank)
         )
 
-        return [
-            {
-                "user_id": str(row.user_id),
-                "username": row.username,
-                "avg_booking_time": int(row.avg_booking_time) if row.avg_booking_time else 0,
-            }
-            for row in results
-        ]
-
-    def get_user_conversion_rate(self):
-        booking_stats = self.get_user_booking_stats()
-        visit_stats = {stat["user_id"]: stat["visit_count"] for stat in self.get_user_visits_stats()}
-
-        conversion_rates = []
-        for booking in booking_stats:
-            user_id = booking["user_id"]
-            total_bookings = booking["booking_count"]
-            visits = visit_stats.get(user_id, 0)
-
-            conversion_rate = visits / total_bookings if total_bookings > 0 else 0
-            conversion_rates.append(
-                {"user_id": user_id, "username": booking["username"], "conversion_rate": round(conversion_rate, 2)}
+        stats = defaultdict(list)
+        for row in self.session.execute(statement):
+            stats[row.user_id].append(
+                {"place_id": str(row.place_id), "place_name": row.place_name, "booking_count": row.booking_count}
             )
+        return stats
 
-        return conversion_rates
+    def get_stat_aggregated_by_user(self, params: StatParams | None = None):
+        params = params or StatParams()
+        rows, next_cursor = paginate(self.get_user_totals(params), params.limit, "user_id")
+        places = self.get_user_place_bookings_stats([row.user_id for row in rows], params) if rows else {}
+        users = [{"user_id": str(row.user_id), "username": row.username} for row in rows]
 
-    def get_stat_aggregated_by_user(self):
         return {
-            "user_booking_stats": self.get_user_booking_stats(),
-            "user_visits_stats": self.get_user_visits_stats(),
-            "user_place_bookings_stats": self.get_user_place_bookings_stats(),
-            "average_booking_time": self.get_user_average_booking_time(),
-            "conversion_rate": self.get_user_conversion_rate(),
+            "user_booking_stats": [user | {"booking_count": row.booking_count} for user, row in zip(users, rows)],
+            "user_visit_stats": [
+                user | {"visit_count": row.visit_count}
+                for user, row in sorted(zip(users, rows), key=lambda pair: -pair[1].visit_count)
+                if row.visit_count
+            ],
+            "user_place_bookings_stats": [
+                user | {"places": places.get(row.user_id, [])} for user, row in zip(users, rows)
+            ],
+            "average_booking_times": [
+                user | {"avg_booking_time": int(row.avg_booking_time)} for user, row in zip(users, rows)
+            ],
+            "conversion_rates": [
+                user | {"conversion_rate": round(float(row.conversion_rate), 2)} for user, row in zip(users, rows)
+            ],
+            "next_cursor": next_cursor,
         }
 
-    def get_place_booking_stats(self):
-        results = (
-            self.session.query(
-                Booking.place_id, Place.name.label("place_name"), func.count(Booking.id).label("booking_count")
-            )
-            .join(Place, Booking.place_id == Place.id)
-            .group_by(Booking.place_id, Place.name)
-            .order_by(func.count(Booking.id).desc())
-            .all()
-        )
-
-        return [
-            {"place_id": str(row.place_id), "place_name": row.place_name, "booking_count": row.booking_count}
-            for row in results
-        ]
+    # aggregated by place
 
-    def get_place_visits_stats(self):
-        results = (
-            self.session.query(
-                Booking.place_id, Place.name.label("place_name"), func.count(Booking.id).label("visit_count")
-            )
-            .filter(Booking.is_activated_by_user == True)
-            .join(Place, Booking.place_id == Place.id)
-            .group_by(Booking.place_id, Place.name)
-            .order_by(func.count(Booking.id).desc())
-            .all()
+    def get_place_totals(self, params: StatParams):
+        statement = (
+            select(stat.place_id, Place.name.label("place_name"), *aggregates)
+            .join(Place, stat.place_id == Place.id)
+            .where(*window(params))
+            .group_by(stat.place_id, Place.name)
+            .order_by(booking_count.desc(), stat.place_id)
+            .limit(params.limit + 1)
         )
-
-        return [
-            {"place_id": str(row.place_id), "place_name": row.place_name, "visit_count": row.visit_count}
-            for row in results
-        ]
-
-    def get_place_user_bookings_stats(self):
-        results = (
-            self.session.query(
-                Booking.place_id,
-                Place.name.label("place_name"),
-                Booking.user_id,
-                User.username,
-                func.count(Booking.id).label("booking_count"),
+        if params.cursor is not None:
+            statement = statement.having(after(StatCursor.decode(params.cursor), stat.place_id))
+
+        return self.session.execute(statement).all()
+
+    def get_place_user_bookings_stats(self, place_ids: list[UUID], params: StatParams) -> dict[UUID, list[dict]]:
+        """Top `params.limit` users of each place in `place_ids`."""
+
+        ranked = (
+            select(
+                stat.place_id,
+                stat.user_id,
+                booking_count.label("booking_count"),
+                func.row_number()
+                .over(partition_by=stat.place_id, order_by=(booking_count.desc(), stat.user_id))
+                .label("rank"),
             )
-            .join(Place, Booking.place_id == Place.id)
-            .join(User, Booking.user_id == User.id)
-            .group_by(Booking.place_id, Place.name, Booking.user_id, User.username)
-            .order_by(Booking.place_id, func.count(Booking.id).desc())
-            .all()
+            .where(stat.place_id.in_(place_ids), *window(params))
+            .group_by(stat.place_id, stat.user_id)
+            .subquery()
         )
-
-        stats = {}
-        for row in results:
-            place_id = str(row.place_id)
-            user_stats = {
-                "user_id": str(row.user_id),
-                "username": row.username,
-                "booking_count": row.booking_count,
-            }
-
-            if place_id not in stats:
-                stats[place_id] = {"place_name": row.place_name, "users": []}
-            stats[place_id]["users"].append(user_stats)
-
-        return [
-            {"place_id": place_id, "place_name": data["place_name"], "users": data["users"]}
-            for place_id, data in stats.items()
-        ]
-
-    def get_place_average_booking_time(self):
-        results = (
-            self.session.query(
-                Booking.place_id,
-                Place.name.label("place_name"),
-                func.avg(Booking.end_second - Booking.start_second).label("avg_booking_time"),
-            )
-            .join(Place, Booking.place_id == Place.id)
-            .group_by(Booking.place_id, Place.name)
-            .all()
+        statement = (
+            select(ranked.c.place_id, ranked.c.user_id, User.username, ranked.c.booking_count)
+            .join(User, ranked.c.user_id == User.id)
+            .where(ranked.c.rank <= params.limit)
+            .order_by(ranked.c.place_id, ranked.c.rank)
         )
 
-        return [
-            {
-                "place_id": str(row.place_id),
-                "place_name": row.place_name,
-                "avg_booking_time": int(row.avg_booking_time) if row.avg_booking_time else 0,
-            }
-            for row in results
-        ]
-
-    def get_place_conversion_rate(self):
-        booking_stats = self.get_place_booking_stats()
-        visit_stats = {stat["place_id"]: stat["visit_count"] for stat in self.get_place_visits_stats()}
-
-        conversion_rates = []
-        for booking in booking_stats:
-            place_id = booking["place_id"]
-            total_bookings = booking["booking_count"]
-            visits = visit_stats.get(place_id, 0)
-
-            conversion_rate = visits / total_bookings if total_bookings > 0 else 0
-            conversion_rates.append(
-                {
-                    "place_id": place_id,
-                    "place_name": booking["place_name"],
-                    "conversion_rate": round(conversion_rate, 2),
-                }
+        stats = defaultdict(list)
+        for row in self.session.execute(statement):
+            stats[row.place_id].append(
+                {"user_id": str(row.user_id), "username": row.username, "booking_count": row.booking_count}
             )
+        return stats
 
-        return conversion_rates
+    def get_stat_aggregated_by_place(self, params: StatParams | None = None):
+        params = params or StatParams()
+        rows, next_cursor = paginate(self.get_place_totals(params), params.limit, "place_id")
+        users = self.get_place_user_bookings_stats([row.place_id for row in rows], params) if rows else {}
+        places = [{"place_id": str(row.place_id), "place_name": row.place_name} for row in rows]
 
-    def get_stat_aggregated_by_place(self):
         return {
-            "place_booking_stats": self.get_place_booking_stats(),
-            "place_visits_stats": self.get_place_visits_stats(),
-            "place_user_bookings_stats": self.get_place_user_bookings_stats(),
-            "average_booking_time": self.get_place_average_booking_time(),
-            "conversion_rate": self.get_place_conversion_rate(),
+            "place_booking_stats": [place | {"booking_count": row.booking_count} for place, row in zip(places, rows)],
+            "place_visit_stats": [
+                place | {"visit_count": row.visit_count}
+                for place, row in sorted(zip(places, rows), key=lambda pair: -pair[1].visit_count)
+                if row.visit_count
+            ],
+            "place_user_bookings_stats": [
+                place | {"users": users.get(row.place_id, [])} for place, row in zip(places, rows)
+            ],
+            "average_booking_times": [
+                place | {"avg_booking_time": int(row.avg_booking_time)} for place, row in zip(places, rows)
+            ],
+            "conversion_rates": [
+                place | {"conversion_rate": round(float(row.conversion_rate), 2)} for place, row in zip(places, rows)
+            ],
+            "next_cursor": next_cursor,
         }
 
-    def get_total_bookings(self) -> int:
-        return self.session.query(func.count(Booking.id)).scalar()
+    # total
 
-    def get_total_visits(self) -> int:
-        return self.session.query(func.count(Booking.id)).filter(Booking.is_activated_by_user.is_(True)).scalar()
+    def get_total_stat(self, params: DateWindowParams | None = None):
+        params = params or DateWindowParams()
+        row = self.session.execute(select(*aggregates).select_from(booking_stat).where(*window(params))).one()
 
-    def get_total_conversion_rate(self) -> float:
-        total_bookings = self.get_total_bookings()
-        total_visits = self.get_total_visits()
-        return total_visits / total_bookings if total_bookings > 0 else 0
+        return {
+            "total_bookings": row.booking_count,
+            "total_visits": row.visit_count,
+            "total_conversion_rate": float(row.conversion_rate),
+            "total_avg_booking_time": int(row.avg_booking_time),
+        }
 
-    def get_total_average_booking_time(self) -> int:
-        avg_time = self.session.query(func.avg(Booking.end_second - Booking.start_second)).scalar()
-        return int(avg_time) if avg_time is not None else 0
+    # occupancy
+
+    def get_occupancy(self, params: OccupancyParams):
+        places_statement = select(Place.id, Place.name).order_by(Place.name)
+        bookings_statement = (
+            select(
+                Booking.place_id,
+                func.array_agg(extract("isodow", Booking.date).cast(Integer) - 1).label("weekdays"),
+                func.array_agg(Booking.start_second).label("starts"),
+                func.array_agg(Booking.end_second).label("ends"),
+            )
+            .where(Booking.date.between(params.date_from, params.date_to))
+            .group_by(Booking.place_id)
+        )
+        if params.place_id is not None:
+            places_statement = places_statement.where(Place.id == params.place_id)
+            bookings_statement = bookings_statement.where(Booking.place_id == params.place_id)
+
+        # Bookings come back as one set of arrays per place, so they never pass through Python row by row
+        bookings = {row.place_id: row for row in self.session.execute(bookings_statement)}
+        available = occupancy.open_seconds(params.date_from, params.date_to)
+        empty = np.zeros_like(available)
+
+        places = []
+        for place in self.session.execute(places_statement):
+            row = bookings.get(place.id)
+            occupied = occupancy.occupied_seconds(row.weekdays, row.starts, row.ends) if row else empty
+            places.append(
+                {
+                    "place_id": place.id,
+                    "place_name": place.name,
+                    "occupied_seconds": occupied.tolist(),
+                    "utilization": occupancy.utilization(occupied, available).round(4).tolist(),
+                    "total_utilization": round(float(occupied.sum() / available.sum()), 4),
+                }
+            )
 
-    def get_total_stat(self):
         return {
-            "total_bookings": self.get_total_bookings(),
-            "total_visits": self.get_total_visits(),
-            "total_conversion_rate": self.get_total_conversion_rate(),
-            "total_avg_booking_time": self.get_total_average_booking_time(),
+            "date_from": params.date_from,
+            "date_to": params.date_to,
+            "open_seconds": available.tolist(),
+            "places": places,
         }
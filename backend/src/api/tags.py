@@ -7,3 +7,4 @@ class Tag(StrEnum):
     PLACES = "Places"
     BOOKINGS = "Bookings"
     STAT = "Stat"
+    DEBUG = "Debug"
@@ -0,0 +1,176 @@
+"""Delivery of many Telegram messages at once over one pooled HTTP client.
+
+Telegram allows about 30 messages per second per bot and one per second per chat, and answers 429 with a
+`retry_after` once either is exceeded. The dispatcher paces itself with token buckets for both limits, keeps at most
+`concurrency` requests in flight and retries throttled, failed and timed out requests with exponential backoff.
+With a `time_budget`, a message gives up instead of waiting past it, so a caller holding a lease on the message
+can have it retried later rather than sent twice.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, NamedTuple
+
+import httpx
+from prometheus_client import Counter, Histogram
+
+from src.api.telegram_bot.fields import SendResultEnum
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+telegram_messages = Counter("telegram_messages_total", "Telegram messages by delivery result", ["result"])
+telegram_retries = Counter("telegram_retries_total", "Telegram requests retried", ["reason"])
+telegram_request_seconds = Histogram(
+    "telegram_request_seconds",
+    "Duration of a single Telegram sendMessage request",
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+class Message(NamedTuple):
+    chat_id: int
+    text: str
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        # Waiters are served in order, the lock keeps a later one from taking the token an earlier one waits for
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class TelegramDispatcher:
+    """Sends messages through the Bot API, to be used as `async with TelegramDispatcher() as dispatcher`."""
+
+    def __init__(
+        self,
+        token: str = settings.TELEGRAM_BOT_API_TOKEN,
+        api_url: str = settings.TELEGRAM_API_URL,
+        concurrency: int = settings.TELEGRAM_CONCURRENCY,
+        rate: float = settings.TELEGRAM_RATE_LIMIT,
+        chat_rate: float = settings.TELEGRAM_CHAT_RATE_LIMIT,
+        max_retries: int = settings.TELEGRAM_MAX_RETRIES,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        time_budget: float | None = None,
+        max_chats: int = 10000,
+    ) -> None:
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+        self.concurrency = concurrency
+        self.chat_rate = chat_rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.time_budget = time_budget
+        self.max_chats = max_chats
+
+        self._bucket = TokenBucket(rate, capacity=rate)
+        self._chat_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "TelegramDispatcher":
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+        self._client = None
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, capacity=1)
+            if len(self._chat_buckets) > self.max_chats:
+                # At the bot-wide rate, the least recently used chat was last sent to long enough ago for its bucket
+                # to be full again, so a fresh one behaves the same
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+
+    def _retry_after(self, response: httpx.Response, attempt: int) -> float:
+        """The wait Telegram asked for, or the usual backoff if a proxy answered 429 with something else."""
+
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return self._delay(attempt)
+
+    async def send(self, message: Message) -> SendResultEnum:
+        """Delivers one message, or tells whether it was rejected for good or is worth sending again later."""
+
+        started_at = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            await self._chat_bucket(message.chat_id).acquire()
+            await self._bucket.acquire()
+
+            async with self._semaphore:
+                request_started_at = time.perf_counter()
+                try:
+                    response = await self._client.post(
+                        self.url, json={"chat_id": message.chat_id, "text": message.text}
+                    )
+                except httpx.TransportError as e:
+                    reason, delay, error = "transport", self._delay(attempt), repr(e)
+                else:
+                    if response.is_success:
+                        telegram_messages.labels("delivered").inc()
+                        return SendResultEnum.delivered
+                    if response.status_code == 429:
+                        reason, delay, error = "throttled", self._retry_after(response, attempt), response.text
+                    elif response.is_server_error:
+                        reason, delay, error = "server_error", self._delay(attempt), response.text
+                    else:
+                        # Blocked by the user, chat not found and the like: retrying will not help
+                        logger.warning(f"Telegram rejected a message to {message.chat_id}: {response.text}")
+                        telegram_messages.labels("rejected").inc()
+                        return SendResultEnum.rejected
+                finally:
+                    telegram_request_seconds.observe(time.perf_counter() - request_started_at)
+
+            if attempt == self.max_retries:
+                break
+            if self.time_budget is not None and time.monotonic() - started_at + delay > self.time_budget:
+                logger.warning(f"Giving up on a message to {message.chat_id}, retrying in {delay:.1f}s is over budget")
+                telegram_messages.labels("failed").inc()
+                return SendResultEnum.retry
+
+            telegram_retries.labels(reason).inc()
+            await asyncio.sleep(delay)
+
+        logger.warning(f"Giving up on a message to {message.chat_id} after {self.max_retries + 1} attempts: {error}")
+        telegram_messages.labels("failed").inc()
+        return SendResultEnum.retry
+
+    async def send_many(self, messages: Iterable[Message]) -> list[SendResultEnum]:
+        return await asyncio.gather(*(self.send(message) for message in messages))
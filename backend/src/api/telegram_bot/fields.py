@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class SendResultEnum(str, Enum):
+    delivered = "delivered"
+    # Telegram refused the message for good: the bot was blocked, the chat does not exist and the like
+    rejected = "rejected"
+    # Throttled or failed for a reason that may go away, worth sending again later
+    retry = "retry"
@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+import redis
+from prometheus_client import Counter
+from pydantic import BaseModel
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from src.api.users.models import User
+from src.config import settings
+
+user_cache_lookups_count = Counter(
+    "user_cache_lookups_total", "Authenticated user cache lookups", ["backend", "result"]
+)
+
+
+class CachedUser(BaseModel):
+    """Snapshot of a user row, enough to authorize a request without querying the database.
+
+    The password hash is deliberately left out, so it never ends up in Redis. It is loaded from the database
+    on first access for the few handlers that need it.
+    """
+
+    id: uuid.UUID
+    username: str
+    name: str | None
+    email: str | None
+    role: str
+    secret_id: uuid.UUID
+    telegram_id: int | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            secret_id=user.secret_id,
+            telegram_id=user.telegram_id,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def to_user(self, session: Session) -> User:
+        """Attaches the snapshot to `session` as a persistent user without emitting a SELECT."""
+
+        user = User(**self.model_dump())
+        make_transient_to_detached(user)
+        return session.merge(user, load=False)
+
+
+class UserCache:
+    """Short-lived user cache: a per-process LRU in front of an optional shared Redis.
+
+    Writes through `UserService` invalidate both layers, but other processes keep their local copy until it
+    expires, so `ttl` bounds how long a changed role or username may stay visible elsewhere.
+    """
+
+    def __init__(self, ttl: float, max_size: int, redis_client: redis.Redis | None = None) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis = redis_client
+        self._entries: OrderedDict[str, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any) -> CachedUser | None:
+        key = str(user_id)
+
+        entry = self._get_local(key)
+        user_cache_lookups_count.labels(backend="local", result="hit" if entry else "miss").inc()
+        if entry is not None or self.redis is None:
+            return entry
+
+        entry = self._get_redis(key)
+        user_cache_lookups_count.labels(backend="redis", result="hit" if entry else "miss").inc()
+        if entry is not None:
+            self._set_local(key, entry)
+        return entry
+
+    def set(self, user: User) -> None:
+        key = str(user.id)
+        entry = CachedUser.from_user(user)
+
+        self._set_local(key, entry)
+        if self.redis is not None:
+            try:
+                self.redis.set(self._redis_key(key), entry.model_dump_json(), ex=max(1, round(self.ttl)))
+            except redis.RedisError as e:
+                logging.warning(f"User cache: failed to write to Redis: {e}")
+
+    def invalidate(self, user_id: Any) -> None:
+        key = str(user_id)
+
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.redis is not None:
+            try:
+                self.redis.delete(self._redis_key(key))
+            except redis.RedisError as e:
+                logging.warning(f"User cache: failed to invalidate in Redis: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> CachedUser | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, entry = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, entry: CachedUser) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self, key: str) -> CachedUser | None:
+        try:
+            raw = self.redis.get(self._redis_key(key))
+        except redis.RedisError as e:
+            logging.warning(f"User cache: failed to read from Redis: {e}")
+            return None
+
+        return CachedUser.model_validate_json(raw) if raw else None
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"user:{key}"
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    redis_client=(
+        redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, socket_timeout=0.5)
+        if settings.USER_CACHE_REDIS
+        else None
+    ),
+)
@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, status
 
 from src.api.auth.deps import OptionalPasswordBearerDepends, PasswordBearerDepends
 from src.api.auth.schemas import JWT
+from src.api.users.cache import user_cache
 from src.api.users.models import User
 from src.config import settings
 from src.db.deps import SessionDepends
@@ -16,9 +17,14 @@ def get_current_user(session: SessionDepends, raw: PasswordBearerDepends) -> Use
     except Exception:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Ошибка верификации") from None
 
+    cached = user_cache.get(data.sub)
+    if cached is not None:
+        return cached.to_user(session)
+
     user = session.get(User, data.sub)
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Пользователь не авторизован.")
+    user_cache.set(user)
     return user
 
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 
 from src.api.users.deps import UserServiceDepends
 from src.api.users.me.deps import CurrentUserDepends
@@ -7,8 +8,10 @@ from src.api.users.models import User
 from src.api.users.schemas import UserPasswordRequest, UserUsernameRequest
 from src.config import settings
 from src.limiter import limiter
+from src.security import hash_password
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/me")
+router = APIRouter(prefix="/me", route_class=TracedRoute)
 
 
 @router.get(
@@ -27,7 +30,7 @@ router = APIRouter(prefix="/me")
     description="Эта ручка позволяет получить текущего пользователя.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_current_user(request: Request, current_user: CurrentUserDepends) -> User:
+def get_current_user(request: Request, current_user: CurrentUserDepends) -> User:
     return current_user
 
 
@@ -52,7 +55,7 @@ async def get_current_user(request: Request, current_user: CurrentUserDepends) -
     description="Эта ручка позволяет изменить логин текущего пользователя.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_current_user_username(
+def update_current_user_username(
     request: Request,
     args: UserUsernameRequest,
     service: UserServiceDepends,
@@ -92,6 +95,7 @@ async def update_current_user_password(
     service: UserServiceDepends,
     current_user: CurrentUserDepends,
 ) -> Response:
-    service.update_password(current_user, args.password)
+    hashed_password = await hash_password(args.password)
+    await run_in_threadpool(service.update_password, current_user, args.password, hashed_password)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
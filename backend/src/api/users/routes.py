@@ -16,8 +16,9 @@ from src.api.users.schemas import (
 )
 from src.config import settings
 from src.limiter import limiter
+from src.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=[Tag.USERS])
+router = APIRouter(prefix="/users", tags=[Tag.USERS], route_class=TracedRoute)
 router.include_router(me.router)
 
 
@@ -34,7 +35,7 @@ router.include_router(me.router)
     description="Эта ручка позволяет получить всех пользователей.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_users(request: Request, search_params: SearchParamsDepends, service: UserServiceDepends):
+def get_users(request: Request, search_params: SearchParamsDepends, service: UserServiceDepends):
     users = service.get_users(search_params)
 
     if not users:
@@ -56,7 +57,7 @@ async def get_users(request: Request, search_params: SearchParamsDepends, servic
     description="Эта ручка позволяет получить пользователя по его id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def get_user(request: Request, user_id: uuid.UUID, service: UserServiceDepends):
+def get_user(request: Request, user_id: uuid.UUID, service: UserServiceDepends):
     user = service.get_user_by_id(user_id)
 
     if not user:
@@ -83,7 +84,7 @@ async def get_user(request: Request, user_id: uuid.UUID, service: UserServiceDep
     description="Эта ручка позволяет изменить роль пользователя по его id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_current_user_role(
+def update_current_user_role(
     request: Request,
     args: UserRoleRequest,
     service: UserServiceDepends,
@@ -119,7 +120,7 @@ async def update_current_user_role(
     description="Эта ручка позволяет изменить секретный id пользователя по его user id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_user_secret(
+def update_user_secret(
     request: Request,
     service: UserServiceDepends,
     current_user: CurrentUserDepends,
@@ -154,7 +155,7 @@ async def update_user_secret(
     description="Эта ручка позволяет изменить ФИО пользователя по его id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_user_name(
+def update_user_name(
     request: Request,
     args: UserNameRequest,
     service: UserServiceDepends,
@@ -191,7 +192,7 @@ async def update_user_name(
     description="Эта ручка позволяет изменить электронную почту пользователя по его id.",
 )
 @limiter.limit(settings.API_RATE_LIMIT)
-async def update_user_email(
+def update_user_email(
     request: Request,
     args: UserEmailRequest,
     service: UserServiceDepends,
@@ -216,7 +217,7 @@ async def update_user_email(
     summary="Привязать Телеграм",
     description="Эта ручка позволяет привязать аккаунт в Телеграм к аккаунту пользователя.",
 )
-async def attach_telegram(
+def attach_telegram(
     request: Request,
     schema: AttachTelegramRequest,
     user_service: UserServiceDepends,
@@ -2,6 +2,7 @@ import uuid
 from uuid import UUID
 
 from src.api.params import SearchParams
+from src.api.users.cache import user_cache
 from src.api.users.models import User
 from src.api.users.schemas import UserRegistrationRequest
 from src.db.deps import SessionDepends
@@ -26,10 +27,10 @@ class UserService:
 
         return query.order_by(User.username).offset(search_params.offset).limit(search_params.limit).all()
 
-    def register_user(self, args: UserRegistrationRequest) -> User:
+    def register_user(self, args: UserRegistrationRequest, hashed_password: str | None = None) -> User:
         user = User(
             username=args.username,
-            password=get_password_hash(args.password),
+            password=hashed_password or get_password_hash(args.password),
             role=args.role,
         )
 
@@ -42,39 +43,32 @@ class UserService:
     def update_username(self, user: User, new_username: str) -> None:
         user.username = new_username
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
-    def update_password(self, user: User, new_password: str) -> None:
-        hashed_password = get_password_hash(password=new_password)
-        user.password = hashed_password
+    def update_password(self, user: User, new_password: str, hashed_password: str | None = None) -> None:
+        user.password = hashed_password or get_password_hash(password=new_password)
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
     def update_role(self, user: User, new_role: str) -> None:
         user.role = new_role
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
     def update_secret_id(self, user: User) -> None:
         user.secret_id = str(uuid.uuid4())
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
     def update_name(self, user: User, name: str):
         user.name = name
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
     def update_email(self, user: User, email: str):
         user.email = email
 
-        self.session.commit()
-        self.session.refresh(user)
+        self._save(user)
 
     @staticmethod
     def check_secret(user: User, secret_id: str) -> bool:
@@ -84,5 +78,9 @@ class UserService:
 
     def set_telegram_id(self, user: User, telegram_id: int):
         user.telegram_id = telegram_id
+        self._save(user)
+
+    def _save(self, user: User) -> None:
         self.session.commit()
         self.session.refresh(user)
+        user_cache.invalidate(user.id)
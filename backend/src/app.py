@@ -1,6 +1,6 @@
 from contextlib import asynccontextmanager
 
-from apscheduler.schedulers.background import BackgroundScheduler
+import anyio.to_thread
 from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -8,31 +8,19 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from src.api import router
-from src.api.scheduler.jobs import Jobs
-from src.api.users.service import UserService
 from src.config import settings
-from src.db.deps import get_session
 from src.limiter import limiter
+from src.tracing import RequestTracingMiddleware
 
 instrumentator = Instrumentator()
 
-scheduler = BackgroundScheduler()
-session = next(get_session())
-user_service = UserService(session=session)
-jobs = Jobs(session=session, user_service=user_service)
-# # Добавляем задачи в шедулер
-# scheduler.add_job(jobs.delete_expired_bookings, "interval", minutes=5)
-scheduler.add_job(jobs.notify_users_before_booking_start, "interval", minutes=1)
-scheduler.add_job(jobs.notify_users_before_booking_end, "interval", minutes=1)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    scheduler.start()
-    try:
-        yield
-    finally:
-        scheduler.shutdown()
+    # Синхронные ручки выполняются в пуле потоков anyio, его размер ограничивает число одновременных запросов к БД.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    # Фоновые задачи выполняет отдельный процесс, см. src/scheduler_worker.py
+    yield
 
 
 app = FastAPI(
@@ -53,6 +41,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Разбивка времени запроса на SQL и сериализацию, см. src/tracing.py
+app.add_middleware(RequestTracingMiddleware)
+
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore
 
 app.include_router(router)
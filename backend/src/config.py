@@ -2,7 +2,7 @@ from re import Pattern
 from typing import Any, Optional
 
 from fastapi_mail import ConnectionConfig
-from pydantic import PositiveInt, PostgresDsn, computed_field
+from pydantic import NonNegativeFloat, NonNegativeInt, PositiveFloat, PositiveInt, PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -25,14 +25,32 @@ class Settings(BaseSettings):
     API_PASSWORD_PATTERN: Optional[Pattern[str]] = None
     API_SEARCH_PARAMS_MAX_LIMIT: PositiveInt
     API_RATE_LIMIT: str
+    API_THREADPOOL_SIZE: PositiveInt = 40
 
     JWT_SECRET: str
     JWT_ALGORITHM: str
     JWT_EXPIRE_MINUTES: PositiveInt
 
+    PASSWORD_HASH_WORKERS: PositiveInt = 2
+
     REDIS_HOST: str
     REDIS_PORT: int
 
+    RATE_LIMIT_REDIS: bool = False
+    RATE_LIMIT_LOCAL_SHARE: NonNegativeFloat = 0.25
+    RATE_LIMIT_TRUSTED_PROXIES: NonNegativeInt = 0
+
+    TRACING_SLOW_REQUEST_SECONDS: PositiveFloat = 1
+    TRACING_MAX_STATEMENTS: PositiveInt = 50
+
+    DEBUG_PROFILE_ENABLED: bool = False
+    DEBUG_PROFILE_MAX_SECONDS: PositiveFloat = 60
+    DEBUG_PROFILE_INTERVAL_SECONDS: PositiveFloat = 0.005
+
+    USER_CACHE_TTL: PositiveFloat = 30
+    USER_CACHE_MAX_SIZE: PositiveInt = 10000
+    USER_CACHE_REDIS: bool = False
+
     YANDEX_S3_KEY: str
     YANDEX_S3_KEY_ID: str
     YANDEX_S3_ENDPOINT_URL: str
@@ -44,8 +62,39 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int
     POSTGRES_HOST: str
     POSTGRES_PATH: str
+    POSTGRES_ISOLATION_LEVEL: str = "READ COMMITTED"
+    POSTGRES_POOL_SIZE: PositiveInt = 5
+    POSTGRES_POOL_MAX_OVERFLOW: NonNegativeInt = 10
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_POOL_TIMEOUT: PositiveFloat = 30
+    POSTGRES_PGBOUNCER: bool = False
 
     TELEGRAM_BOT_API_TOKEN: str
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    TELEGRAM_CONCURRENCY: PositiveInt = 10
+    TELEGRAM_RATE_LIMIT: PositiveFloat = 30
+    TELEGRAM_CHAT_RATE_LIMIT: PositiveFloat = 1
+    TELEGRAM_MAX_RETRIES: NonNegativeInt = 3
+
+    STAT_REFRESH_MINUTES: PositiveInt = 5
+
+    METRICS_MAX_PLACES: PositiveInt = 200
+    METRICS_TOP_USERS: PositiveInt = 20
+
+    SCHEDULER_LEADER_CHECK_SECONDS: PositiveFloat = 5
+    WORKER_METRICS_PORT: int = 9200
+
+    BOOKING_EXPIRY_ENABLED: bool = False
+    BOOKING_EXPIRY_GRACE_MINUTES: PositiveInt = 10
+    BOOKING_EXPIRY_INTERVAL_MINUTES: PositiveInt = 1
+
+    NOTIFICATION_LEAD_MINUTES: PositiveInt = 15
+    NOTIFICATION_SYNC_SECONDS: PositiveFloat = 10
+    NOTIFICATION_OUTBOX_BATCH_SIZE: PositiveInt = 100
+    NOTIFICATION_OUTBOX_LEASE_SECONDS: PositiveFloat = 60
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: PositiveInt = 5
+    NOTIFICATION_OUTBOX_POLL_SECONDS: PositiveFloat = 1
 
     @computed_field
     @property
@@ -1,5 +1,28 @@
 from sqlalchemy import create_engine
 
 from src.config import settings
+from src.db.pool import InstrumentedNullPool, InstrumentedQueuePool, register_pool_metrics
+from src.tracing import register_query_tracing
 
-ENGINE = create_engine(str(settings.POSTGRES_URI), isolation_level="SERIALIZABLE")
+
+def get_engine_options() -> dict:
+    if settings.POSTGRES_PGBOUNCER:
+        # PgBouncer в режиме transaction сам держит пул соединений, а серверные prepared statements
+        # живут в конкретном соединении и ломаются при переключении между ними.
+        return {"poolclass": InstrumentedNullPool, "connect_args": {"prepare_threshold": None}}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_POOL_MAX_OVERFLOW,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+    }
+
+
+ENGINE = create_engine(
+    str(settings.POSTGRES_URI), isolation_level=settings.POSTGRES_ISOLATION_LEVEL, **get_engine_options()
+)
+register_pool_metrics(ENGINE.pool)
+register_query_tracing(ENGINE)
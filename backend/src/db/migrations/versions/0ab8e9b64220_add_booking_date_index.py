@@ -0,0 +1,22 @@
+"""add booking date index
+
+Revision ID: 0ab8e9b64220
+Revises: b51c418e6c1d
+Create Date: 2026-10-18 19:02:37.551940
+
+"""
+
+from alembic import op
+
+revision = "0ab8e9b64220"
+down_revision = "b51c418e6c1d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_booking_date"), "booking", ["date"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_booking_date"), table_name="booking")
@@ -0,0 +1,36 @@
+"""add notification outbox
+
+Revision ID: 3e9a7c5d2f10
+Revises: 6c2f1d9a4b7e
+Create Date: 2026-10-18 21:03:44.120387
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "3e9a7c5d2f10"
+down_revision = "6c2f1d9a4b7e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("booking_id", sa.UUID(), nullable=True),
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("available_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_notification_outbox_available_at"), "notification_outbox", ["available_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_notification_outbox_available_at"), table_name="notification_outbox")
+    op.drop_table("notification_outbox")
@@ -0,0 +1,22 @@
+"""add booking updated_at index
+
+Revision ID: 6c2f1d9a4b7e
+Revises: 0ab8e9b64220
+Create Date: 2026-10-18 20:14:08.902115
+
+"""
+
+from alembic import op
+
+revision = "6c2f1d9a4b7e"
+down_revision = "0ab8e9b64220"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_booking_updated_at", "booking", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_updated_at", table_name="booking")
@@ -0,0 +1,29 @@
+"""add booking unvisited index
+
+Revision ID: 9d41b6e0c3a8
+Revises: 3e9a7c5d2f10
+Create Date: 2026-10-18 21:47:19.305621
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "9d41b6e0c3a8"
+down_revision = "3e9a7c5d2f10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_booking_unvisited_date_start_second",
+        "booking",
+        ["date", "start_second"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_activated_by_user"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_unvisited_date_start_second", table_name="booking")
@@ -0,0 +1,55 @@
+"""add booking exclusion constraints
+
+Revision ID: aa4028bd1197
+Revises: c4bac0000e0a
+Create Date: 2026-10-18 11:40:05.902117
+
+"""
+
+from alembic import op
+
+revision = "aa4028bd1197"
+down_revision = "c4bac0000e0a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The exclusion constraints build their own GiST indexes over the same columns
+    op.drop_index("ix_booking_user_id_date_time_range", table_name="booking", postgresql_using="gist")
+    op.drop_index("ix_booking_place_id_date_time_range", table_name="booking", postgresql_using="gist")
+    op.create_exclude_constraint(
+        "booking_place_id_time_range_excl",
+        "booking",
+        ("place_id", "="),
+        ("date", "="),
+        ("time_range", "&&"),
+        using="gist",
+    )
+    op.create_exclude_constraint(
+        "booking_user_id_time_range_excl",
+        "booking",
+        ("user_id", "="),
+        ("date", "="),
+        ("time_range", "&&"),
+        using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("booking_user_id_time_range_excl", "booking", type_="exclude")
+    op.drop_constraint("booking_place_id_time_range_excl", "booking", type_="exclude")
+    op.create_index(
+        "ix_booking_place_id_date_time_range",
+        "booking",
+        ["place_id", "date", "time_range"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "ix_booking_user_id_date_time_range",
+        "booking",
+        ["user_id", "date", "time_range"],
+        unique=False,
+        postgresql_using="gist",
+    )
@@ -0,0 +1,37 @@
+"""add booking stat view
+
+Revision ID: b51c418e6c1d
+Revises: aa4028bd1197
+Create Date: 2026-10-18 18:05:12.418302
+
+"""
+
+from alembic import op
+
+revision = "b51c418e6c1d"
+down_revision = "aa4028bd1197"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW booking_stat AS
+        SELECT date,
+               user_id,
+               place_id,
+               count(*) AS booking_count,
+               count(*) FILTER (WHERE is_activated_by_user) AS visit_count,
+               sum(end_second - start_second) AS total_seconds
+        FROM booking
+        GROUP BY date, user_id, place_id
+        """
+    )
+    op.create_index(
+        "booking_stat_date_user_id_place_id_idx", "booking_stat", ["date", "user_id", "place_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW booking_stat")
@@ -0,0 +1,49 @@
+"""add booking time range
+
+Revision ID: c4bac0000e0a
+Revises: 5dd81b87d3fc
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "c4bac0000e0a"
+down_revision = "5dd81b87d3fc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "booking",
+        sa.Column(
+            "time_range",
+            postgresql.INT4RANGE(),
+            sa.Computed("int4range(start_second, end_second)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_booking_place_id_date_time_range",
+        "booking",
+        ["place_id", "date", "time_range"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "ix_booking_user_id_date_time_range",
+        "booking",
+        ["user_id", "date", "time_range"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_user_id_date_time_range", table_name="booking", postgresql_using="gist")
+    op.drop_index("ix_booking_place_id_date_time_range", table_name="booking", postgresql_using="gist")
+    op.drop_column("booking", "time_range")
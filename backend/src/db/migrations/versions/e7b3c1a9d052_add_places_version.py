@@ -0,0 +1,49 @@
+"""add places version
+
+Revision ID: e7b3c1a9d052
+Revises: 9d41b6e0c3a8
+Create Date: 2026-10-18 23:12:40.518734
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "e7b3c1a9d052"
+down_revision = "9d41b6e0c3a8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "places_version",
+        sa.Column("id", sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.CheckConstraint("id", name="places_version_single_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO places_version DEFAULT VALUES")
+    op.execute(
+        """
+        CREATE FUNCTION bump_places_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE places_version SET version = version + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER place_bump_places_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON place
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_places_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER place_bump_places_version ON place")
+    op.execute("DROP FUNCTION bump_places_version()")
+    op.drop_table("places_version")
@@ -0,0 +1,46 @@
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+pool_size = Gauge("db_pool_size", "Configured number of persistent connections in the pool")
+pool_checked_out = Gauge("db_pool_checked_out", "Number of connections currently checked out of the pool")
+pool_overflow = Gauge("db_pool_overflow", "Number of overflow connections currently open above the pool size")
+
+
+class CheckoutTimerMixin:
+    """Records how long each checkout waited, including the time to open a new connection if one was needed."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - started_at)
+
+
+class InstrumentedQueuePool(CheckoutTimerMixin, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(CheckoutTimerMixin, NullPool):
+    pass
+
+
+def register_pool_metrics(pool: Pool) -> None:
+    """Binds the pool gauges to `pool`; they are read lazily when Prometheus scrapes /metrics.
+
+    Only a QueuePool keeps connections around, with NullPool there is nothing to report besides checkout time.
+    """
+
+    if not isinstance(pool, QueuePool):
+        return
+
+    pool_size.set_function(pool.size)
+    pool_checked_out.set_function(pool.checkedout)
+    pool_overflow.set_function(lambda: max(pool.overflow(), 0))
@@ -1,4 +1,160 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""Rate limiting shared by all API workers, with a local fast path for callers that are far from their limit.
 
-limiter = Limiter(key_func=get_remote_address)
+Counters live in Redis when `RATE_LIMIT_REDIS` is on, so the limit holds across uvicorn workers and instances.
+To spare most requests the round-trip, every worker may admit up to `RATE_LIMIT_LOCAL_SHARE` of a limit per window
+on its own, from a token bucket that refills at the same share of the limit's rate. Hits admitted locally are
+reported to Redis in a single increment as soon as the caller runs out of local tokens; a caller who never runs out
+is, by construction, below the limit. The price is that a burst can overshoot the limit by up to
+workers x share before Redis sees it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from limits import RateLimitItem
+from limits.strategies import RateLimiter
+from prometheus_client import Counter, Histogram
+from slowapi import Limiter as BaseLimiter
+from starlette.requests import Request
+
+from src.config import settings
+
+rate_limit_check_seconds = Histogram(
+    "rate_limit_check_seconds",
+    "Time spent deciding whether a request is within its rate limit",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+rate_limit_decisions = Counter(
+    "rate_limit_decisions_total", "Rate limit decisions by where they were made", ["decided_by", "result"]
+)
+
+
+def get_client_address(request: Request) -> str:
+    """Address of the client as seen by the outermost trusted proxy.
+
+    Each proxy appends the address it received the request from to X-Forwarded-For, so only the last
+    `RATE_LIMIT_TRUSTED_PROXIES` entries can be trusted, anything before them is whatever the client sent.
+    """
+
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if settings.RATE_LIMIT_TRUSTED_PROXIES and forwarded_for:
+        addresses = [address.strip() for address in forwarded_for.split(",")]
+        return addresses[max(len(addresses) - settings.RATE_LIMIT_TRUSTED_PROXIES, 0)]
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """Signed-in users are limited by their id wherever they come from, everybody else by address."""
+
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])['sub']}"
+        except (jwt.PyJWTError, KeyError):
+            pass
+    return f"ip:{get_client_address(request)}"
+
+
+class LocalBucket:
+    __slots__ = ("tokens", "updated_at", "pending")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+        # Hits admitted locally that the storage does not know about yet
+        self.pending = 0
+
+
+class LocallyBufferedRateLimiter:
+    """Wraps a `limits` strategy with the per-worker token buckets described above."""
+
+    def __init__(self, storage_limiter: RateLimiter, share: float, max_keys: int = 10000) -> None:
+        self.storage_limiter = storage_limiter
+        self.share = share
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, LocalBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take_local(self, item: RateLimitItem, key: str, cost: int) -> tuple[bool, int]:
+        """Takes `cost` local tokens if there are enough, otherwise hands back the hits to report to storage."""
+
+        capacity = item.amount * self.share
+        rate = capacity / item.get_expiry()
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = LocalBucket(capacity, now)
+                if len(self._buckets) > self.max_keys:
+                    # Forgetting a caller only loses its unreported hits, which is within the overshoot anyway
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated_at) * rate)
+                bucket.updated_at = now
+
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                bucket.pending += cost
+                return True, 0
+
+            pending, bucket.pending = bucket.pending, 0
+            return False, pending
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        key = item.key_for(*identifiers)
+        admitted, pending = self._take_local(item, key, cost) if self.share else (False, 0)
+        if admitted:
+            rate_limit_decisions.labels("local", "allowed").inc()
+            return True
+
+        if pending:
+            self.storage_limiter.hit(item, *identifiers, cost=pending)
+        allowed = self.storage_limiter.hit(item, *identifiers, cost=cost)
+        rate_limit_decisions.labels("storage", "allowed" if allowed else "limited").inc()
+        return allowed
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        return self.storage_limiter.test(item, *identifiers, cost=cost)
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str):
+        return self.storage_limiter.get_window_stats(item, *identifiers)
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        with self._lock:
+            self._buckets.pop(item.key_for(*identifiers), None)
+        self.storage_limiter.clear(item, *identifiers)
+
+
+class Limiter(BaseLimiter):
+    def __init__(self, *args, local_share: float = 0, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # slowapi has no public hook for the strategy, `_limiter` is what its `limiter` property hands out while the
+        # storage is up. The slowapi versions this holds for are pinned in requirements/common.txt and checked by
+        # test_limiter_consults_the_buffered_strategy
+        self._limiter = LocallyBufferedRateLimiter(self._limiter, local_share)
+
+    def _check_request_limit(self, *args, **kwargs) -> None:
+        started_at = time.perf_counter()
+        try:
+            super()._check_request_limit(*args, **kwargs)
+        finally:
+            rate_limit_check_seconds.observe(time.perf_counter() - started_at)
+
+
+limiter = (
+    Limiter(
+        key_func=get_rate_limit_key,
+        storage_uri=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        storage_options={"socket_timeout": 0.5},
+        # While Redis is unreachable every worker limits on its own instead of failing the requests
+        in_memory_fallback_enabled=True,
+        local_share=settings.RATE_LIMIT_LOCAL_SHARE,
+    )
+    if settings.RATE_LIMIT_REDIS
+    else Limiter(key_func=get_rate_limit_key)
+)
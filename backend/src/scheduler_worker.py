@@ -0,0 +1,166 @@
+"""Runs the background jobs outside of the API processes.
+
+Any number of instances can be started, they elect a leader with a Postgres advisory lock and only the leader runs
+the jobs. The lock belongs to the leader's connection, so it is released as soon as that connection closes,
+whether the process stopped cleanly, crashed or lost the network, and a standby takes over on its next attempt.
+Session-level advisory locks need a real server connection: behind PgBouncer in transaction mode, point this
+process straight at Postgres.
+
+Every instance, leader or standby, keeps its own snapshot of the per-user metrics taken from the `booking_stat`
+rollup, so all of them export the same series.
+
+Usage: python -m src.scheduler_worker
+"""
+
+import logging
+import logging.config
+import signal
+import threading
+from typing import Callable
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from prometheus_client import REGISTRY, Gauge, start_http_server
+from sqlalchemy import Connection, Engine, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.api.scheduler.jobs import Jobs
+from src.api.scheduler.notifications import NotificationScheduler
+from src.api.stat.metrics import user_stat_collector
+from src.config import settings
+from src.db import ENGINE
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary, only has to be the same for every instance ("bookit" in ASCII)
+LEADER_LOCK_KEY = 0x626F6F6B6974
+
+scheduler_leader = Gauge("scheduler_leader", "1 while this instance holds the scheduler leader lock")
+
+
+class LeaderElection:
+    def __init__(self, engine: Engine = ENGINE, key: int = LEADER_LOCK_KEY) -> None:
+        self.engine = engine
+        self.key = key
+        self._connection: Connection | None = None
+
+    def try_acquire(self) -> bool:
+        connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.scalar(select(func.pg_try_advisory_lock(self.key)))
+        except DBAPIError:
+            connection.invalidate()
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
+
+        self._connection = connection
+        scheduler_leader.set(1)
+        return True
+
+    def is_held(self) -> bool:
+        try:
+            self._connection.execute(text("SELECT 1"))
+        except DBAPIError:
+            logger.exception("Соединение лидера потеряно, блокировка снята")
+            self._close()
+            return False
+        return True
+
+    def release(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.execute(select(func.pg_advisory_unlock(self.key)))
+            except DBAPIError:
+                pass
+            self._close()
+
+    def _close(self) -> None:
+        # The connection is not returned to the pool: closing it for real is what frees the lock if the unlock did
+        # not get through
+        scheduler_leader.set(0)
+        if self._connection is not None:
+            self._connection.invalidate()
+            self._connection.close()
+            self._connection = None
+
+
+def create_scheduler(jobs: Jobs) -> BackgroundScheduler:
+    scheduler = BackgroundScheduler(job_defaults={"coalesce": True, "max_instances": 1})
+    scheduler.add_job(jobs.refresh_booking_stat, "interval", minutes=settings.STAT_REFRESH_MINUTES)
+    if settings.BOOKING_EXPIRY_ENABLED:
+        scheduler.add_job(jobs.delete_expired_bookings, "interval", minutes=settings.BOOKING_EXPIRY_INTERVAL_MINUTES)
+    return scheduler
+
+
+def lead(election: LeaderElection, stopped: threading.Event) -> None:
+    """Runs the jobs until the lock is lost or the process is asked to stop."""
+
+    scheduler = create_scheduler(Jobs())
+    notification_scheduler = NotificationScheduler()
+    scheduler.start()
+    notification_scheduler.start()
+    try:
+        while not stopped.wait(settings.SCHEDULER_LEADER_CHECK_SECONDS) and election.is_held():
+            pass
+    finally:
+        notification_scheduler.stop()
+        scheduler.shutdown()
+
+
+def export_user_stat(
+    stopped: threading.Event, session_factory: Callable[[], Session] = lambda: Session(ENGINE)
+) -> None:
+    """Refreshes the per-user metrics snapshot of this instance until the process is asked to stop."""
+
+    while True:
+        try:
+            with session_factory() as session:
+                user_stat_collector.refresh(session)
+        except Exception:
+            logger.exception("Ошибка при обновлении метрик статистики пользователей")
+        if stopped.wait(settings.STAT_REFRESH_MINUTES * 60):
+            return
+
+
+def run(stopped: threading.Event) -> None:
+    election = LeaderElection()
+    while not stopped.is_set():
+        try:
+            leader = election.try_acquire()
+        except DBAPIError:
+            logger.exception("Не удалось проверить блокировку лидера")
+            leader = False
+
+        if not leader:
+            stopped.wait(settings.SCHEDULER_LEADER_CHECK_SECONDS)
+            continue
+
+        logger.info("Экземпляр стал лидером и запускает задачи")
+        try:
+            lead(election, stopped)
+        finally:
+            election.release()
+            logger.info("Экземпляр перестал быть лидером")
+
+
+def main() -> None:
+    logging.config.dictConfig(settings.LOGGING)
+    REGISTRY.register(user_stat_collector)
+    start_http_server(settings.WORKER_METRICS_PORT)
+
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stopped.set())
+
+    # Reading the rollup is cheap, so standbys refresh their snapshot too instead of exporting it empty
+    threading.Thread(target=export_user_stat, args=(stopped,), name="user-stat-export", daemon=True).start()
+
+    run(stopped)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,39 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 import jwt
 from passlib.context import CryptContext
+from prometheus_client import Gauge, Histogram
 
 from src.api.auth.schemas import JWT, AccessTokenResponse
 from src.config import settings
 
+T = TypeVar("T")
+
 crypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow and CPU-bound. It runs on its own small pool, so a burst of logins
+# neither blocks the event loop nor takes every thread that database-bound handlers need.
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+password_hash_queued = Gauge("password_hash_queued", "Password hash operations waiting for a free worker")
+password_hash_wait_seconds = Histogram(
+    "password_hash_wait_seconds",
+    "Time a password hash operation waited for a free worker",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2.5),
+)
+
 
 def create_access_token(subject: Any, minutes: int = settings.JWT_EXPIRE_MINUTES) -> AccessTokenResponse:
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
@@ -25,8 +50,45 @@ def get_password_hash(password: str) -> str:
     return crypt_context.hash(password)
 
 
+async def _run_in_hash_pool(operation: str, fn: Callable[..., T], *args: Any) -> T:
+    submitted_at = time.perf_counter()
+    password_hash_queued.inc()
+
+    def run() -> T:
+        started_at = time.perf_counter()
+        password_hash_queued.dec()
+        password_hash_wait_seconds.observe(started_at - submitted_at)
+        try:
+            return fn(*args)
+        finally:
+            password_hash_duration_seconds.labels(operation=operation).observe(time.perf_counter() - started_at)
+
+    future = password_hash_executor.submit(run)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # The client went away while the job was still queued: drop it instead of hashing for nobody.
+        if future.cancel():
+            password_hash_queued.dec()
+        raise
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """`is_valid_password` on the password hash pool."""
+
+    return await _run_in_hash_pool("verify", is_valid_password, plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """`get_password_hash` on the password hash pool."""
+
+    return await _run_in_hash_pool("hash", get_password_hash, password)
+
+
 __all__ = [
     "create_access_token",
     "is_valid_password",
     "get_password_hash",
+    "verify_password",
+    "hash_password",
 ]
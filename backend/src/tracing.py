@@ -0,0 +1,203 @@
+"""Where the time of each API request goes: SQL, response serialization and everything else.
+
+The middleware starts a `RequestStats` for every HTTP request and keeps it in a context variable. Sync handlers run
+in the anyio thread pool with a copy of the context, which still points at the same object, so the cursor events
+of the engine and `TracedRoute` add to it from whichever thread they run in. Once the response is sent the numbers
+are recorded per route template, and a request slower than `TRACING_SLOW_REQUEST_SECONDS` is logged with the
+statements it ran.
+"""
+
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable
+
+from fastapi.routing import APIRoute
+from prometheus_client import Histogram
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+http_request_serialization_seconds = Histogram(
+    "http_request_serialization_seconds",
+    "Time spent validating and serializing the value returned by the endpoint",
+    ["method", "route"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+@dataclass
+class RequestStats:
+    method: str
+    path: str
+    # Path template of the matched route, requests that matched none are not recorded
+    route: str | None = None
+    queries: int = 0
+    db_seconds: float = 0
+    serialization_seconds: float = 0
+    endpoint_finished_at: float | None = None
+    # The first `TRACING_MAX_STATEMENTS` statements with their durations, for the slow request log
+    statements: list[tuple[str, float]] = field(default_factory=list)
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+# SQL
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if request_stats.get() is not None:
+        context._tracing_started_at = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = request_stats.get()
+    started_at = getattr(context, "_tracing_started_at", None)
+    if stats is None or started_at is None:
+        return
+
+    elapsed = time.perf_counter() - started_at
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if len(stats.statements) < settings.TRACING_MAX_STATEMENTS:
+        stats.statements.append((statement, elapsed))
+
+
+def register_query_tracing(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+# serialization
+
+
+def mark_endpoint_finished() -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.endpoint_finished_at = time.perf_counter()
+
+
+def timed_endpoint(call: Callable) -> Callable:
+    """Wraps the endpoint so that the route knows when it returned; generator endpoints are left alone."""
+
+    if getattr(call, "__traced__", False):
+        return call
+
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def endpoint(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                mark_endpoint_finished()
+
+        endpoint.__traced__ = True
+        return endpoint
+
+    if inspect.isfunction(call) and not (inspect.isgeneratorfunction(call) or inspect.isasyncgenfunction(call)):
+
+        @functools.wraps(call)
+        def endpoint(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                mark_endpoint_finished()
+
+        endpoint.__traced__ = True
+        return endpoint
+
+    return call
+
+
+class TracedRoute(APIRoute):
+    """Names the request after its path template and times what FastAPI does with the endpoint's return value."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        # Included routers build their routes again from `endpoint`, which is then already wrapped
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def traced_handler(request):
+            stats = request_stats.get()
+            if stats is None:
+                return await handler(request)
+
+            stats.route = route
+            stats.endpoint_finished_at = None
+            response = await handler(request)
+            if stats.endpoint_finished_at is not None:
+                stats.serialization_seconds += time.perf_counter() - stats.endpoint_finished_at
+            return response
+
+        return traced_handler
+
+
+# middleware
+
+
+def log_slow_request(stats: RequestStats, elapsed: float) -> None:
+    lines = [
+        f"Медленный запрос {stats.method} {stats.path}: {elapsed:.3f} с, "
+        f"SQL {stats.db_seconds:.3f} с в {stats.queries} запросах, сериализация {stats.serialization_seconds:.3f} с"
+    ]
+    lines += [f"  {seconds * 1000:.1f} мс  {' '.join(statement.split())}" for statement, seconds in stats.statements]
+    if stats.queries > len(stats.statements):
+        lines.append(f"  ... и ещё {stats.queries - len(stats.statements)}")
+    logger.warning("\n".join(lines))
+
+
+class RequestTracingMiddleware:
+    """Pure ASGI so that streamed response bodies, and the queries they run, are part of the request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope["method"], path=scope["path"])
+        token = request_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            request_stats.reset(token)
+            self.record(stats, elapsed)
+
+    @staticmethod
+    def record(stats: RequestStats, elapsed: float) -> None:
+        if stats.route is None:
+            return
+
+        labels = (stats.method, stats.route)
+        http_request_db_queries.labels(*labels).observe(stats.queries)
+        http_request_db_seconds.labels(*labels).observe(stats.db_seconds)
+        http_request_serialization_seconds.labels(*labels).observe(stats.serialization_seconds)
+        if elapsed >= settings.TRACING_SLOW_REQUEST_SECONDS:
+            log_slow_request(stats, elapsed)
@@ -7,6 +7,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
+from src.api.users.cache import user_cache
 from src.app import app
 from src.config import settings
 from src.db.deps import get_session
@@ -32,6 +33,7 @@ def get_test_session() -> Iterator[Session]:
 def setup_database():
     Base.metadata.drop_all(bind=ENGINE)
     Base.metadata.create_all(bind=ENGINE)
+    user_cache.clear()
 
 
 @pytest.fixture
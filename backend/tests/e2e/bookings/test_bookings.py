@@ -6,8 +6,10 @@ import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from tests.conftest import ENGINE
 from tests.utils.bookings import create_booking
 from tests.utils.places import create_places
+from tests.utils.queries import count_queries
 
 
 class TestGetUserBookings:
@@ -136,3 +138,29 @@ class TestGetBooking:
         )
         assert response.status_code == status.HTTP_200_OK, response.json()
         assert response.json().get("id") == booking_response.get("id")
+
+
+class TestBookingsQueryCount:
+    place_id = "c8b70475-af22-4991-8d51-442ab164b1d9"
+    query_params = {"date": "2025-03-06", "start_second": 0, "end_second": 86399}
+
+    def get_queries(self, client: TestClient, url: str, params: dict | None = None) -> list[str]:
+        with count_queries(ENGINE) as statements:
+            response = client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK, response.json()
+        return statements
+
+    def test_bookings_query_count_is_constant(self, auth_guest_client: TestClient):
+        create_places()
+        place_bookings_url = f"/api/places/{self.place_id}/bookings"
+
+        create_booking(auth_guest_client, self.place_id, "2025-03-06", 1000, 2000)
+        user_queries = self.get_queries(auth_guest_client, "/api/users/me/bookings")
+        place_queries = self.get_queries(auth_guest_client, place_bookings_url, self.query_params)
+
+        for hour in range(1, 5):
+            create_booking(auth_guest_client, self.place_id, "2025-03-06", hour * 3600, hour * 3600 + 1000)
+        sleep(1)
+
+        assert len(self.get_queries(auth_guest_client, "/api/users/me/bookings")) == len(user_queries)
+        assert len(self.get_queries(auth_guest_client, place_bookings_url, self.query_params)) == len(place_queries)
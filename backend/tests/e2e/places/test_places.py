@@ -1,6 +1,9 @@
+import base64
+
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from tests.utils.bookings import create_booking
 from tests.utils.places import create_places
 
 
@@ -68,6 +71,29 @@ class TestGetPlacesAvailability:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
+class TestGetPlacesAvailabilityGrid:
+    def test_get_places_availability_grid_no_auth(self, client: TestClient):
+        response = client.get("/api/places/availability/grid", params={"date": "2024-01-01"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_get_places_availability_grid_ok(self, auth_guest_client: TestClient):
+        create_places()
+        create_booking(auth_guest_client, "3fa85f64-5717-4562-b3fc-2c963f66afa6", "2024-01-01", 0, 1800)
+
+        response = auth_guest_client.get("/api/places/availability/grid", params={"date": "2024-01-01"})
+        assert response.status_code == status.HTTP_200_OK, response.json()
+        data = response.json()
+        assert data["slot"] == 900
+        assert data["slots_count"] == 96
+        occupancies = {place["id"]: base64.urlsafe_b64decode(place["occupancy"]) for place in data["places"]}
+        assert occupancies["3fa85f64-5717-4562-b3fc-2c963f66afa6"][0] == 0b11
+        assert occupancies["c8b70475-af22-4991-8d51-442ab164b1d9"] == bytes(12)
+
+    def test_get_places_availability_grid_422(self, auth_guest_client: TestClient):
+        response = auth_guest_client.get("/api/places/availability/grid", params={"date": "2024-01-01", "slot": 1})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class TestPatchPlace:
     def test_patch_place_no_auth(self, client: TestClient):
         create_places()
@@ -0,0 +1,55 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.api.bookings import metrics
+from src.api.bookings.metrics import OTHER, BoundedLabel, booking_labels, new_bookings_count
+
+
+def series(name: str) -> set:
+    return {
+        tuple(sorted(sample.labels.items()))
+        for family in REGISTRY.collect()
+        for sample in family.samples
+        if sample.name == name
+    }
+
+
+@pytest.fixture
+def place_label(monkeypatch):
+    label = BoundedLabel(5)
+    monkeypatch.setattr(metrics, "place_label", label)
+    return label
+
+
+def test_bounded_label_admits_first_values_only():
+    label = BoundedLabel(2)
+
+    assert [label(value) for value in ("a", "b", "c", "a", "d", "b")] == ["a", "b", OTHER, "a", OTHER, "b"]
+
+
+def test_booking_labels_fold_unknown_values(place_label):
+    user = SimpleNamespace(id=uuid.uuid4(), role="superuser")
+    place = SimpleNamespace(id=uuid.uuid4(), name="A1", type="hall")
+
+    assert booking_labels(user, place) == {"role": OTHER, "place_type": OTHER, "place": "A1"}
+
+
+def test_series_count_does_not_grow_with_users(place_label):
+    roles = ("admin", "student", "guest")
+    types = ("seat", "room")
+
+    def record(users: int) -> int:
+        for n in range(users):
+            user = SimpleNamespace(id=uuid.uuid4(), role=roles[n % len(roles)])
+            place = SimpleNamespace(id=uuid.uuid4(), name=f"place-{n % 50}", type=types[n % len(types)])
+            new_bookings_count.labels(**booking_labels(user, place)).inc()
+        return len(series("new_bookings_total"))
+
+    after_thousand = record(1000)
+    after_thousands = record(5000)
+
+    assert after_thousands == after_thousand
+    assert after_thousands <= (len(roles) + 1) * (len(types) + 1) * (place_label.max_values + 1)
@@ -4,12 +4,18 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy import Update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Query
 
+from src.api.bookings.fields import BookingConflictEnum
 from src.api.bookings.models import Booking
 from src.api.bookings.params import DateParams
 from src.api.bookings.schemas import CreateBookingRequest, UpdateBookingRequest
-from src.api.bookings.service import BookingService
+from src.api.bookings.service import BookingConflictError, BookingService
+from src.api.places.schemas import PlaceResponse
+from src.api.users.schemas import UserResponse
 
 
 @pytest.fixture
@@ -28,10 +34,10 @@ def test_get_bookings_by_place_with_date_params(service, dummy_session):
     date_params = DateParams(date=today, start_second=5000, end_second=6000)
     expected_bookings = [SimpleNamespace(id=uuid.uuid4())]
 
-    # Setup chained calls: session.query(Booking).filter(...).all()
+    # Setup chained calls: session.query(Booking).filter(...).options(...).all()
     mock_query = MagicMock(spec=Query)
     dummy_session.query.return_value = mock_query
-    mock_query.filter.return_value.all.return_value = expected_bookings
+    mock_query.filter.return_value.options.return_value.all.return_value = expected_bookings
 
     result = service.get_bookings_by_place_with_date_params(place_id, date_params)
     dummy_session.query.assert_called_once_with(Booking)
@@ -44,13 +50,56 @@ def test_get_bookings_by_user(service, dummy_session):
 
     mock_query = MagicMock(spec=Query)
     dummy_session.query.return_value = mock_query
-    mock_query.filter.return_value.all.return_value = expected_bookings
+    mock_query.filter.return_value.options.return_value.all.return_value = expected_bookings
 
     result = service.get_bookings_by_user(user_id)
     dummy_session.query.assert_called_once_with(Booking)
     assert result == expected_bookings
 
 
+def test_to_responses_reuses_user_and_place_responses(service):
+    user = MagicMock(id=uuid.uuid4())
+    places = [MagicMock(id=uuid.uuid4()), MagicMock(id=uuid.uuid4())]
+    bookings = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            date=datetime.date.today(),
+            start_second=i * 3600,
+            end_second=i * 3600 + 1800,
+            is_activated_by_user=False,
+            user_id=user.id,
+            user=user,
+            place_id=places[i % 2].id,
+            place=places[i % 2],
+        )
+        for i in range(6)
+    ]
+    user.to_response.return_value = UserResponse(
+        id=user.id,
+        username="johndoe",
+        role="guest",
+        name=None,
+        email=None,
+        secret_id=uuid.uuid4(),
+        telegram_id=None,
+        created_at=datetime.datetime.now(),
+        updated_at=datetime.datetime.now(),
+    )
+    for place in places:
+        place.to_response.return_value = PlaceResponse(
+            id=place.id, name="Стол", type="seat", capacity=1, access_level="guest"
+        )
+
+    responses = service.to_responses(bookings)
+
+    assert [response.id for response in responses] == [booking.id for booking in bookings]
+    user.to_response.assert_called_once()
+    for place in places:
+        place.to_response.assert_called_once()
+    assert responses[0].user is responses[-1].user
+    assert responses[0].place is responses[2].place
+
+
 def test_get_booking_by_id(service, dummy_session):
     booking_id = uuid.uuid4()
     dummy_booking = SimpleNamespace(id=booking_id)
@@ -63,38 +112,6 @@ def test_get_booking_by_id(service, dummy_session):
     assert result == dummy_booking
 
 
-def test_is_data_valid_true(service, dummy_session):
-    # No overlapping booking found => valid
-    today = datetime.date.today()
-    place_id = str(uuid.uuid4())
-    start = 1000
-    end = 2000
-    mock_query = MagicMock(spec=Query)
-    dummy_session.query.return_value = mock_query
-    # first() returns None to indicate no overlap
-    mock_query.filter.return_value.first.return_value = None
-
-    result = service.is_data_valid(today, start, end, place_id)
-    dummy_session.query.assert_called_once_with(Booking)
-    assert result is True
-
-
-def test_is_data_valid_false(service, dummy_session):
-    # Overlapping booking exists => invalid
-    today = datetime.date.today()
-    place_id = str(uuid.uuid4())
-    start = 1000
-    end = 2000
-    dummy_booking = SimpleNamespace(id=uuid.uuid4())
-    mock_query = MagicMock(spec=Query)
-    dummy_session.query.return_value = mock_query
-    mock_query.filter.return_value.first.return_value = dummy_booking
-
-    result = service.is_data_valid(today, start, end, place_id, current_booking_id="some-id")
-    dummy_session.query.assert_called_once_with(Booking)
-    assert result is False
-
-
 def test_create_booking(service, dummy_session):
     today = datetime.date.today()
     booking_data = CreateBookingRequest(date=today, start_second=1200, end_second=1800)
@@ -147,26 +164,52 @@ def test_get_booking_by_place_and_id(service, dummy_session):
 def test_update_booking(service, dummy_session):
     booking_id = uuid.uuid4()
     today = datetime.date.today()
-    dummy_booking = SimpleNamespace(
-        id=booking_id, date=today, start_second=1000, end_second=2000, place_id=str(uuid.uuid4())
-    )
-    # Simulate query returns dummy_booking
-    mock_query = MagicMock(spec=Query)
-    dummy_session.query.return_value = mock_query
-    mock_query.filter.return_value.first.return_value = dummy_booking
-
     dummy_session.commit = MagicMock()
 
     update_data = UpdateBookingRequest(date=today, start_second=1100, end_second=1900, place_id=str(uuid.uuid4()))
     service.update_booking(booking_id, update_data)
 
-    assert dummy_booking.date == today
-    assert dummy_booking.start_second == 1100
-    assert dummy_booking.end_second == 1900
-    assert dummy_booking.place_id == update_data.place_id
+    # The booking is moved by a single UPDATE statement without loading it first
+    dummy_session.query.assert_not_called()
+    dummy_session.execute.assert_called_once()
+    statement = dummy_session.execute.call_args.args[0]
+    assert isinstance(statement, Update)
+    params = statement.compile().params
+    assert params["date"] == today
+    assert params["start_second"] == 1100
+    assert params["end_second"] == 1900
+    assert params["place_id"] == update_data.place_id
     dummy_session.commit.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    ("constraint_name", "expected"),
+    [
+        ("booking_place_id_time_range_excl", BookingConflictEnum.place),
+        ("booking_user_id_time_range_excl", BookingConflictEnum.user),
+    ],
+)
+def test_create_booking_conflict(service, dummy_session, constraint_name, expected):
+    booking_data = CreateBookingRequest(date=datetime.date.today(), start_second=1200, end_second=1800)
+    orig = SimpleNamespace(diag=SimpleNamespace(constraint_name=constraint_name))
+    dummy_session.commit.side_effect = IntegrityError("INSERT", {}, orig)
+
+    with pytest.raises(BookingConflictError) as exc_info:
+        service.create_booking(booking_data, str(uuid.uuid4()), str(uuid.uuid4()))
+
+    assert exc_info.value.conflict == expected
+    dummy_session.rollback.assert_called_once()
+
+
+def test_create_booking_other_integrity_error(service, dummy_session):
+    booking_data = CreateBookingRequest(date=datetime.date.today(), start_second=1200, end_second=1800)
+    orig = SimpleNamespace(diag=SimpleNamespace(constraint_name="booking_place_id_fkey"))
+    dummy_session.commit.side_effect = IntegrityError("INSERT", {}, orig)
+
+    with pytest.raises(IntegrityError):
+        service.create_booking(booking_data, str(uuid.uuid4()), str(uuid.uuid4()))
+
+
 def test_is_booking_created_by_user(service, dummy_session):
     booking_id = uuid.uuid4()
     user_id = uuid.uuid4()
@@ -194,38 +237,6 @@ def test_activate_booking(service, dummy_session):
     dummy_session.commit.assert_called_once()
 
 
-def test_user_have_not_booking_on_date_true(service, dummy_session):
-    today = datetime.date.today()
-    user_id = str(uuid.uuid4())
-    start = 1000
-    end = 2000
-
-    # No overlapping booking exists.
-    mock_query = MagicMock(spec=Query)
-    dummy_session.query.return_value = mock_query
-    mock_query.filter.return_value.first.return_value = None
-
-    result = service.user_have_not_booking_on_date(today, start, end, user_id)
-    dummy_session.query.assert_called_once_with(Booking)
-    assert result is True
-
-
-def test_user_have_not_booking_on_date_false(service, dummy_session):
-    today = datetime.date.today()
-    user_id = str(uuid.uuid4())
-    start = 1000
-    end = 2000
-    dummy_booking = SimpleNamespace(id=uuid.uuid4())
-    mock_query = MagicMock(spec=Query)
-    dummy_session.query.return_value = mock_query
-    mock_q = mock_query.filter.return_value
-    mock_q.first.return_value = dummy_booking
-
-    result = service.user_have_not_booking_on_date(today, start, end, user_id, booking_id=str(uuid.uuid4()))
-    dummy_session.query.assert_called_once_with(Booking)
-    assert result is False
-
-
 def test_get_current_booking(service, dummy_session, monkeypatch):
     # Setup a fixed current datetime
     fixed_now = datetime.datetime(2023, 10, 5, 12, 0, 0)
@@ -254,3 +265,21 @@ def test_get_current_booking(service, dummy_session, monkeypatch):
     result = service.get_current_booking(dummy_booking.user_id)
     dummy_session.query.assert_called_once_with(Booking)
     assert result == dummy_booking
+
+
+def test_delete_expired_bookings_queues_messages_in_the_same_statement(service, dummy_session):
+    dummy_session.execute.return_value.one.return_value = SimpleNamespace(deleted=3, queued=2)
+
+    # Bookings from 23:55 the day before have expired by 00:05 with a 10 minute grace period
+    assert service.delete_expired_bookings(datetime.datetime(2025, 3, 9, 23, 55), "message") == (3, 2)
+
+    statement = dummy_session.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH expired AS \n(DELETE FROM booking WHERE (booking.date, booking.start_second) <= ")
+    assert "booking.is_activated_by_user IS false RETURNING booking.id, booking.user_id" in sql
+    assert "queued AS \n(INSERT INTO notification_outbox (booking_id, chat_id, text) SELECT" in sql
+    assert 'FROM expired JOIN "user" ON "user".id = expired.user_id' in sql
+    params = statement.compile().params
+    assert params["param_1"] == datetime.date(2025, 3, 9)
+    assert params["param_2"] == 23 * 3600 + 55 * 60
+    dummy_session.commit.assert_called_once()
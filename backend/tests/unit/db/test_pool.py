@@ -0,0 +1,57 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError
+
+from src.db.pool import InstrumentedNullPool, InstrumentedQueuePool, register_pool_metrics
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.01)
+    register_pool_metrics(engine.pool)
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_is_timed(engine):
+    before = sample("db_pool_checkout_seconds_count")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert sample("db_pool_checkout_seconds_count") == before + 1
+
+
+def test_gauges_follow_checked_out_and_overflow_connections(engine):
+    assert sample("db_pool_size") == 1
+
+    with engine.connect():
+        assert sample("db_pool_checked_out") == 1
+        assert sample("db_pool_overflow") == 0
+
+        with engine.connect():
+            assert sample("db_pool_checked_out") == 2
+            assert sample("db_pool_overflow") == 1
+
+    assert sample("db_pool_checked_out") == 0
+
+
+def test_exhausted_pool_times_out(engine):
+    with engine.connect(), engine.connect():
+        with pytest.raises(TimeoutError):
+            engine.connect()
+
+
+def test_null_pool_checkout_is_timed():
+    engine = create_engine("sqlite://", poolclass=InstrumentedNullPool)
+    before = sample("db_pool_checkout_seconds_count")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert sample("db_pool_checkout_seconds_count") == before + 1
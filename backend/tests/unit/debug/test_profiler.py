@@ -0,0 +1,123 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.debug.profiler import SamplingProfiler
+from src.api.debug.routes import router
+from src.api.users.me.deps import get_current_user
+
+
+def busy_loop(stopped: threading.Event) -> None:
+    while not stopped.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stopped = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stopped,), name="busy")
+    thread.start()
+    yield thread
+    stopped.set()
+    thread.join()
+
+
+def profile(seconds: float, **kwargs) -> SamplingProfiler:
+    profiler = SamplingProfiler(0.001, **kwargs)
+    profiler.start()
+    time.sleep(seconds)
+    profiler.stop()
+    return profiler
+
+
+def test_samples_stacks_of_other_threads(busy_thread):
+    profiler = profile(0.05)
+
+    collapsed = profiler.to_collapsed()
+    assert profiler.samples > 0
+    assert any(line.startswith("busy;") and "busy_loop (" in line for line in collapsed.splitlines())
+    assert "sampling-profiler" not in collapsed
+
+
+def test_idle_threads_are_skipped_unless_asked_for():
+    parked = threading.Event()
+    thread = threading.Thread(target=parked.wait, name="parked")
+    thread.start()
+    try:
+        quiet, everything = profile(0.02), profile(0.02, idle=True)
+    finally:
+        parked.set()
+        thread.join()
+
+    assert "parked;" not in quiet.to_collapsed()
+    assert "parked;" in everything.to_collapsed()
+
+
+def test_speedscope_profile_references_shared_frames(busy_thread):
+    profiler = profile(0.05)
+
+    data = profiler.to_speedscope("bookit")
+
+    frames = data["shared"]["frames"]
+    [busy] = [profile for profile in data["profiles"] if profile["name"] == "busy"]
+    assert len(busy["samples"]) == len(busy["weights"])
+    assert all(0 <= index < len(frames) for sample in busy["samples"] for index in sample)
+    assert any(frames[sample[-1]]["name"] in ("busy_loop", "<genexpr>") for sample in busy["samples"])
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    user = SimpleNamespace(role="admin")
+    app.dependency_overrides[get_current_user] = lambda: user
+    with patch("src.api.debug.deps.settings.DEBUG_PROFILE_ENABLED", True):
+        yield TestClient(app), user
+
+
+def test_profile_endpoint_returns_collapsed_and_speedscope(client):
+    client, _ = client
+
+    collapsed = client.get("/debug/profile", params={"seconds": 0.05})
+    speedscope = client.get("/debug/profile", params={"seconds": 0.05, "format": "speedscope", "idle": True})
+
+    assert collapsed.status_code == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert speedscope.status_code == 200
+    assert speedscope.json()["profiles"]
+
+
+def test_profile_endpoint_is_admin_only(client):
+    client, user = client
+    user.role = "student"
+
+    assert client.get("/debug/profile", params={"seconds": 0.05}).status_code == 403
+
+
+def test_profile_endpoint_is_disabled_by_default(client):
+    client, _ = client
+
+    with patch("src.api.debug.deps.settings.DEBUG_PROFILE_ENABLED", False):
+        assert client.get("/debug/profile", params={"seconds": 0.05}).status_code == 404
+
+
+def test_disabled_profile_endpoint_is_404_before_auth_and_validation():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    with patch("src.api.debug.deps.settings.DEBUG_PROFILE_ENABLED", False):
+        assert client.get("/debug/profile", params={"seconds": 0.05}).status_code == 404
+        assert client.get("/debug/profile", params={"seconds": "soon"}).status_code == 404
+
+
+def test_profile_length_is_capped(client):
+    client, _ = client
+
+    with patch("src.api.debug.deps.settings.DEBUG_PROFILE_MAX_SECONDS", 1):
+        assert client.get("/debug/profile", params={"seconds": 2}).status_code == 422
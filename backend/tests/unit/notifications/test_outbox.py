@@ -0,0 +1,116 @@
+import asyncio
+import datetime
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import column, select, table
+from sqlalchemy.dialects import postgresql
+
+from src.api.notifications.service import NotificationOutboxService
+from src.api.notifications.worker import OutboxWorker
+from src.api.telegram_bot.dispatcher import Message
+from src.api.telegram_bot.fields import SendResultEnum
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.__enter__.return_value = session
+    return session
+
+
+def compile_statement(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_claim_skips_rows_locked_by_other_workers(session):
+    NotificationOutboxService(session).claim(50, datetime.timedelta(seconds=60), max_attempts=5)
+
+    sql = compile_statement(session.execute.call_args.args[0])
+    assert sql.startswith("UPDATE notification_outbox SET attempts=(notification_outbox.attempts + ")
+    assert "available_at=(now() + " in sql
+    assert "ORDER BY notification_outbox.available_at \n LIMIT %(param_1)s::INTEGER FOR UPDATE SKIP LOCKED)" in sql
+    assert "RETURNING notification_outbox.id, notification_outbox.chat_id, notification_outbox.text" in sql
+    session.commit.assert_called_once()
+
+
+def test_enqueue_from_leaves_ids_to_the_database(session):
+    booking = table("booking", column("id"), column("chat_id"))
+    source = select(booking.c.id.label("booking_id"), booking.c.chat_id).cte("source")
+    session.execute.return_value.all.return_value = [(uuid.uuid4(),), (uuid.uuid4(),)]
+
+    assert NotificationOutboxService(session).enqueue_from(source, "hello") == 2
+
+    sql = compile_statement(session.execute.call_args.args[0])
+    assert "INSERT INTO notification_outbox (booking_id, chat_id, text) SELECT source.booking_id" in sql
+    assert "WHERE source.chat_id IS NOT NULL" in sql
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0
+
+
+def test_worker_completes_delivered_and_rejected_messages(session):
+    delivered, rejected, retry = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    rows = [
+        SimpleNamespace(id=delivered, chat_id=1, text="a"),
+        SimpleNamespace(id=rejected, chat_id=2, text="b"),
+        SimpleNamespace(id=retry, chat_id=3, text="c"),
+    ]
+    worker = OutboxWorker(session_factory=lambda: session, batch_size=10)
+    worker.claim = MagicMock(return_value=rows)
+    worker.complete = MagicMock()
+    dispatcher = MagicMock(
+        send_many=AsyncMock(return_value=[SendResultEnum.delivered, SendResultEnum.rejected, SendResultEnum.retry])
+    )
+    before = sample("notification_outbox_completed_total"), sample("notification_outbox_rejected_total")
+
+    assert asyncio.run(worker.run_once(dispatcher)) == 3
+
+    assert list(dispatcher.send_many.call_args.args[0]) == [Message(1, "a"), Message(2, "b"), Message(3, "c")]
+    worker.complete.assert_called_once_with([delivered, rejected])
+    assert sample("notification_outbox_completed_total") == before[0] + 1
+    assert sample("notification_outbox_rejected_total") == before[1] + 1
+
+
+def test_worker_leaves_messages_to_retry_claimed(session):
+    rows = [SimpleNamespace(id=uuid.uuid4(), chat_id=1, text="a")]
+    worker = OutboxWorker(session_factory=lambda: session)
+    worker.claim = MagicMock(return_value=rows)
+    worker.complete = MagicMock()
+    dispatcher = MagicMock(send_many=AsyncMock(return_value=[SendResultEnum.retry]))
+
+    assert asyncio.run(worker.run_once(dispatcher)) == 1
+    worker.complete.assert_not_called()
+
+
+def test_purge_exhausted_waits_out_the_last_lease(session):
+    session.execute.return_value.all.return_value = [(uuid.uuid4(),)] * 3
+
+    assert NotificationOutboxService(session).purge_exhausted(max_attempts=5) == 3
+
+    sql = compile_statement(session.execute.call_args.args[0])
+    assert sql.startswith("DELETE FROM notification_outbox WHERE notification_outbox.attempts >= ")
+    assert "notification_outbox.available_at <= now()" in sql
+    session.commit.assert_called_once()
+
+
+def test_worker_purge_counts_exhausted_messages(session):
+    session.execute.return_value.all.return_value = [(uuid.uuid4(),)] * 2
+    worker = OutboxWorker(session_factory=lambda: session, max_attempts=5)
+    before = sample("notification_outbox_exhausted_total")
+
+    assert worker.purge() == 2
+    assert sample("notification_outbox_exhausted_total") == before + 2
+
+
+def test_worker_without_messages_sends_nothing(session):
+    worker = OutboxWorker(session_factory=lambda: session)
+    worker.claim = MagicMock(return_value=[])
+    dispatcher = MagicMock(send_many=AsyncMock())
+
+    assert asyncio.run(worker.run_once(dispatcher)) == 0
+    dispatcher.send_many.assert_not_called()
@@ -0,0 +1,135 @@
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.places.cache import PlacesCache, etag_matches
+from src.api.places.routes import router
+from src.api.places.service import PlaceService
+from src.api.users.me.deps import get_current_user
+
+
+def make_place(name: str, capacity: int = 1):
+    return SimpleNamespace(id=uuid.uuid4(), name=name, type="seat", capacity=capacity, access_level="guest")
+
+
+@pytest.fixture
+def places():
+    return [make_place("B"), make_place("A")]
+
+
+def test_snapshot_is_built_once_and_sorted(places):
+    cache = PlacesCache()
+    load = MagicMock(return_value=places)
+
+    first = cache.get(1, load)
+    second = cache.get(1, load)
+
+    assert load.call_count == 1
+    assert second is first
+    assert [place["name"] for place in json.loads(first.places.body)] == ["A", "B"]
+    assert json.loads(first.by_id[places[0].id].body)["name"] == "B"
+
+
+def test_new_version_rebuilds_the_snapshot_with_a_new_etag(places):
+    cache = PlacesCache()
+    load = MagicMock(return_value=places)
+    before = cache.get(1, load)
+
+    places[0].capacity = 2
+    after = cache.get(2, load)
+
+    assert load.call_count == 2
+    assert after.places.etag != before.places.etag
+    assert after.by_id[places[0].id].etag != before.by_id[places[0].id].etag
+    assert after.by_id[places[1].id].etag == before.by_id[places[1].id].etag
+
+
+def test_request_behind_an_update_does_not_replace_the_newer_snapshot(places):
+    cache = PlacesCache()
+    cache.get(2, lambda: places)
+
+    cache.get(1, lambda: places)
+    cache.get(2, load := MagicMock(return_value=places))
+
+    load.assert_not_called()
+
+
+def test_etags_are_equal_for_equal_bodies(places):
+    assert PlacesCache().get(1, lambda: places).places.etag == PlacesCache().get(7, lambda: places).places.etag
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [(None, False), ('"abc"', True), ('W/"abc"', True), ('"x", "abc"', True), ("*", True), ('"x"', False)],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+@pytest.fixture
+def client(places):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role="student")
+    service = MagicMock(spec=PlaceService)
+    service.get_places.return_value = places
+    service.get_places_version.return_value = 1
+    service.get_place_by_id.return_value = None
+    app.dependency_overrides[PlaceService] = lambda: service
+
+    with patch("src.api.places.routes.places_cache", PlacesCache()):
+        yield TestClient(app), service
+
+
+def test_get_places_answers_304_for_a_known_etag(client, places):
+    client, service = client
+
+    response = client.get("/places")
+    revalidated = client.get("/places", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert [place["name"] for place in response.json()] == ["A", "B"]
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+    service.get_places.assert_called_once()
+    assert service.get_places_version.call_count == 2
+
+
+def test_get_places_follows_the_shared_version(client, places):
+    client, service = client
+    before = client.get("/places")
+
+    places[0].capacity = 2
+    service.get_places_version.return_value = 2
+    after = client.get("/places", headers={"If-None-Match": before.headers["ETag"]})
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert service.get_places.call_count == 2
+
+
+def test_get_place_is_served_from_the_snapshot(client, places):
+    client, service = client
+
+    response = client.get(f"/places/{places[1].id}")
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "A"
+    assert "ETag" in response.headers
+    service.get_place_by_id.assert_not_called()
+
+
+def test_get_place_falls_back_to_the_database(client):
+    client, service = client
+    place = make_place("C")
+
+    assert client.get(f"/places/{place.id}").status_code == 404
+
+    service.get_place_by_id.return_value = place
+    assert client.get(f"/places/{place.id}").json()["name"] == "C"
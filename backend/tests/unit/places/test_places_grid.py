@@ -0,0 +1,36 @@
+import pytest
+
+from src.api.places.grid import full_occupancy, get_slots_count, pack_occupancy
+
+
+def is_busy(bitset: bytes, slot_index: int) -> bool:
+    return bool(bitset[slot_index // 8] >> (slot_index % 8) & 1)
+
+
+@pytest.mark.parametrize(("slot", "expected"), [(900, 96), (3600, 24), (7000, 13), (86400, 1)])
+def test_get_slots_count(slot, expected):
+    assert get_slots_count(slot) == expected
+
+
+def test_pack_occupancy_marks_partially_covered_slots():
+    bitset = pack_occupancy([(1000, 2000), (3600, 3601)], 900)
+
+    assert len(bitset) == 12
+    assert [i for i in range(96) if is_busy(bitset, i)] == [1, 2, 4]
+
+
+def test_pack_occupancy_end_is_exclusive():
+    bitset = pack_occupancy([(0, 1800)], 900)
+
+    assert [i for i in range(96) if is_busy(bitset, i)] == [0, 1]
+
+
+def test_pack_occupancy_merges_overlapping_intervals():
+    assert pack_occupancy([(0, 3600), (1800, 7200)], 3600) == pack_occupancy([(0, 7200)], 3600)
+
+
+def test_full_occupancy_leaves_padding_clear():
+    bitset = full_occupancy(3600 * 5)
+
+    assert get_slots_count(3600 * 5) == 5
+    assert bitset == bytes([0b11111])
@@ -4,7 +4,11 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy import create_mock_engine
+from sqlalchemy.dialects import postgresql
 
+from src.api.places.models import PlacesVersion
+from src.api.places.params import AvailabilityGridParams
 from src.api.places.schemas import PlaceAvailableRequest, UpdatePlaceResponse
 from src.api.places.service import PlaceService
 
@@ -64,67 +68,69 @@ def test_get_places(service, dummy_session):
     assert result == [place1, place2]
 
 
-def test_get_active_places_for_guest_without_bookings(service, dummy_session):
-    # Guest should see non-guest places as unavailable without even checking bookings.
-    place_guest = SimpleNamespace(
-        id=uuid.uuid4(), name="Guest Place", type="seat", capacity=2, access_level="guest", bookings=[]
-    )
-    place_non_guest = SimpleNamespace(
-        id=uuid.uuid4(), name="Staff Place", type="room", capacity=3, access_level="student", bookings=[]
-    )
-    dummy_session.query.return_value.all.return_value = [place_guest, place_non_guest]
+def make_place_row(name: str, access_level: str, is_available: bool) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "name": name,
+        "type": "seat",
+        "capacity": 1,
+        "access_level": access_level,
+        "is_available": is_available,
+    }
 
-    request_date = PlaceAvailableRequest(date=date.today(), start_second=1000, end_second=2000)
-    result = service.get_active_places("guest", request_date)
-
-    # For guest places, availability depends on access_level matching guest.
-    # place_guest -> available as no conflicting booking.
-    # place_non_guest -> forced not available.
-    for resp in result:
-        if resp.id == place_guest.id:
-            assert resp.is_available is True
-        elif resp.id == place_non_guest.id:
-            assert resp.is_available is False
-
-
-def test_get_active_places_booking_overlap(service, dummy_session):
-    # For non-guest roles, check availability based on bookings.
-    # Create two places: one with no overlapping booking, one with a booking overlapping the request.
-    place_no_overlap = SimpleNamespace(
-        id=uuid.uuid4(),
-        name="Free Place",
-        type="seat",
-        capacity=1,
-        access_level="guest",
-        bookings=[
-            # Booking that does not overlap with request time.
-            SimpleNamespace(date=date.today(), start_second=3000, end_second=4000)
-        ],
-    )
-    place_with_overlap = SimpleNamespace(
-        id=uuid.uuid4(),
-        name="Booked Place",
-        type="room",
-        capacity=5,
-        access_level="guest",
-        bookings=[
-            # Booking that overlaps with request time.
-            SimpleNamespace(date=date.today(), start_second=1500, end_second=2500)
-        ],
-    )
-    dummy_session.query.return_value.all.return_value = [place_no_overlap, place_with_overlap]
+
+def test_get_active_places_single_query(service, dummy_session):
+    rows = [make_place_row("Free Place", "guest", True), make_place_row("Booked Place", "guest", False)]
+    dummy_session.execute.return_value.mappings.return_value = rows
 
     request_date = PlaceAvailableRequest(date=date.today(), start_second=1000, end_second=2000)
-    # For non-guest role, access_level check is not applied.
     result = service.get_active_places("admin", request_date)
 
-    for resp in result:
-        if resp.id == place_no_overlap.id:
-            # Check booking: booking from 3000-4000 does not conflict with 1000-2000.
-            assert resp.is_available is True
-        elif resp.id == place_with_overlap.id:
-            # Booking overlaps with 1000-2000.
-            assert resp.is_available is False
+    # Availability of every place is computed by one statement instead of walking `place.bookings`
+    dummy_session.execute.assert_called_once()
+    dummy_session.query.assert_not_called()
+    assert [(resp.id, resp.is_available) for resp in result] == [(row["id"], row["is_available"]) for row in rows]
+
+
+def test_get_active_places_filters_overlapping_bookings(service, dummy_session):
+    request_date = PlaceAvailableRequest(date=date.today(), start_second=1000, end_second=2000)
+    service.get_active_places("admin", request_date)
+
+    statement = str(dummy_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "EXISTS" in statement
+    assert "booking.time_range &&" in statement
+    assert "booking.date =" in statement
+    assert "access_level =" not in statement
+
+
+def test_get_active_places_for_guest(service, dummy_session):
+    # Guest should see non-guest places as unavailable.
+    request_date = PlaceAvailableRequest(date=date.today(), start_second=1000, end_second=2000)
+    service.get_active_places("guest", request_date)
+
+    statement = dummy_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    assert "place.access_level = " in str(statement)
+    assert "guest" in statement.params.values()
+
+
+def test_get_availability_grid(service, dummy_session):
+    guest_place = SimpleNamespace(id=uuid.uuid4(), access_level="guest")
+    student_place = SimpleNamespace(id=uuid.uuid4(), access_level="student")
+    bookings = [
+        SimpleNamespace(place_id=guest_place.id, start_second=0, end_second=3600),
+        SimpleNamespace(place_id=guest_place.id, start_second=7200, end_second=7300),
+    ]
+    dummy_session.execute.return_value.all.side_effect = [[guest_place, student_place], bookings]
+
+    params = AvailabilityGridParams(date=date.today(), slot=3600)
+    result = service.get_availability_grid("guest", params)
+
+    # One query for the places and one range query for all bookings of the day
+    assert dummy_session.execute.call_count == 2
+    assert result.slots_count == 24
+    occupancies = {place.id: place.occupancy for place in result.places}
+    assert occupancies[guest_place.id] == bytes([0b101, 0, 0])
+    assert occupancies[student_place.id] == bytes([0xFF, 0xFF, 0xFF])
 
 
 def test_update_place(service, dummy_session):
@@ -142,3 +148,26 @@ def test_update_place(service, dummy_session):
     assert dummy_place.capacity == 4
     assert dummy_place.access_level == "student"
     dummy_session.commit.assert_called()
+
+
+def test_get_places_version_reads_the_shared_row(service, dummy_session):
+    dummy_session.scalar.return_value = 3
+
+    assert service.get_places_version() == 3
+    sql = str(dummy_session.scalar.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql == "SELECT places_version.version \nFROM places_version"
+
+
+def test_places_version_is_seeded_and_bumped_by_a_trigger():
+    statements = []
+    engine = create_mock_engine(
+        "postgresql+psycopg://",
+        lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))),
+    )
+
+    PlacesVersion.metadata.create_all(engine, checkfirst=False)
+
+    ddl = "\n".join(statements)
+    assert "INSERT INTO places_version DEFAULT VALUES" in ddl
+    assert "UPDATE places_version SET version = version + 1" in ddl
+    assert "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON place" in ddl
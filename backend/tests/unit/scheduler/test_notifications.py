@@ -0,0 +1,169 @@
+import datetime
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.api.scheduler.fields import NotificationKindEnum
+from src.api.scheduler.notifications import NotificationScheduler
+
+NOW = datetime.datetime(2025, 3, 10, 8, 40)
+
+
+def booking_row(start_second: int, end_second: int, date: datetime.date = NOW.date(), **kwargs):
+    return SimpleNamespace(
+        id=kwargs.get("id", uuid.uuid4()),
+        date=date,
+        start_second=start_second,
+        end_second=end_second,
+        notified_start=kwargs.get("notified_start", False),
+        notified_end=kwargs.get("notified_end", False),
+        updated_at=kwargs.get("updated_at", NOW),
+    )
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.__enter__.return_value = session
+    return session
+
+
+@pytest.fixture
+def scheduler(session):
+    return NotificationScheduler(
+        session_factory=lambda: session, lead=datetime.timedelta(minutes=15), sync_interval=10, clock=lambda: NOW
+    )
+
+
+def test_deadlines_pop_in_order_once_due(scheduler):
+    row = booking_row(9 * 3600, 10 * 3600)
+    scheduler.push([row])
+
+    assert scheduler.pop_due(NOW) == []
+    assert scheduler.seconds_until_next() == 5 * 60
+
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 9, 45))
+    assert [(deadline.kind, deadline.at) for deadline in due] == [
+        (NotificationKindEnum.start, datetime.datetime(2025, 3, 10, 8, 45)),
+        (NotificationKindEnum.end, datetime.datetime(2025, 3, 10, 9, 45)),
+    ]
+    assert scheduler.seconds_until_next() is None
+
+
+def test_moved_booking_replaces_its_deadline(scheduler):
+    row = booking_row(9 * 3600, 10 * 3600)
+    scheduler.push([row])
+    scheduler.push([booking_row(11 * 3600, 12 * 3600, id=row.id)])
+
+    assert scheduler.pop_due(datetime.datetime(2025, 3, 10, 10, 0)) == []
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 10, 45))
+    assert [(deadline.kind, deadline.second) for deadline in due] == [(NotificationKindEnum.start, 11 * 3600)]
+
+
+def test_notified_and_past_events_are_not_queued(scheduler):
+    scheduler.push(
+        [
+            booking_row(9 * 3600, 10 * 3600, notified_start=True, notified_end=True),
+            booking_row(7 * 3600, 8 * 3600),
+        ]
+    )
+
+    assert scheduler.seconds_until_next() is None
+
+
+def test_deadline_before_midnight_for_early_booking(scheduler):
+    scheduler.push([booking_row(5 * 60, 3600, date=datetime.date(2025, 3, 11))])
+
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 23, 50))
+    assert [deadline.at for deadline in due] == [datetime.datetime(2025, 3, 10, 23, 50)]
+
+
+def test_sync_reads_only_changed_bookings(scheduler, session):
+    session.scalar.return_value = NOW
+    session.execute.return_value.all.return_value = []
+    scheduler.load()
+
+    changed = booking_row(9 * 3600, 10 * 3600, updated_at=NOW + datetime.timedelta(seconds=30))
+    session.execute.return_value.all.return_value = [changed]
+    scheduler.sync()
+
+    statement = session.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "WHERE booking.updated_at >" in sql
+    assert statement.compile().params["updated_at_1"] == NOW - datetime.timedelta(minutes=1)
+    assert scheduler.seconds_until_next() == 5 * 60
+
+    scheduler.sync()
+    assert session.execute.call_args.args[0].compile().params[
+        "updated_at_1"
+    ] == changed.updated_at - datetime.timedelta(minutes=1)
+
+
+def test_fire_marks_bookings_and_queues_messages_in_one_statement(scheduler, session):
+    row = booking_row(9 * 3600, 10 * 3600)
+    scheduler.push([row])
+    session.execute.return_value.all.return_value = [SimpleNamespace(id=uuid.uuid4())]
+
+    scheduler.fire(scheduler.pop_due(datetime.datetime(2025, 3, 10, 8, 45)))
+
+    statement = session.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH notified AS \n(UPDATE booking SET notified_start=")
+    assert "(booking.id, booking.date, booking.start_second) IN" in sql
+    assert "booking.notified_start IS false" in sql
+    assert "INSERT INTO notification_outbox (booking_id, chat_id, text) SELECT" in sql
+    assert "Your booking starts in 15 minutes!" in statement.compile().params.values()
+    session.commit.assert_called_once()
+
+
+def test_deadline_that_failed_to_fire_is_fired_on_the_next_pass(session):
+    attempts = []
+
+    def session_factory():
+        attempts.append(session)
+        if len(attempts) == 1:
+            raise ConnectionError("pool timeout")
+        return session
+
+    scheduler = NotificationScheduler(
+        session_factory=session_factory, lead=datetime.timedelta(minutes=15), sync_interval=10, clock=lambda: NOW
+    )
+    scheduler.push([booking_row(9 * 3600, 10 * 3600)])
+    session.execute.return_value.all.return_value = [SimpleNamespace(id=uuid.uuid4())]
+
+    with pytest.raises(ConnectionError):
+        scheduler.fire(scheduler.pop_due(datetime.datetime(2025, 3, 10, 8, 45)))
+    session.commit.assert_not_called()
+
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 8, 46))
+    assert [(deadline.kind, deadline.at) for deadline in due] == [
+        (NotificationKindEnum.start, datetime.datetime(2025, 3, 10, 8, 45))
+    ]
+    scheduler.fire(due)
+    session.commit.assert_called_once()
+
+
+def test_only_kinds_that_failed_are_requeued(scheduler, session):
+    scheduler.push([booking_row(9 * 3600, 10 * 3600)])
+    session.execute.return_value.all.return_value = [SimpleNamespace(id=uuid.uuid4())]
+    session.commit.side_effect = [None, ConnectionError("pool timeout")]
+
+    with pytest.raises(ConnectionError):
+        scheduler.fire(scheduler.pop_due(datetime.datetime(2025, 3, 10, 9, 45)))
+
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 9, 45))
+    assert [deadline.kind for deadline in due] == [NotificationKindEnum.end]
+
+
+def test_requeue_keeps_a_newer_deadline(scheduler):
+    row = booking_row(9 * 3600, 10 * 3600)
+    scheduler.push([row])
+    due = scheduler.pop_due(datetime.datetime(2025, 3, 10, 8, 45))
+    scheduler.push([booking_row(11 * 3600, 12 * 3600, id=row.id)])
+
+    scheduler.requeue(due)
+
+    assert scheduler.pop_due(datetime.datetime(2025, 3, 10, 10, 0)) == []
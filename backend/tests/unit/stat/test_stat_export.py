@@ -0,0 +1,72 @@
+import csv
+import datetime
+import io
+import uuid
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+from sqlalchemy.dialects import postgresql
+
+from src.api.stat.export import iter_booking_chunks, to_csv, to_parquet
+from src.api.stat.fields import ExportFormatEnum
+from src.api.stat.params import ExportParams
+
+
+def make_chunks(count: int, size: int):
+    for _ in range(count):
+        yield [
+            (
+                uuid.uuid4(),
+                datetime.date(2025, 1, 1),
+                3600,
+                7200,
+                True,
+                uuid.uuid4(),
+                "john_doe",
+                None,
+                None,
+                datetime.datetime(2025, 1, 1, 12),
+            )
+            for _ in range(size)
+        ]
+
+
+def test_to_csv_yields_header_and_one_part_per_chunk():
+    parts = list(to_csv(make_chunks(2, 3)))
+
+    assert len(parts) == 2
+    rows = list(csv.reader(io.StringIO(b"".join(parts).decode())))
+    assert rows[0][:3] == ["id", "date", "start_second"]
+    assert len(rows) == 1 + 6
+    assert rows[1][6] == "john_doe"
+
+
+def test_to_csv_without_rows_yields_header():
+    assert b"".join(to_csv(iter([]))).decode().startswith("id,date,")
+
+
+def test_to_parquet_writes_a_row_group_per_chunk():
+    parts = list(to_parquet(make_chunks(3, 100)))
+
+    assert all(parts[:3])
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(parts)))
+    assert parquet.num_row_groups == 3
+    table = parquet.read()
+    assert table.num_rows == 300
+    assert table.column("place_id").null_count == 300
+    uuid.UUID(table.column("id")[0].as_py())
+
+
+@patch("src.api.stat.export.Session")
+def test_iter_booking_chunks_streams_with_server_side_cursor(session_class):
+    session = session_class.return_value.__enter__.return_value
+    session.execute.return_value.partitions.return_value = iter([[("row",)]])
+    params = ExportParams(format=ExportFormatEnum.csv, date_from=datetime.date(2025, 1, 1))
+
+    assert list(iter_booking_chunks(params, chunk_size=500)) == [[("row",)]]
+
+    statement = session.execute.call_args.args[0]
+    assert statement.get_execution_options()["yield_per"] == 500
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "booking.date >= " in sql
+    assert "booking.date <= " not in sql
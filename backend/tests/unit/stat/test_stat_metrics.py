@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from prometheus_client import CollectorRegistry
+
+from src.api.stat.metrics import USER_BOOKING_BOUNDS, UserStatCollector
+
+
+def user_row(username: str, booking_count: int, visit_count: int):
+    return SimpleNamespace(username=username, booking_count=booking_count, visit_count=visit_count)
+
+
+def test_collector_is_empty_until_refreshed():
+    registry = CollectorRegistry()
+    registry.register(UserStatCollector(top_users=2))
+
+    assert registry.get_sample_value("booking_stat_user_bookings", {"username": "alice"}) is None
+    assert registry.get_sample_value("booking_stat_users_by_bookings_gcount") is None
+
+
+def test_collector_exports_top_users_and_distribution():
+    session = MagicMock()
+    buckets = [1] * len(USER_BOOKING_BOUNDS)
+    session.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=[user_row("alice", 7, 5), user_row("bob", 3, 0), user_row("eve", 1, 1)])),
+        MagicMock(one=MagicMock(return_value=(*buckets, 3, 11))),
+    ]
+    collector = UserStatCollector(top_users=2)
+    registry = CollectorRegistry()
+    registry.register(collector)
+
+    collector.refresh(session)
+
+    assert registry.get_sample_value("booking_stat_user_bookings", {"username": "alice"}) == 7
+    assert registry.get_sample_value("booking_stat_user_visits", {"username": "bob"}) == 0
+    # The query fetches one extra row for pagination, it is not exported
+    assert registry.get_sample_value("booking_stat_user_bookings", {"username": "eve"}) is None
+    assert registry.get_sample_value("booking_stat_users_by_bookings_bucket", {"le": "+Inf"}) == 3
+    assert registry.get_sample_value("booking_stat_users_by_bookings_gcount") == 3
+    assert registry.get_sample_value("booking_stat_users_by_bookings_gsum") == 11
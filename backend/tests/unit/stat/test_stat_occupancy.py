@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from src.api.stat.occupancy import occupied_seconds, open_seconds, utilization
+
+
+def brute_force_occupied_seconds(weekdays, starts, ends) -> np.ndarray:
+    grid = np.zeros((7, 24), dtype=np.int64)
+    for weekday, start, end in zip(weekdays, starts, ends):
+        for hour in range(24):
+            grid[weekday, hour] += max(0, min(end, (hour + 1) * 3600) - max(start, hour * 3600))
+    return grid
+
+
+def test_occupied_seconds_splits_bookings_across_hours():
+    grid = occupied_seconds(np.array([4]), np.array([3600 + 1800]), np.array([3 * 3600 + 600]))
+
+    assert grid[4, :4].tolist() == [0, 1800, 3600, 600]
+    assert grid.sum() == 1800 + 3600 + 600
+
+
+def test_occupied_seconds_without_bookings():
+    grid = occupied_seconds(np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=int))
+
+    assert grid.shape == (7, 24)
+    assert not grid.any()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_occupied_seconds_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    weekdays = rng.integers(0, 7, 200)
+    starts = rng.integers(0, 86399, 200)
+    ends = np.minimum(starts + rng.integers(1, 6 * 3600, 200), 86399)
+    ends = np.maximum(ends, starts + 1)
+
+    assert (occupied_seconds(weekdays, starts, ends) == brute_force_occupied_seconds(weekdays, starts, ends)).all()
+
+
+def test_open_seconds_counts_each_weekday_in_range():
+    # 2025-01-01 is a Wednesday
+    grid = open_seconds(datetime.date(2025, 1, 1), datetime.date(2025, 1, 1))
+
+    assert grid[:, 0].tolist() == [0, 0, 3600, 0, 0, 0, 0]
+    assert (grid[2] == 3600).all()
+
+
+def test_utilization_is_zero_where_nothing_is_open():
+    available = open_seconds(datetime.date(2025, 1, 1), datetime.date(2025, 1, 1))
+    occupied = np.zeros_like(available)
+    occupied[2, 10] = 900
+
+    result = utilization(occupied, available)
+
+    assert result[2, 10] == 0.25
+    assert result[0, 10] == 0
@@ -0,0 +1,39 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.stat.params import DateWindowParams
+from src.api.stat.routes import router
+from src.api.stat.service import StatService
+
+
+class FakeStatService:
+    def __init__(self) -> None:
+        self.params = None
+
+    def get_total_stat(self, params):
+        self.params = params
+        return {"total_bookings": 0, "total_visits": 0, "total_conversion_rate": 0, "total_avg_booking_time": 0}
+
+
+def make_client(stats_service: FakeStatService) -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[StatService] = lambda: stats_service
+    return TestClient(app)
+
+
+def test_stat_total_documents_only_the_date_window():
+    stats_service = FakeStatService()
+    client = make_client(stats_service)
+
+    operation = client.get("/openapi.json").json()["paths"]["/stat/total"]["get"]
+    assert [parameter["name"] for parameter in operation["parameters"]] == ["from", "to"]
+
+    assert client.get("/stat/total", params={"from": "2025-01-01", "to": "2025-01-31"}).status_code == 200
+    assert type(stats_service.params) is DateWindowParams
+
+
+def test_stat_total_rejects_a_reversed_window():
+    client = make_client(FakeStatService())
+
+    assert client.get("/stat/total", params={"from": "2025-02-01", "to": "2025-01-31"}).status_code == 422
@@ -0,0 +1,196 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.api.stat.params import OccupancyParams, StatCursor, StatParams
+from src.api.stat.schemas import (
+    StatAggregatedByPlaceResponse,
+    StatAggregatedByUserResponse,
+    StatOccupancyResponse,
+    StatTotalResponse,
+)
+from src.api.stat.service import StatService
+
+
+@pytest.fixture
+def dummy_session():
+    return MagicMock()
+
+
+@pytest.fixture
+def service(dummy_session):
+    return StatService(session=dummy_session)
+
+
+def compile_statement(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def totals_row(**kwargs):
+    return SimpleNamespace(
+        booking_count=kwargs.get("booking_count", 0),
+        visit_count=kwargs.get("visit_count", 0),
+        conversion_rate=kwargs.get("conversion_rate", Decimal(0)),
+        avg_booking_time=kwargs.get("avg_booking_time", 0),
+        **{key: value for key, value in kwargs.items() if key.endswith(("_id", "name"))},
+    )
+
+
+def test_refresh_booking_stat(service, dummy_session):
+    service.refresh_booking_stat()
+
+    statement = dummy_session.execute.call_args.args[0]
+    assert str(statement) == "REFRESH MATERIALIZED VIEW CONCURRENTLY booking_stat"
+    dummy_session.commit.assert_called_once()
+
+
+def test_get_total_stat_is_a_single_pass(service, dummy_session):
+    dummy_session.execute.return_value.one.return_value = totals_row(
+        booking_count=4, visit_count=3, conversion_rate=Decimal("0.75"), avg_booking_time=1800
+    )
+
+    result = service.get_total_stat()
+
+    assert dummy_session.execute.call_count == 1
+    sql = compile_statement(dummy_session.execute.call_args.args[0])
+    assert "FROM booking_stat" in sql
+    assert "booking." not in sql
+    assert StatTotalResponse(**result) == StatTotalResponse(
+        total_bookings=4, total_visits=3, total_conversion_rate=0.75, total_avg_booking_time=1800
+    )
+
+
+def test_get_total_stat_without_bookings(service, dummy_session):
+    dummy_session.execute.return_value.one.return_value = totals_row()
+
+    assert service.get_total_stat() == {
+        "total_bookings": 0,
+        "total_visits": 0,
+        "total_conversion_rate": 0,
+        "total_avg_booking_time": 0,
+    }
+
+
+def test_get_stat_aggregated_by_user(service, dummy_session):
+    busy, idle = uuid.uuid4(), uuid.uuid4()
+    rows = [
+        totals_row(
+            user_id=busy,
+            username="busy",
+            booking_count=3,
+            visit_count=1,
+            conversion_rate=Decimal("0.3333"),
+            avg_booking_time=3600,
+        ),
+        totals_row(user_id=idle, username="idle", booking_count=1, avg_booking_time=900),
+    ]
+    dummy_session.execute.side_effect = [MagicMock(all=MagicMock(return_value=rows)), []]
+
+    result = StatAggregatedByUserResponse(**service.get_stat_aggregated_by_user())
+
+    assert dummy_session.execute.call_count == 2
+    assert [stat.booking_count for stat in result.user_booking_stats] == [3, 1]
+    assert [(stat.user_id, stat.visit_count) for stat in result.user_visit_stats] == [(busy, 1)]
+    assert [stat.conversion_rate for stat in result.conversion_rates] == [0.33, 0.0]
+    assert [stat.avg_booking_time for stat in result.average_booking_times] == [3600, 900]
+
+
+def test_get_stat_aggregated_by_place(service, dummy_session):
+    place_id, user_id = uuid.uuid4(), uuid.uuid4()
+    rows = [
+        totals_row(
+            place_id=place_id,
+            place_name="A1",
+            booking_count=2,
+            visit_count=2,
+            conversion_rate=Decimal(1),
+            avg_booking_time=60,
+        )
+    ]
+    pairs = [
+        SimpleNamespace(place_id=place_id, place_name="A1", user_id=user_id, username="busy", booking_count=2),
+    ]
+    dummy_session.execute.side_effect = [MagicMock(all=MagicMock(return_value=rows)), pairs]
+
+    result = StatAggregatedByPlaceResponse(**service.get_stat_aggregated_by_place())
+
+    assert result.place_visit_stats[0].visit_count == 2
+    assert result.conversion_rates[0].conversion_rate == 1.0
+    assert result.place_user_bookings_stats[0].users[0].user_id == user_id
+
+
+def test_stat_cursor_roundtrip():
+    cursor = StatCursor(booking_count=42, id=uuid.uuid4())
+
+    assert StatCursor.decode(cursor.encode()) == cursor
+    with pytest.raises(ValueError):
+        StatCursor.decode("not-a-cursor")
+
+
+def test_get_user_totals_is_bounded_by_window_and_page(service, dummy_session):
+    cursor = StatCursor(booking_count=5, id=uuid.uuid4())
+    params = StatParams(date_from=date(2025, 1, 1), date_to=date(2025, 1, 31), limit=10, cursor=cursor.encode())
+
+    service.get_user_totals(params)
+
+    statement = dummy_session.execute.call_args.args[0]
+    sql = compile_statement(statement)
+    assert "booking_stat.date >= " in sql
+    assert "booking_stat.date <= " in sql
+    assert "HAVING" in sql
+    assert statement._limit == 11
+
+
+def test_get_stat_aggregated_by_user_returns_next_cursor(service, dummy_session):
+    rows = [totals_row(user_id=uuid.uuid4(), username=f"user{n}", booking_count=10 - n) for n in range(3)]
+    dummy_session.execute.side_effect = [MagicMock(all=MagicMock(return_value=rows)), []]
+
+    result = StatAggregatedByUserResponse(**service.get_stat_aggregated_by_user(StatParams(limit=2)))
+
+    assert len(result.user_booking_stats) == 2
+    assert StatCursor.decode(result.next_cursor) == StatCursor(9, rows[1].user_id)
+    pairs_sql = compile_statement(dummy_session.execute.call_args.args[0])
+    assert "row_number() OVER (PARTITION BY booking_stat.user_id" in pairs_sql
+    assert "booking_stat.user_id IN" in pairs_sql
+
+
+def test_get_stat_aggregated_by_user_last_page(service, dummy_session):
+    rows = [totals_row(user_id=uuid.uuid4(), username="user", booking_count=1)]
+    dummy_session.execute.side_effect = [MagicMock(all=MagicMock(return_value=rows)), []]
+
+    assert service.get_stat_aggregated_by_user(StatParams(limit=2))["next_cursor"] is None
+
+
+def test_get_occupancy(service, dummy_session):
+    busy, idle = uuid.uuid4(), uuid.uuid4()
+    bookings = [SimpleNamespace(place_id=busy, weekdays=[2], starts=[36000], ends=[37800])]
+    places = [SimpleNamespace(id=busy, name="A1"), SimpleNamespace(id=idle, name="A2")]
+    dummy_session.execute.side_effect = [bookings, places]
+    params = OccupancyParams(date_from=date(2025, 1, 1), date_to=date(2025, 1, 1))
+
+    result = StatOccupancyResponse(**service.get_occupancy(params))
+
+    bookings_sql = compile_statement(dummy_session.execute.call_args_list[0].args[0])
+    assert "array_agg" in bookings_sql
+    assert "GROUP BY booking.place_id" in bookings_sql
+    assert result.open_seconds[2][10] == 3600
+    assert result.places[0].occupied_seconds[2][10] == 1800
+    assert result.places[0].utilization[2][10] == 0.5
+    assert result.places[0].total_utilization == round(1800 / 86400, 4)
+    assert result.places[1].total_utilization == 0
+
+
+def test_get_user_booking_distribution_is_one_query(service, dummy_session):
+    dummy_session.execute.return_value.one.return_value = (1, 2, 3, 40)
+
+    buckets, users, bookings = service.get_user_booking_distribution((1, 5))
+
+    assert (buckets, users, bookings) == ([1, 2], 3, 40)
+    sql = compile_statement(dummy_session.execute.call_args.args[0])
+    assert sql.count("count(*) FILTER (WHERE") == 2
+    assert "GROUP BY booking_stat.user_id" in sql
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.api.telegram_bot.dispatcher import Message, TelegramDispatcher, TokenBucket
+from src.api.telegram_bot.fields import SendResultEnum
+
+THROTTLED_CHAT = 429
+BLOCKED_CHAT = 403
+FLAKY_CHAT = 500
+PROXY_THROTTLED_CHAT = 4290
+SLOW_DOWN_CHAT = 4291
+
+
+class StubTelegram(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.attempts = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.client_ports = set()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubTelegram
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        chat_id = body["chat_id"]
+        with self.server.lock:
+            self.server.attempts[chat_id] += 1
+            attempt = self.server.attempts[chat_id]
+            self.server.client_ports.add(self.client_address[1])
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+
+        time.sleep(0.02)
+        if chat_id == THROTTLED_CHAT and attempt == 1:
+            status, payload = 429, {"ok": False, "parameters": {"retry_after": 0.05}}
+        elif chat_id == PROXY_THROTTLED_CHAT and attempt == 1:
+            status, payload = 429, None
+        elif chat_id == SLOW_DOWN_CHAT:
+            status, payload = 429, {"ok": False, "parameters": {"retry_after": 30}}
+        elif chat_id == FLAKY_CHAT and attempt < 3:
+            status, payload = 500, {"ok": False}
+        elif chat_id == BLOCKED_CHAT:
+            status, payload = 403, {"ok": False, "description": "Forbidden: bot was blocked by the user"}
+        else:
+            status, payload = 200, {"ok": True}
+
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+        data = json.dumps(payload).encode() if payload is not None else b"<html>Too Many Requests</html>"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if payload is not None else "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub():
+    server = StubTelegram()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def send_many(stub: StubTelegram, messages: list[Message], **kwargs) -> list[SendResultEnum]:
+    async def run():
+        options = {"rate": 1000, "chat_rate": 1000, "backoff": 0.01} | kwargs
+        async with TelegramDispatcher(token="token", api_url=f"http://127.0.0.1:{stub.server_port}", **options) as d:
+            return await d.send_many(messages)
+
+    return asyncio.run(run())
+
+
+def test_dispatcher_bounds_concurrency_and_reuses_connections(stub):
+    results = send_many(stub, [Message(chat_id, "hi") for chat_id in range(1, 41)], concurrency=4)
+
+    assert results == [SendResultEnum.delivered] * 40
+    assert stub.max_in_flight <= 4
+    assert len(stub.client_ports) <= 4
+
+
+def test_dispatcher_retries_throttled_and_failed_requests(stub):
+    results = send_many(
+        stub,
+        [Message(THROTTLED_CHAT, "hi"), Message(FLAKY_CHAT, "hi"), Message(BLOCKED_CHAT, "hi")],
+        concurrency=4,
+    )
+
+    assert results == [SendResultEnum.delivered, SendResultEnum.delivered, SendResultEnum.rejected]
+    assert stub.attempts == {THROTTLED_CHAT: 2, FLAKY_CHAT: 3, BLOCKED_CHAT: 1}
+
+
+def test_dispatcher_retries_a_429_without_json(stub):
+    results = send_many(stub, [Message(PROXY_THROTTLED_CHAT, "hi"), Message(1, "hi")])
+
+    assert results == [SendResultEnum.delivered, SendResultEnum.delivered]
+    assert stub.attempts[PROXY_THROTTLED_CHAT] == 2
+
+
+def test_dispatcher_does_not_wait_past_its_time_budget(stub):
+    started_at = time.monotonic()
+
+    assert send_many(stub, [Message(SLOW_DOWN_CHAT, "hi")], time_budget=1) == [SendResultEnum.retry]
+    assert stub.attempts[SLOW_DOWN_CHAT] == 1
+    assert time.monotonic() - started_at < 1
+
+
+def test_dispatcher_gives_up_after_max_retries(stub):
+    assert send_many(stub, [Message(FLAKY_CHAT, "hi")], max_retries=1) == [SendResultEnum.retry]
+    assert stub.attempts[FLAKY_CHAT] == 2
+
+
+def test_dispatcher_keeps_buckets_of_recent_chats_only(stub):
+    async def run():
+        async with TelegramDispatcher(token="token", api_url=f"http://127.0.0.1:{stub.server_port}", max_chats=3) as d:
+            for chat_id in (1, 2, 3, 1, 4, 5):
+                d._chat_bucket(chat_id)
+            return list(d._chat_buckets)
+
+    assert asyncio.run(run()) == [1, 4, 5]
+
+
+def test_token_bucket_paces_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=100, capacity=5)
+        started_at = time.monotonic()
+        for _ in range(15):
+            await bucket.acquire()
+        return time.monotonic() - started_at
+
+    # 5 tokens are there up front, the other 10 arrive at 100 per second
+    assert 0.09 <= asyncio.run(run()) < 0.5
@@ -0,0 +1,109 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter
+from prometheus_client import REGISTRY
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from src.limiter import Limiter, LocallyBufferedRateLimiter, get_rate_limit_key
+from src.security import create_access_token
+
+
+def scope_request(headers: dict[str, str], client: str = "10.0.0.1") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+            "client": (client, 12345),
+        }
+    )
+
+
+def test_rate_limit_key_prefers_user_id():
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id).access_token
+
+    assert get_rate_limit_key(scope_request({"Authorization": f"Bearer {token}"})) == f"user:{user_id}"
+    assert get_rate_limit_key(scope_request({"Authorization": "Bearer forged"})) == "ip:10.0.0.1"
+
+
+@pytest.mark.parametrize(
+    "trusted_proxies, expected",
+    [(0, "ip:10.0.0.1"), (1, "ip:203.0.113.7"), (2, "ip:198.51.100.1"), (5, "ip:198.51.100.1")],
+)
+def test_rate_limit_key_trusts_only_proxy_appended_addresses(trusted_proxies, expected):
+    # The client claims 198.51.100.1, nginx appended the address it actually saw
+    request = scope_request({"X-Forwarded-For": "198.51.100.1, 203.0.113.7"})
+
+    with patch("src.limiter.settings.RATE_LIMIT_TRUSTED_PROXIES", trusted_proxies):
+        assert get_rate_limit_key(request) == expected
+
+
+def test_local_hits_are_reported_when_local_tokens_run_out():
+    storage = MemoryStorage()
+    item = parse("10/minute")
+    limiter = LocallyBufferedRateLimiter(FixedWindowRateLimiter(storage), share=0.5)
+
+    assert all(limiter.hit(item, "user:1") for _ in range(5))
+    assert limiter.get_window_stats(item, "user:1").remaining == 10
+
+    assert limiter.hit(item, "user:1")
+    assert limiter.get_window_stats(item, "user:1").remaining == 4
+
+
+def test_overshoot_is_bounded_by_local_shares():
+    storage = MemoryStorage()
+    item = parse("10/minute")
+    workers = [LocallyBufferedRateLimiter(FixedWindowRateLimiter(storage), share=0.5) for _ in range(3)]
+
+    admitted = sum(worker.hit(item, "user:1") for _ in range(50) for worker in workers)
+
+    assert 10 <= admitted <= 10 + 3 * 5
+
+
+def limited_app(limiter: Limiter) -> FastAPI:
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/")
+    @limiter.limit("2/minute")
+    def root(request: Request):
+        return {}
+
+    return app
+
+
+def test_limiter_consults_the_buffered_strategy():
+    # Guards the replacement of slowapi's private `_limiter`: fails once slowapi stops asking it for decisions
+    limiter = Limiter(key_func=get_rate_limit_key, local_share=0.5)
+    client = TestClient(limited_app(limiter))
+    before = REGISTRY.get_sample_value("rate_limit_decisions_total", {"decided_by": "local", "result": "allowed"}) or 0
+
+    with patch.object(
+        LocallyBufferedRateLimiter, "hit", autospec=True, side_effect=LocallyBufferedRateLimiter.hit
+    ) as hit:
+        assert client.get("/").status_code == 200
+
+    assert limiter.limiter is limiter._limiter
+    hit.assert_called_once()
+    assert hit.call_args.args[0] is limiter._limiter
+    assert (
+        REGISTRY.get_sample_value("rate_limit_decisions_total", {"decided_by": "local", "result": "allowed"})
+        == before + 1
+    )
+
+
+def test_limiter_records_its_overhead():
+    client = TestClient(limited_app(Limiter(key_func=get_rate_limit_key, local_share=0.5)))
+    before = REGISTRY.get_sample_value("rate_limit_check_seconds_count") or 0
+    statuses = [client.get("/").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert REGISTRY.get_sample_value("rate_limit_check_seconds_count") == before + 3
@@ -0,0 +1,137 @@
+import datetime
+import threading
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import DBAPIError
+
+from src.api.scheduler.jobs import Jobs
+from src.config import settings
+from src.scheduler_worker import LeaderElection, export_user_stat, run
+
+
+def fake_engine(acquired: bool):
+    engine = MagicMock()
+    connection = engine.connect.return_value.execution_options.return_value
+    connection.scalar.return_value = acquired
+    return engine, connection
+
+
+def test_standby_returns_its_connection_to_the_pool():
+    engine, connection = fake_engine(acquired=False)
+    election = LeaderElection(engine=engine, key=1)
+
+    assert election.try_acquire() is False
+    connection.close.assert_called_once()
+    connection.invalidate.assert_not_called()
+
+
+def test_leader_drops_its_connection_once_it_breaks():
+    engine, connection = fake_engine(acquired=True)
+    election = LeaderElection(engine=engine, key=1)
+
+    assert election.try_acquire() is True
+    assert election.is_held() is True
+
+    connection.execute.side_effect = DBAPIError("SELECT 1", None, Exception("server closed the connection"))
+    assert election.is_held() is False
+    connection.invalidate.assert_called_once()
+    connection.close.assert_called_once()
+
+
+def test_only_the_leader_runs_jobs():
+    stopped = threading.Event()
+    election = MagicMock()
+    election.try_acquire.side_effect = [False, True]
+    election.is_held.return_value = True
+
+    def lead(election, stopped):
+        stopped.set()
+
+    with (
+        patch("src.scheduler_worker.LeaderElection", return_value=election),
+        patch("src.scheduler_worker.lead", side_effect=lead) as lead_mock,
+        patch("src.scheduler_worker.settings.SCHEDULER_LEADER_CHECK_SECONDS", 0.01),
+    ):
+        run(stopped)
+
+    assert election.try_acquire.call_count == 2
+    lead_mock.assert_called_once()
+    election.release.assert_called_once()
+
+
+def test_every_instance_refreshes_the_user_stat_snapshot():
+    stopped = threading.Event()
+    session = MagicMock()
+    session.__enter__.return_value = session
+    refreshes = []
+
+    def refresh(session):
+        refreshes.append(session)
+        if len(refreshes) == 1:
+            raise ConnectionError("pool timeout")
+        stopped.set()
+
+    with (
+        patch("src.scheduler_worker.user_stat_collector.refresh", side_effect=refresh),
+        patch("src.scheduler_worker.settings.STAT_REFRESH_MINUTES", 0.0001),
+    ):
+        export_user_stat(stopped, session_factory=lambda: session)
+
+    assert refreshes == [session, session]
+
+
+def test_every_job_run_gets_a_fresh_session():
+    sessions = []
+
+    def session_factory():
+        session = MagicMock()
+        session.__enter__.return_value = session
+        sessions.append(session)
+        return session
+
+    jobs = Jobs(session_factory=session_factory)
+    jobs.refresh_booking_stat()
+    jobs.refresh_booking_stat()
+
+    assert len(sessions) == 2
+    assert all(session.__exit__.called for session in sessions)
+
+
+def test_expiry_job_uses_the_grace_period_as_cutoff():
+    session = MagicMock()
+    session.__enter__.return_value = session
+
+    with patch("src.api.scheduler.jobs.BookingService") as booking_service:
+        booking_service.return_value.delete_expired_bookings.return_value = (0, 0)
+        Jobs(session_factory=lambda: session).delete_expired_bookings()
+
+    cutoff, message = booking_service.return_value.delete_expired_bookings.call_args.args
+    grace = settings.BOOKING_EXPIRY_GRACE_MINUTES
+    assert abs(datetime.datetime.now() - datetime.timedelta(minutes=grace) - cutoff) < datetime.timedelta(seconds=5)
+    assert f"{grace} минут" in message
+
+
+def test_failed_expiry_is_rolled_back_and_logged(caplog):
+    session = MagicMock()
+    session.__enter__.return_value = session
+
+    with patch("src.api.scheduler.jobs.BookingService") as booking_service:
+        booking_service.return_value.delete_expired_bookings.side_effect = ConnectionError("pool timeout")
+        Jobs(session_factory=lambda: session).delete_expired_bookings()
+
+    session.rollback.assert_called_once()
+    assert caplog.records[-1].levelname == "ERROR"
+    assert caplog.records[-1].exc_info[0] is ConnectionError
+
+
+def test_failed_stat_refresh_is_rolled_back_and_logged(caplog):
+    session = MagicMock()
+    session.__enter__.return_value = session
+
+    with patch("src.api.scheduler.jobs.StatService") as stat_service:
+        stat_service.return_value.refresh_booking_stat.side_effect = ConnectionError("pool timeout")
+        Jobs(session_factory=lambda: session).refresh_booking_stat()
+
+    session.rollback.assert_called_once()
+    assert caplog.records[-1].levelname == "ERROR"
+    assert caplog.records[-1].exc_info[0] is ConnectionError
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from src.security import hash_password, password_hash_executor, verify_password
+
+
+def sample(name: str, labels: dict[str, str] | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+@patch("src.security.crypt_context")
+def test_verify_password_runs_on_hash_pool(crypt_context):
+    threads = []
+
+    def verify(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return plain == "secret"
+
+    crypt_context.verify.side_effect = verify
+    before = sample("password_hash_duration_seconds_count", {"operation": "verify"})
+
+    assert asyncio.run(verify_password("secret", "hash")) is True
+    assert asyncio.run(verify_password("wrong", "hash")) is False
+    assert all(name.startswith("password-hash") for name in threads)
+    assert sample("password_hash_duration_seconds_count", {"operation": "verify"}) == before + 2
+
+
+@patch("src.security.crypt_context")
+def test_hash_password_queues_beyond_worker_limit(crypt_context):
+    release = threading.Event()
+    crypt_context.hash.side_effect = lambda password: release.wait() and f"hashed:{password}"
+    workers = password_hash_executor._max_workers
+
+    async def run():
+        tasks = [asyncio.create_task(hash_password(str(n))) for n in range(workers + 3)]
+        while sample("password_hash_queued") < 3:
+            await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [f"hashed:{n}" for n in range(workers + 3)]
+    assert sample("password_hash_queued") == 0
@@ -0,0 +1,87 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.tracing import RequestTracingMiddleware, TracedRoute, register_query_tracing
+
+
+class Item(BaseModel):
+    id: int
+
+
+def sample(name: str, route: str, method: str = "GET") -> float:
+    return REGISTRY.get_sample_value(name, {"method": method, "route": route}) or 0
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    register_query_tracing(engine)
+    router = APIRouter(prefix="/tracing", route_class=TracedRoute)
+
+    @router.get("/items/{count}")
+    def list_items(count: int) -> list[Item]:
+        with engine.connect() as connection:
+            return [Item(id=connection.scalar(text("SELECT :n"), {"n": n})) for n in range(count)]
+
+    @router.get("/async")
+    async def async_item() -> Item:
+        return Item(id=1)
+
+    app = FastAPI()
+    app.add_middleware(RequestTracingMiddleware)
+    app.include_router(router)
+    yield TestClient(app)
+    engine.dispose()
+
+
+def test_queries_are_counted_per_route_template(client):
+    route = "/tracing/items/{count}"
+    before = sample("http_request_db_queries_sum", route), sample("http_request_db_queries_count", route)
+
+    assert client.get("/tracing/items/3").status_code == 200
+    assert client.get("/tracing/items/2").status_code == 200
+
+    assert sample("http_request_db_queries_sum", route) == before[0] + 5
+    assert sample("http_request_db_queries_count", route) == before[1] + 2
+    assert sample("http_request_db_seconds_count", route) >= 2
+
+
+def test_serialization_is_timed_for_sync_and_async_endpoints(client):
+    before = sample("http_request_serialization_seconds_count", "/tracing/async")
+    before_sum = sample("http_request_serialization_seconds_sum", "/tracing/async")
+
+    assert client.get("/tracing/async").json() == {"id": 1}
+    assert client.get("/tracing/items/1").json() == [{"id": 0}]
+
+    assert sample("http_request_serialization_seconds_count", "/tracing/async") == before + 1
+    assert sample("http_request_serialization_seconds_sum", "/tracing/async") > before_sum
+    assert sample("http_request_serialization_seconds_sum", "/tracing/items/{count}") > 0
+
+
+def test_unmatched_requests_are_not_recorded(client):
+    assert client.get("/missing").status_code == 404
+
+    assert sample("http_request_db_queries_count", "/missing") == 0
+
+
+def test_slow_requests_are_logged_with_their_statements(client, caplog):
+    with (
+        patch("src.tracing.settings.TRACING_SLOW_REQUEST_SECONDS", 0),
+        patch("src.tracing.settings.TRACING_MAX_STATEMENTS", 2),
+        caplog.at_level(logging.WARNING, logger="src.tracing"),
+    ):
+        client.get("/tracing/items/3")
+
+    [record] = caplog.records
+    assert "GET /tracing/items/3" in record.message
+    assert "в 3 запросах" in record.message
+    assert record.message.count("SELECT ?") == 2
+    assert "... и ещё 1" in record.message
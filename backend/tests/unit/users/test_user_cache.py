@@ -0,0 +1,146 @@
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from src.api.users.cache import CachedUser, UserCache
+from src.api.users.models import User
+from src.api.users.service import UserService
+
+
+def make_user(**kwargs) -> User:
+    fields = {
+        "id": uuid.uuid4(),
+        "username": "john_doe",
+        "name": None,
+        "email": None,
+        "password": "hash",
+        "role": "student",
+        "secret_id": uuid.uuid4(),
+        "telegram_id": None,
+        "created_at": datetime(2025, 1, 1),
+        "updated_at": datetime(2025, 1, 1),
+    }
+    return User(**(fields | kwargs))
+
+
+def lookups(backend: str, result: str) -> float:
+    return REGISTRY.get_sample_value("user_cache_lookups_total", {"backend": backend, "result": result}) or 0
+
+
+def test_get_returns_cached_user_and_counts_hits():
+    cache = UserCache(ttl=30, max_size=10)
+    user = make_user()
+    hits, misses = lookups("local", "hit"), lookups("local", "miss")
+
+    assert cache.get(user.id) is None
+    cache.set(user)
+    entry = cache.get(str(user.id))
+
+    assert entry.username == "john_doe"
+    assert not hasattr(entry, "password")
+    assert lookups("local", "hit") == hits + 1
+    assert lookups("local", "miss") == misses + 1
+
+
+def test_entries_expire_after_ttl():
+    cache = UserCache(ttl=30, max_size=10)
+    user = make_user()
+
+    with patch("src.api.users.cache.time.monotonic", return_value=0):
+        cache.set(user)
+    with patch("src.api.users.cache.time.monotonic", return_value=31):
+        assert cache.get(user.id) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = UserCache(ttl=30, max_size=2)
+    first, second, third = make_user(), make_user(), make_user()
+
+    cache.set(first)
+    cache.set(second)
+    cache.get(first.id)
+    cache.set(third)
+
+    assert cache.get(first.id) is not None
+    assert cache.get(second.id) is None
+    assert cache.get(third.id) is not None
+
+
+def test_redis_backs_local_misses():
+    redis_client = MagicMock()
+    cache = UserCache(ttl=30, max_size=10, redis_client=redis_client)
+    user = make_user()
+    redis_client.get.return_value = CachedUser.from_user(user).model_dump_json()
+
+    entry = cache.get(user.id)
+
+    redis_client.get.assert_called_once_with(f"user:{user.id}")
+    assert entry.id == user.id
+    assert cache.get(user.id) == entry
+    redis_client.get.assert_called_once()
+
+
+def test_redis_errors_fall_back_to_database():
+    redis_client = MagicMock()
+    redis_client.get.side_effect = redis.ConnectionError()
+    cache = UserCache(ttl=30, max_size=10, redis_client=redis_client)
+
+    assert cache.get(uuid.uuid4()) is None
+
+
+def test_invalidate_drops_both_layers():
+    redis_client = MagicMock()
+    cache = UserCache(ttl=30, max_size=10, redis_client=redis_client)
+    user = make_user()
+    cache.set(user)
+
+    cache.invalidate(user.id)
+
+    redis_client.delete.assert_called_once_with(f"user:{user.id}")
+    redis_client.get.return_value = None
+    assert cache.get(user.id) is None
+
+
+def test_to_user_attaches_without_select():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    user = make_user(username="john_doe")
+    with Session(engine) as session:
+        session.add(user)
+        session.commit()
+        entry = CachedUser.from_user(user)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        attached = entry.to_user(session)
+
+        assert attached.to_response().username == "john_doe"
+        assert statements == []
+        assert attached.password == "hash"
+        assert len(statements) == 1
+
+
+@pytest.mark.parametrize(
+    ("method", "args"),
+    [
+        ("update_username", ("new_name",)),
+        ("update_role", ("admin",)),
+        ("update_email", ("john@example.com",)),
+        ("set_telegram_id", (42,)),
+    ],
+)
+def test_user_service_writes_invalidate_cache(method, args):
+    service = UserService(session=MagicMock())
+    user = make_user()
+
+    with patch("src.api.users.service.user_cache") as user_cache:
+        getattr(service, method)(user, *args)
+
+    user_cache.invalidate.assert_called_once_with(user.id)
@@ -74,6 +74,16 @@ def test_register_user(mock_hash, service, dummy_session):
     dummy_session.refresh.assert_called_with(user)
 
 
+@patch("src.api.users.service.get_password_hash")
+def test_register_user_with_precomputed_hash(mock_hash, service, dummy_session):
+    reg_request = UserRegistrationRequest(username="alice", password="H@rdP8ssw0rd", role="guest")
+
+    user = service.register_user(reg_request, "precomputed_hash")
+
+    assert user.password == "precomputed_hash"
+    mock_hash.assert_not_called()
+
+
 @patch("src.api.users.service.get_password_hash", return_value="new_hashed_password")
 def test_update_password(mock_hash, service, dummy_session):
     dummy_user = DummyUser(password="old_pass")